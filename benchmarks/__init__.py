@@ -0,0 +1,5 @@
+"""
+Benchmark harnesses and the fake package tools and repositories they run
+against. Importable as a package (tests build their fixtures with it);
+each harness also runs as a script.
+"""
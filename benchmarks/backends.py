@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Backend throughput benchmarks against fake package tools.
+
+Puts stub pacman/yay/apt-cache/dpkg/flatpak/snap/pip executables (see
+fakebin.py) on PATH and runs manafest against an empty sysroot per distro,
+so every backend takes its subprocess path over a catalog of --packages
+packages. `--native` also benchmarks the in-process database readers on
+generated pacman/apt databases. Measures search, info, the install
+preview, `list` and registry reads/writes, and compares the medians with a
+saved baseline.
+
+    python benchmarks/backends.py --save                  # record a baseline
+    python benchmarks/backends.py                         # compare, exit 1 on regression
+    python benchmarks/backends.py --packages 100000 --latency 0.2 --native
+
+Timings only compare on the same machine, so no baseline is committed.
+Without --baseline, a missing or incomparable baseline.json just prints
+the results. With --baseline FILE, the file must exist and match the
+run's parameters, or the run fails (exit 2). CI records the baseline from
+the target branch and compares the change against it on the same runner:
+
+    git checkout origin/main && python benchmarks/backends.py --save --baseline /tmp/bench.json
+    git checkout -        && python benchmarks/backends.py --baseline /tmp/bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks import fakebin  # noqa: E402
+from benchmarks.fixtures import write_apt_lists, write_pacman_db  # noqa: E402
+
+BASELINE = HERE / "baseline.json"
+TOOLS = ("pacman", "yay", "apt-cache", "dpkg", "flatpak", "snap", "pip")
+QUERY = "fire"                    # matches roughly one package in fifteen
+REGISTRY_ROWS = 2000
+NOISE_FLOOR = 0.005               # seconds; smaller differences are never regressions
+
+OS_RELEASE = {
+    "arch": "ID=arch\n",
+    "debian": "ID=debian\n",
+    "generic": "ID=fakeos\n",
+}
+# backends exercised per distro (pypi search needs the network, so only its
+# in-process info path is measured)
+BACKENDS = {
+    "arch": ("default", "aur", "flatpak", "snap"),
+    "debian": ("default", "flatpak", "snap"),
+    "generic": ("default", "flatpak", "snap", "pypi"),
+}
+
+
+def write_fakebin(bindir: Path):
+    for tool in TOOLS:
+        path = bindir / tool
+        path.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{HERE / "fakebin.py"}" {tool} "$@"\n')
+        path.chmod(0o755)
+
+
+def make_sysroot(root: Path, distro: str, n: int, native: bool):
+    (root / "etc").mkdir(parents=True)
+    (root / "etc/os-release").write_text(OS_RELEASE[distro])
+    if native and distro == "arch":
+        write_pacman_db(root, n)
+    elif native and distro == "debian":
+        write_apt_lists(root, n)
+
+
+def _timed(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def worker(distro: str, runs: int) -> dict:
+    """
+    Runs inside the prepared environment; returns {scenario: seconds}.
+    """
+    from rich.console import Console
+    from manafest import pkgmanager
+    from manafest.utils import aio, console as console_mod, registry
+    from manafest.utils.cache import cache_dir, CACHE_DB
+    from manafest.utils.context import get_context
+
+    devnull = open(os.devnull, "w")
+    console_mod._LazyConsole._console = Console(file=devnull, width=120)
+    ctx = get_context(use_disk=False)
+    target = fakebin.package(1234)["name"]
+    results = {}
+
+    def forget_meta():
+        with contextlib.suppress(OSError):
+            (cache_dir() / CACHE_DB).unlink()
+
+    def preview(src):
+        forget_meta()
+        sys.stdin = io.StringIO("n\n")
+        with contextlib.redirect_stdout(devnull):
+            pkgmanager.install(target if src != "pypi" else "pip", src, force=True)
+
+    for src in BACKENDS[distro]:
+        mod = pkgmanager._backend(src)
+        name = target if src != "pypi" else "pip"
+        if src != "pypi":
+            results[f"{src}.search"] = _timed(
+                lambda: pkgmanager._search_one(src, QUERY, ctx, use_cache=False), runs)
+            results[f"{src}.search_limit20"] = _timed(
+                lambda: pkgmanager._search_one(src, QUERY, ctx, use_cache=False, limit=20), runs)
+        results[f"{src}.info"] = _timed(lambda: aio.call(mod.info, name, ctx), runs)
+        results[f"{src}.install_preview"] = _timed(lambda: preview(src), runs)
+
+    path = cache_dir() / "bench-registry.sqlite"
+    rows = [(fakebin.package(i)["name"], fakebin.package(i)) for i in range(REGISTRY_ROWS)]
+
+    def write_all():
+        for name, pkg in rows:
+            registry.put_entry(name, "default", pkg, path=path)
+
+    def read_all():
+        for name, _ in rows:
+            registry.get_entry(name, path=path)
+
+    results["registry.write_2k"] = _timed(write_all, runs)
+    results["registry.read_2k"] = _timed(read_all, runs)
+    results["registry.iter_2k"] = _timed(lambda: list(registry.iter_entries(path=path)), runs)
+
+    # `list` reads the real registry location
+    for name, pkg in rows:
+        registry.put_entry(name, "default", pkg)
+    results["list"] = _timed(pkgmanager.list_installed, runs)
+    return results
+
+
+def run_distro(distro: str, args, native: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        bindir = tmp / "bin"
+        bindir.mkdir()
+        write_fakebin(bindir)
+        make_sysroot(tmp / "root", distro, args.packages, native)
+        env = dict(
+            os.environ,
+            PATH=f"{bindir}{os.pathsep}{os.environ.get('PATH', '')}",
+            MANAFEST_SYSROOT=str(tmp / "root"),
+            XDG_CACHE_HOME=str(tmp / "cache"),
+            XDG_DATA_HOME=str(tmp / "data"),
+            FAKEBIN_PACKAGES=str(args.packages),
+            FAKEBIN_LATENCY=str(args.latency),
+            PYTHONPATH=str(ROOT),
+        )
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", distro, "--runs", str(args.runs)],
+            env=env, cwd=tmp, capture_output=True, text=True
+        )
+    if proc.returncode:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"worker for {distro} failed")
+    mode = "native" if native else "stub"
+    return {f"{distro}/{mode}/{k}": v for k, v in json.loads(proc.stdout).items()}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    ok = True
+    for key in sorted(results):
+        now = results[key]
+        before = baseline.get(key)
+        if before is None:
+            print(f"new   {key:<42} {now * 1000:9.1f} ms")
+            continue
+        regressed = now > before * (1 + threshold) and now - before > NOISE_FLOOR
+        ok &= not regressed
+        print(f"{'FAIL' if regressed else 'ok  '}  {key:<42} {now * 1000:9.1f} ms"
+              f"  (baseline {before * 1000:.1f} ms, {(now / before - 1) * 100 if before else 0:+.0f}%)")
+    return ok
+
+
+def _host() -> dict:
+    import platform
+    return {"node": platform.node(), "machine": platform.machine(),
+            "python": platform.python_version(), "cpus": os.cpu_count()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packages", type=int, default=20000, help="catalog size per tool")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds each stub sleeps")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--distro", choices=sorted(OS_RELEASE), action="append")
+    parser.add_argument("--native", action="store_true",
+                        help="also benchmark the in-process pacman/apt database readers")
+    parser.add_argument("--baseline", type=Path,
+                        help=f"baseline file; must exist unless saving (default {BASELINE.name},"
+                             f" optional)")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before failing (default 0.25 = 25%%)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        out = sys.stdout
+        json.dump(worker(args.worker, args.runs), out)
+        return 0
+
+    results = {}
+    for distro in args.distro or sorted(OS_RELEASE):
+        results.update(run_distro(distro, args, native=False))
+        if args.native and distro in ("arch", "debian"):
+            results.update(run_distro(distro, args, native=True))
+
+    params = {"packages": args.packages, "latency": args.latency, "runs": args.runs,
+              "distros": sorted(args.distro or OS_RELEASE), "native": args.native}
+    path = args.baseline or BASELINE
+    if args.save:
+        path.write_text(json.dumps({"params": params, "host": _host(), "results": results},
+                                   indent=2) + "\n")
+        print(f"Saved {len(results)} results to {path}")
+        return 0
+
+    try:
+        saved = json.loads(path.read_text())
+    except (OSError, ValueError):
+        saved = None
+    if saved is None or saved.get("params") != params:
+        why = "missing" if saved is None else f"recorded with {saved.get('params')}"
+        if args.baseline:
+            print(f"Baseline {path} is {why}; record it with --save first", file=sys.stderr)
+            return 2
+        print(f"No comparable baseline ({path.name} {why}; run with --save first); results:")
+        compare(results, {}, args.threshold)
+        return 0
+    if saved.get("host") != _host():
+        print(f"warning: baseline recorded on {saved.get('host')}, not this host;"
+              f" timings may not compare", file=sys.stderr)
+    return 0 if compare(results, saved["results"], args.threshold) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the package tools manafest shells out to.
+
+The benchmark harness installs one wrapper per tool on PATH, each running
+`fakebin.py <tool> <args...>`. Output mimics the real tool's format over a
+deterministic catalog of FAKEBIN_PACKAGES packages; FAKEBIN_LATENCY seconds
+are slept before the first byte, like a tool loading its databases.
+"""
+import os
+import re
+import sys
+import time
+
+SYLLABLES = (
+    "lib", "py", "gtk", "qt", "font", "x", "net", "core", "kit", "re",
+    "fire", "neo", "vim", "zip", "http", "data", "perl", "go", "rust", "node",
+    "ssl", "img", "cli", "tool", "audio", "gl", "db", "sql", "doc", "dev",
+)
+REPOS = ("core", "extra", "community")
+
+
+def package(i: int) -> dict:
+    """
+    Package number i of the catalog: a unique name built from syllables.
+    """
+    parts, n = [], i
+    while True:
+        parts.append(SYLLABLES[n % len(SYLLABLES)])
+        n //= len(SYLLABLES)
+        if not n:
+            break
+    name = "-".join(parts)
+    return {
+        "name": name,
+        "version": f"{i % 7}.{i % 13}.{i % 5}-1",
+        "arch": "x86_64",
+        "summary": f"{parts[0]} {SYLLABLES[(i * 7) % len(SYLLABLES)]} package number {i}",
+        "repo": REPOS[i % len(REPOS)],
+    }
+
+
+def catalog(n: int | None = None):
+    n = n if n is not None else int(os.environ.get("FAKEBIN_PACKAGES", "20000"))
+    return (package(i) for i in range(n))
+
+
+def _matches(query: str):
+    try:
+        pattern = re.compile(query, re.I)
+    except re.error:
+        pattern = re.compile(re.escape(query), re.I)
+    return (p for p in catalog() if pattern.search(p["name"]) or pattern.search(p["summary"]))
+
+
+def _lookup(name: str) -> dict | None:
+    return next((p for p in catalog() if p["name"] == name), None)
+
+
+def _installed(p: dict) -> bool:
+    # every tenth package counts as installed
+    return int(p["summary"].rsplit(" ", 1)[1]) % 10 == 0
+
+
+def _fields(p: dict, labels: tuple) -> str:
+    values = (p["name"], p["version"], p["arch"], p["summary"])
+    return "\n".join(f"{label:<15}: {v}" for label, v in zip(labels, values))
+
+
+def pacman(args, aur=False):
+    flag, rest = args[0], args[1:]
+    if flag == "-Ss":
+        for p in _matches(rest[0]):
+            repo = "aur" if aur else p["repo"]
+            print(f"{repo}/{p['name']} {p['version']}\n    {p['summary']}")
+        return 0
+    if flag in ("-Qi", "-Si"):
+        p = _lookup(rest[0])
+        if not p or (flag == "-Qi" and not _installed(p)):
+            print(f"error: package '{rest[0]}' was not found", file=sys.stderr)
+            return 1
+        print(_fields(p, ("Name", "Version", "Architecture", "Description")))
+        return 0
+    return 0
+
+
+def apt_cache(args):
+    if args[0] == "search":
+        for p in _matches(args[1]):
+            print(f"{p['name']} - {p['summary']}")
+        return 0
+    if args[0] == "show":
+        p = _lookup(args[1])
+        if not p:
+            return 100
+        print(f"Package: {p['name']}\nVersion: {p['version']}\n"
+              f"Architecture: amd64\nDescription: {p['summary']}\n")
+        return 0
+    return 0
+
+
+def dpkg(args):
+    p = _lookup(args[-1])
+    if not p or not _installed(p):
+        return 1
+    print(f"Package: {p['name']}\nStatus: install ok installed\nVersion: {p['version']}")
+    return 0
+
+
+def flatpak(args):
+    if args[0] == "search":
+        print("Name  Description  Application ID  Version  Branch  Remotes")
+        for p in _matches(args[1]):
+            print(f"{p['name']}  {p['version']}  org.fake.{p['name']}  {p['summary']}")
+        return 0
+    if args[0] == "remote-ls":
+        for p in catalog():
+            print(f"org.fake.{p['name']}\t{p['summary']}")
+        return 0
+    if args[0] == "info":
+        p = _lookup(args[1].removeprefix("org.fake."))
+        if not p:
+            return 1
+        print(f"Name: {p['name']}\nBranch: stable\nArch: {p['arch']}")
+        return 0
+    return 0
+
+
+def snap(args):
+    if args[0] == "find":
+        print("Name  Version  Publisher  Notes  Summary")
+        for p in _matches(args[1]):
+            print(f"{p['name']}  {p['version']}  fake  -  {p['summary']}")
+        return 0
+    if args[0] == "info":
+        p = _lookup(args[1])
+        if not p:
+            return 1
+        print(f"name: {p['name']}\nsummary: {p['summary']}\npublisher: fake\n"
+              f"tracking: latest/stable")
+        return 0
+    return 0
+
+
+def pip(args):
+    if args[0] == "search":
+        for p in _matches(args[1]):
+            print(f"{p['name']}: {p['summary']}")
+    return 0
+
+
+TOOLS = {
+    "pacman": pacman,
+    "yay": lambda args: pacman(args, aur=True),
+    "apt-cache": apt_cache,
+    "dpkg": dpkg,
+    "flatpak": flatpak,
+    "snap": snap,
+    "pip": pip,
+}
+
+
+def main() -> int:
+    tool, args = sys.argv[1], sys.argv[2:]
+    time.sleep(float(os.environ.get("FAKEBIN_LATENCY", "0")))
+    try:
+        return TOOLS[tool](args or [""])
+    except BrokenPipeError:
+        # the reader stopped early (--limit); that is not an error
+        sys.stderr.close()
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
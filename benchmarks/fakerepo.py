@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Stand-in web repository for the webrepo backend.
+
+Writes the index layout manafest expects (index.json, gzipped snapshots
+and per-revision deltas, install-script artifacts) for a deterministic
+catalog (see fakebin.py) and serves it over HTTP on localhost.
+
+    python benchmarks/fakerepo.py /tmp/repo --packages 5000 --revisions 5
+    MANAFEST_WEBREPO_URL=http://127.0.0.1:8765 manafest search fire --backend webrepo
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import re
+import sys
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import fakebin  # noqa: E402
+
+CHANGES = 50      # packages touched per revision
+
+
+def _artifact(root: Path, pkg: dict, pad: int = 0) -> dict:
+    script = f"#!/bin/sh\necho installed {pkg['name']} {pkg['version']}\nexit 0\n".encode()
+    script += b"#" * pad
+    path = root / "artifacts" / f"{pkg['name']}-{pkg['version']}.sh"
+    path.write_bytes(script)
+    return dict(pkg, id=pkg["name"], url=f"artifacts/{path.name}",
+                sha256=hashlib.sha256(script).hexdigest(), size=len(script))
+
+
+def _write(path: Path, data: dict):
+    path.write_bytes(gzip.compress(json.dumps(data).encode(), compresslevel=6))
+
+
+def build(root: Path, n: int, revisions: int = 3, artifacts: bool = True,
+          artifact_size: int = 0):
+    """
+    Revision 1 is the catalog of n packages; each later revision bumps the
+    version of CHANGES packages, adds one and deletes one. artifact_size
+    pads every install script, to exercise ranged downloads.
+    """
+    for sub in ("snapshots", "deltas", "artifacts"):
+        (root / sub).mkdir(parents=True, exist_ok=True)
+    finish = partial(_artifact, root, pad=artifact_size) if artifacts else lambda p: dict(p, id=p["name"])
+    pkgs = {p["name"]: finish(p) for p in fakebin.catalog(n)}
+    _write(root / "snapshots/1.json.gz", {"revision": 1, "packages": list(pkgs.values())})
+    for rev in range(2, revisions + 1):
+        names = sorted(pkgs)
+        upsert = []
+        for name in names[rev * CHANGES % len(names):][:CHANGES]:
+            pkg = dict(pkgs[name], version=f"{rev}.0-1")
+            pkgs[name] = finish(pkg)
+            upsert.append(pkgs[name])
+        added = finish(fakebin.package(n + rev))
+        pkgs[added["name"]] = added
+        upsert.append(added)
+        gone = names[rev]
+        del pkgs[gone]
+        _write(root / f"deltas/{rev}.json.gz", {"revision": rev, "upsert": upsert, "delete": [gone]})
+        _write(root / f"snapshots/{rev}.json.gz", {"revision": rev, "packages": list(pkgs.values())})
+    (root / "index.json").write_text(json.dumps({"revision": revisions}))
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    """
+    SimpleHTTPRequestHandler plus single "Range: bytes=a-b" requests, as
+    the artifact downloader uses them.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def end_headers(self):
+        self.send_header("Accept-Ranges", "bytes")
+        super().end_headers()
+
+    def send_head(self):
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        path = Path(self.translate_path(self.path))
+        if not match or not path.is_file():
+            return super().send_head()
+        size = path.stat().st_size
+        start = int(match[1])
+        end = min(int(match[2]) + 1 if match[2] else size, size)
+        if start >= end:
+            self.send_error(416)
+            return None
+        with open(path, "rb") as fh:
+            fh.seek(start)
+            body = fh.read(end - start)
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(str(path)))
+        self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+        self.send_header("Content-Length", str(end - start))
+        self.end_headers()
+        return io.BytesIO(body)
+
+
+def serve(root: Path, port: int = 0):
+    """
+    Serve root on 127.0.0.1 from a background thread; returns (server, url).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), partial(_Handler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, args=(0.1,), daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--packages", type=int, default=5000)
+    parser.add_argument("--revisions", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--artifact-size", type=int, default=0, metavar="BYTES")
+    args = parser.parse_args()
+    build(args.root, args.packages, args.revisions, artifact_size=args.artifact_size)
+    server, url = serve(args.root, args.port)
+    print(f"Serving {args.packages} packages (revision {args.revisions}) at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
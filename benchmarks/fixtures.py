@@ -0,0 +1,52 @@
+"""
+On-disk package databases for the fakebin catalog, shared by the
+benchmarks (--native) and the tests of the in-process readers.
+"""
+import io
+import tarfile
+from pathlib import Path
+
+from benchmarks import fakebin
+
+
+def write_pacman_db(root: Path, n: int):
+    """
+    var/lib/pacman sync databases (one per fakebin repo) and local
+    entries for the installed packages under root.
+    """
+    dbpath = root / "var/lib/pacman"
+    (dbpath / "sync").mkdir(parents=True)
+    repos = {}
+    for p in fakebin.catalog(n):
+        desc = (f"%NAME%\n{p['name']}\n\n%VERSION%\n{p['version']}\n\n"
+                f"%DESC%\n{p['summary']}\n\n%ARCH%\n{p['arch']}\n\n")
+        repos.setdefault(p["repo"], []).append((f"{p['name']}-{p['version']}/desc", desc))
+        if fakebin._installed(p):
+            local = dbpath / "local" / f"{p['name']}-{p['version']}"
+            local.mkdir(parents=True)
+            (local / "desc").write_text(desc)
+    for repo, members in repos.items():
+        with tarfile.open(dbpath / "sync" / f"{repo}.db", "w:gz") as tar:
+            for name, text in members:
+                data = text.encode()
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+
+def write_apt_lists(root: Path, n: int):
+    """
+    One apt Packages list with the whole catalog and a dpkg status file
+    with the installed packages under root.
+    """
+    lists = root / "var/lib/apt/lists"
+    lists.mkdir(parents=True)
+    (root / "var/lib/dpkg").mkdir(parents=True)
+    with open(lists / "fake_dists_stable_main_binary-amd64_Packages", "w") as repo, \
+            open(root / "var/lib/dpkg/status", "w") as status:
+        for p in fakebin.catalog(n):
+            stanza = (f"Package: {p['name']}\nVersion: {p['version']}\n"
+                      f"Architecture: amd64\nDescription: {p['summary']}\n")
+            repo.write(stanza + "\n")
+            if fakebin._installed(p):
+                status.write(stanza + "Status: install ok installed\n\n")
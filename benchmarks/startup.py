@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Cold-start budget for the manafest CLI.
+
+Runs `python -X importtime -m manafest.cli <args>` for a few entry points
+and fails if the import time of manafest and everything it pulls in exceeds
+the budget, or if a path imports modules it has no business loading
+(backends on `--help`/`list`, rich on `--help`).
+
+    python benchmarks/startup.py            # check against BUDGETS
+    python benchmarks/startup.py --runs 9   # more samples per scenario
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# scenario -> (argv, budget in microseconds, forbidden module prefixes)
+BUDGETS = {
+    "help": (["--help"], 15_000, ("manafest.pkgmanager", "manafest.backends", "rich")),
+    "list": (["list"], 120_000, ("manafest.backends", "asyncio", "concurrent.futures")),
+}
+
+
+def measure(argv: list[str], env: dict) -> tuple[int, set]:
+    """
+    Total import time (µs) below the interpreter's own startup, and the
+    set of modules imported.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "manafest.cli", *argv],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    total, modules = 0, set()
+    seen_main = False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = (p.strip() for p in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():
+            continue
+        # everything before the first manafest import is interpreter startup
+        if name.startswith("manafest"):
+            seen_main = True
+        if seen_main:
+            total += int(self_us)
+            modules.add(name)
+    return total, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, XDG_CACHE_HOME=tmp, XDG_DATA_HOME=tmp,
+                   PYTHONPATH=str(ROOT))
+        for scenario, (argv, budget, forbidden) in BUDGETS.items():
+            samples, modules = [], set()
+            for _ in range(args.runs):
+                us, mods = measure(argv, env)
+                samples.append(us)
+                modules |= mods
+            median = statistics.median(samples)
+            leaked = sorted(p for p in forbidden
+                            if any(m == p or m.startswith(p + ".") for m in modules))
+            ok = median <= budget and not leaked
+            failed |= not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {scenario:<6} {median / 1000:7.1f} ms"
+                  f" (budget {budget / 1000:.0f} ms)")
+            for p in leaked:
+                print(f"     imports {p}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,27 @@
-from .default import *
-from .aur     import *
-from .flatpak import *
-from .snap    import *
-from .pypi    import *
+"""
+Package backends. Each is a module with any of these functions (all take
+the PlatformContext as `ctx`):
+
+    fingerprint(ctx) -> str | None     token that changes with the package db
+    search(query, ctx) -> rows          iterable of {name, version, arch, summary}
+    info(name, ctx) -> dict
+    install(name, ctx) -> bool
+    remove(name, ctx) -> bool
+    update(ctx, log=None) -> bool       output to `log` (a file) when given
+    upgrade(ctx, log=None) -> bool
+    catalog(ctx) -> (name, summary)     for the fuzzy index
+
+Every one except fingerprint and catalog may instead be `async def` (search
+as an async generator), built on proc.run_async/stream_lines_async.
+pkgmanager calls them through utils.aio.call, which runs coroutines on one
+shared event loop, so async backends overlap their I/O with each other.
+
+Of the built-ins only snap is async so far. The others are plain functions
+over blocking subprocess calls; pkgmanager runs each backend's search on
+its own thread and updates in lanes, so those overlap as well, just not
+on the loop.
+"""
+import importlib
 
 __all__ = [
     "default",
@@ -10,5 +29,12 @@ __all__ = [
     "flatpak",
     "snap",
     "pypi",
+    "webrepo",
 ]
 
+
+def __getattr__(name):
+    # backends are imported on first access, not with the package
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,54 +1,68 @@
 # manafest/backends/aur.py
 
+import gzip
 import subprocess
 import logging
-import shutil
+
+from manafest.backends.default import parse_pacman_ss
+from manafest.utils import http
+from manafest.utils.cache import fingerprint_paths
+from manafest.utils.context import PlatformContext, get_context
+from manafest.utils.pacmandb import DBPATH
+from manafest.utils.proc import stream_lines
+
+distros = ("arch",)
 
 logger = logging.getLogger("manafest.backends.aur")
 logger.setLevel(logging.INFO)
 
-def _helper() -> str | None:
+# plain list of every AUR package name, regenerated upstream every few minutes
+AUR_NAMES = "https://aur.archlinux.org/packages.gz"
+CATALOG_MAX_AGE = 24 * 3600
+
+def fingerprint(ctx: PlatformContext | None = None) -> str:
     """
-    Return the first available AUR helper binary.
+    Changes with the local pacman database and sync refreshes (an install
+    or upgrade); AUR releases in between are caught by META_TTL.
+    """
+    return fingerprint_paths([DBPATH / "local"] + sorted((DBPATH / "sync").glob("*.db")))
+
+def search(query: str, ctx: PlatformContext | None = None):
     """
-    for helper in ("yay", "paru", "pikaur"):
-        if shutil.which(helper):
-            return helper
-    return None
-
-def search(query: str) -> list[dict]:
-    helper = _helper()
-    if not helper:
-        return []
+    Stream `<helper> -Ss` output, yielding AUR packages as they are parsed.
+    """
+    cmd = (ctx or get_context()).cmd("aur", "search", query)
+    if not cmd:
+        return
     try:
-        out = subprocess.check_output(
-            [helper, "-Ss", query],
-            stderr=subprocess.DEVNULL,
-            timeout=60
-        ).decode().splitlines()
-    except Exception:
-        return []
+        # helpers list repo packages too; keep the aur/ ones
+        for pkg in parse_pacman_ss(stream_lines(cmd, timeout=60)):
+            if pkg.pop("repo") == "aur":
+                yield pkg
+    except Exception as e:
+        logger.debug("AUR search failed %s → %s", cmd, e)
 
-    results = []
-    for line in out:
-        # Format: pkgname optional_colon description
-        if not line.strip() or not line.startswith(query):
-            continue
-        name, _, rest = line.partition(":")
-        summary = rest.strip()
-        results.append({
-            "name": name.strip(),
-            "version": "",
-            "arch": "",
-            "summary": summary
-        })
-    return results
-
-def install(name: str) -> bool:
-    helper = _helper()
-    if not helper:
+def catalog(ctx: PlatformContext | None = None):
+    """
+    Yield (name, "") for every AUR package (the name list has no summaries).
+    """
+    if not (ctx or get_context()).cmd("aur", "search"):
+        return
+    try:
+        body = http.get(AUR_NAMES, timeout=60, max_age=CATALOG_MAX_AGE)
+    except Exception as e:
+        logger.debug("AUR package list failed → %s", e)
+        return
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    for line in body.decode("utf-8", "replace").splitlines():
+        if line and not line.startswith("#"):
+            yield line.strip(), ""
+
+def install(name: str, ctx: PlatformContext | None = None) -> bool:
+    cmd = (ctx or get_context()).cmd("aur", "install", name)
+    if not cmd:
         return False
-    cmd = [helper, "-S", "--noconfirm", name]
     try:
         subprocess.check_call(cmd)
         return True
@@ -56,11 +70,10 @@ def install(name: str) -> bool:
         logger.debug("AUR install failed %s → %s", cmd, e)
         return False
 
-def remove(name: str) -> bool:
-    helper = _helper()
-    if not helper:
+def remove(name: str, ctx: PlatformContext | None = None) -> bool:
+    cmd = (ctx or get_context()).cmd("aur", "remove", name)
+    if not cmd:
         return False
-    cmd = [helper, "-Rns", "--noconfirm", name]
     try:
         subprocess.check_call(cmd)
         return True
@@ -68,13 +81,13 @@ def remove(name: str) -> bool:
         logger.debug("AUR remove failed %s → %s", cmd, e)
         return False
 
-def info(name: str) -> dict:
-    helper = _helper()
-    if not helper:
+def info(name: str, ctx: PlatformContext | None = None) -> dict:
+    cmd = (ctx or get_context()).cmd("aur", "info", name)
+    if not cmd:
         return {}
     try:
         out = subprocess.check_output(
-            [helper, "-Si", name],
+            cmd,
             stderr=subprocess.DEVNULL,
             timeout=60
         ).decode().splitlines()
@@ -100,22 +113,22 @@ def info(name: str) -> dict:
         "summary": data.get("summary", "-")
     }
 
-def update() -> bool:
-    helper = _helper()
-    if not helper:
+def update(ctx: PlatformContext | None = None, log=None) -> bool:
+    cmd = (ctx or get_context()).cmd("aur", "update")
+    if not cmd:
         return False
     try:
-        subprocess.check_call([helper, "-Sy"])
+        subprocess.check_call(cmd, stdout=log, stderr=subprocess.STDOUT if log else None)
         return True
     except Exception:
         return False
 
-def upgrade() -> bool:
-    helper = _helper()
-    if not helper:
+def upgrade(ctx: PlatformContext | None = None, log=None) -> bool:
+    cmd = (ctx or get_context()).cmd("aur", "upgrade")
+    if not cmd:
         return False
     try:
-        subprocess.check_call([helper, "-Syu", "--noconfirm"])
+        subprocess.check_call(cmd, stdout=log, stderr=subprocess.STDOUT if log else None)
         return True
     except Exception:
         return False
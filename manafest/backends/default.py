@@ -5,7 +5,11 @@ import logging
 import re
 import json
 
-from manafest.utils.osdetect import get_os, get_distro
+from manafest.utils.cache import fingerprint_paths
+from manafest.utils.context import PlatformContext, get_context
+from manafest.utils.osdetect import SYSROOT
+from manafest.utils.proc import stream_lines
+from manafest.utils import pacmandb, debdb, rpmmd, pydist
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -13,28 +17,44 @@ logger.setLevel(logging.INFO)
 RE_FEDORA = re.compile(r'^([^|]+)\|([^|]+)\|([^|]+)\|(.+)$')
 
 
-def installed(name: str) -> bool:
+def fingerprint(ctx: PlatformContext | None = None) -> str | None:
     """
-    Return True if 'name' is installed system-wide (or via Termux).
+    Token that changes whenever the system package database does.
+    None where we cannot tell (no caching then).
     """
-    os_name = get_os()
-    distro = get_distro() if os_name == "linux" else None
+    ctx = ctx or get_context()
+    distro = ctx.distro
 
-    if os_name == "android":
-        cmd = ["pkg", "list-installed"]
-    elif distro == "arch":
-        cmd = ["pacman", "-Qi", name]
+    if distro == "arch":
+        paths = [pacmandb.DBPATH / "local"] + sorted((pacmandb.DBPATH / "sync").glob("*.db"))
     elif distro in ("debian", "ubuntu"):
-        cmd = ["dpkg", "-s", name]
+        paths = [debdb.STATUS, debdb.LISTS]
     elif distro == "fedora":
-        cmd = ["rpm", "-q", name]
-    elif os_name == "macos":
-        cmd = ["brew", "list", name]
-    elif os_name == "windows":
-        cmd = ["winget", "list", name]
+        paths = [SYSROOT / "var/lib/rpm"] + list(rpmmd.CACHE_DIRS)
     else:
-        cmd = ["pip", "show", name]
+        return None
+    return fingerprint_paths(paths)
+
 
+def installed(name: str, ctx: PlatformContext | None = None) -> bool:
+    """
+    Return True if 'name' is installed system-wide (or via Termux).
+    """
+    ctx = ctx or get_context()
+    distro = ctx.distro
+
+    if distro == "arch":
+        found = pacmandb.installed(name)
+        if found is not None:
+            return found
+    elif distro in ("debian", "ubuntu"):
+        found = debdb.installed(name)
+        if found is not None:
+            return found
+
+    cmd = ctx.cmd("default", "installed", name)
+    if not cmd:
+        return pydist.get(name) is not None
     try:
         subprocess.check_call(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         return True
@@ -42,13 +62,13 @@ def installed(name: str) -> bool:
         return False
 
 
-def info(name: str) -> dict:
+def info(name: str, ctx: PlatformContext | None = None) -> dict:
     """
     Return metadata dict for name: {name,version,arch,summary}.
     Supports Fedora, Arch, Debian/Ubuntu, Termux (apt), macOS, Windows, pip.
     """
-    os_name = get_os()
-    distro = get_distro() if os_name == "linux" else None
+    ctx = ctx or get_context()
+    os_name, distro = ctx.os, ctx.distro
 
     # --- Termux / Android via apt ---
     if os_name == "android":
@@ -70,8 +90,11 @@ def info(name: str) -> dict:
         except Exception:
             pass
 
-    # --- Fedora via repoquery ---
+    # --- Fedora: cached repo metadata, else repoquery ---
     if distro == "fedora":
+        data = rpmmd.info(name)
+        if data:
+            return data
         cmd = [
             "dnf", "repoquery",
             "--qf", "%{name}|%{version}-%{release}|%{arch}|%{summary}",
@@ -88,6 +111,9 @@ def info(name: str) -> dict:
 
     # --- Arch Linux ---
     if distro == "arch":
+        data = pacmandb.info(name)
+        if data:
+            return {k: data[k] for k in ("name","version","arch","summary")}
         try:
             lines = subprocess.check_output(
                 ["pacman","-Qi",name], stderr=subprocess.DEVNULL, timeout=20
@@ -113,6 +139,9 @@ def info(name: str) -> dict:
 
     # --- Debian / Ubuntu ---
     if distro in ("debian","ubuntu"):
+        data = debdb.info(name)
+        if data:
+            return data
         try:
             lines = subprocess.check_output(
                 ["apt-cache","show",name],
@@ -179,101 +208,134 @@ def info(name: str) -> dict:
         except Exception:
             pass
 
-    # --- pip fallback ---
-    try:
-        lines = subprocess.check_output(
-            ["pip","show",name], stderr=subprocess.DEVNULL, timeout=20
-        ).decode().splitlines()
-        data = {}
-        for l in lines:
-            if l.startswith("Name:"):
-                data["name"] = l.split(":",1)[1].strip()
-            elif l.startswith("Version:"):
-                data["version"] = l.split(":",1)[1].strip()
-            elif l.startswith("Summary:"):
-                data["summary"] = l.split(":",1)[1].strip()
-        return {
-            "name": data.get("name",name),
-            "version": data.get("version","-"),
-            "arch": "-",
-            "summary": data.get("summary","-")
-        }
-    except Exception:
-        pass
+    # --- Python distribution (site-packages, in-process) ---
+    data = pydist.get(name)
+    if data:
+        return {k: data[k] for k in ("name","version","arch","summary")}
 
     # --- Last resort ---
     return {"name": name, "version": "-", "arch": "-", "summary": "-"}
 
 
-def search(query: str) -> list[dict]:
+def search(query: str, ctx: PlatformContext | None = None):
     """
-    Return list of dicts: {name,version,arch,summary}.
+    Yield dicts {name,version,arch,summary} as they are parsed.
     Falls back on pkg/apt/pacman/apt-cache/pip/winget as needed.
     """
-    os_name = get_os()
-    distro = get_distro() if os_name == "linux" else None
+    ctx = ctx or get_context()
+    distro = ctx.distro
 
-    # Fedora structured repoquery
+    # Fedora: cached repo metadata, else structured repoquery
     if distro == "fedora":
+        results = rpmmd.search(query)
+        if results is not None:
+            yield from results
+            return
         cmd = [
             "dnf","repoquery",
             "--qf","%{name}|%{version}-%{release}|%{arch}|%{summary}",
             query
         ]
         try:
-            lines = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, timeout=20
-            ).decode().splitlines()
-            results = []
-            for l in lines:
+            for l in stream_lines(cmd):
                 m = RE_FEDORA.match(l)
                 if m:
                     nm,ver,arch,summ = m.groups()
-                    results.append({
-                        "name": nm,"version": ver,"arch": arch,"summary": summ
-                    })
-            return results
-        except Exception:
-            return []
+                    yield {"name": nm,"version": ver,"arch": arch,"summary": summ}
+        except Exception as e:
+            logger.debug("Search failed %s → %s", cmd, e)
+        return
 
-    # Choose fallback command
-    if os_name == "android":
-        cmd = ["pkg","search",query]
-    elif distro == "arch":
-        cmd = ["pacman","-Ss",query]
+    # Arch: answer from the sync databases directly
+    if distro == "arch":
+        results = pacmandb.search(query)
+        if results is not None:
+            yield from results
+            return
+
+    # Debian/Ubuntu: scan the apt lists in-process
+    if distro in ("debian","ubuntu"):
+        results = debdb.search(query)
+        if results is not None:
+            yield from results
+            return
+
+    cmd = ctx.cmd("default", "search", query)
+    try:
+        lines = stream_lines(cmd)
+        if distro == "arch":
+            yield from parse_pacman_ss(lines)
+            return
+
+        # apt-cache prints 'name - summary', the rest 'name: summary'
+        sep = " - " if distro in ("debian","ubuntu") else ":"
+        for l in lines:
+            if sep not in l:
+                continue
+            nm, summ = l.split(sep,1)
+            yield {
+                "name":    nm.strip(),
+                "version": "",
+                "arch":    "",
+                "summary": summ.strip()
+            }
+    except Exception as e:
+        logger.debug("Search failed %s → %s", cmd, e)
+
+
+def catalog(ctx: PlatformContext | None = None):
+    """
+    Yield (name, summary) for every package the native databases know
+    about; nothing where there is no readable database.
+    """
+    distro = (ctx or get_context()).distro
+    if distro == "arch":
+        rows = pacmandb.catalog()
     elif distro in ("debian","ubuntu"):
-        cmd = ["apt-cache","search",query]
-    elif os_name == "macos":
-        cmd = ["brew","search",query]
-    elif os_name == "windows":
-        cmd = ["winget","search",query]
+        rows = debdb.catalog()
+    elif distro == "fedora":
+        rows = rpmmd.catalog()
     else:
-        cmd = ["pip","search",query]
+        rows = None
+    yield from rows or ()
 
-    try:
-        lines = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, timeout=20
-        ).decode().splitlines()
-    except Exception:
-        return []
 
-    results = []
+def parse_pacman_ss(lines):
+    """
+    Parse `pacman -Ss`-style output (also used by AUR helpers):
+    'repo/name version [group] [installed]' followed by an indented
+    description line. Yields each package once its description is read.
+    """
+    pending = None
     for l in lines:
-        if ":" not in l: 
+        if l.startswith((" ", "\t")):
+            if pending:
+                pending["summary"] = l.strip()
+                yield pending
+                pending = None
+            continue
+        parts = l.split()
+        if not parts:
             continue
-        nm, summ = l.split(":",1)
-        results.append({
-            "name":    nm.strip(),
-            "version": "",
+        if pending:
+            yield pending
+        repo, _, name = parts[0].rpartition("/")
+        pending = {
+            "name":    name,
+            "version": parts[1] if len(parts) > 1 else "",
             "arch":    "",
-            "summary": summ.strip()
-        })
-    return results
+            "summary": "",
+            "repo":    repo
+        }
+    if pending:
+        yield pending
 
 
-def install(name: str) -> bool:
+def install(name: str, ctx: PlatformContext | None = None) -> bool:
     """
     Install via native tool (pkg/pacman/apt-get/dnf/brew/winget/pip).
     """
-    cmd = _select_cmd("install", name)
+    cmd = _select_cmd("install", name, ctx)
     try:
         subprocess.check_call(cmd)
         return True
@@ -282,11 +344,11 @@ def install(name: str) -> bool:
         return False
 
 
-def remove(name: str) -> bool:
+def remove(name: str, ctx: PlatformContext | None = None) -> bool:
     """
     Remove via native tool.
     """
-    cmd = _select_cmd("remove", name)
+    cmd = _select_cmd("remove", name, ctx)
     try:
         subprocess.check_call(cmd)
         return True
@@ -295,116 +357,45 @@ def remove(name: str) -> bool:
         return False
 
 
-def update() -> bool:
+def update(ctx: PlatformContext | None = None, log=None) -> bool:
     """
     Refresh package database. On Fedora, exitcode 100 means updates available.
+    Output goes to `log` (a file) if given.
     """
-    os_name = get_os()
-    distro = get_distro() if os_name == "linux" else None
+    ctx = ctx or get_context()
 
+    cmd = ctx.cmd("default", "update")
+    if not cmd:
+        return False
     try:
-        if os_name == "android":
-            cmd = ["pkg","update"]
-        elif distro == "arch":
-            cmd = ["sudo","pacman","-Sy"]
-        elif distro in ("debian","ubuntu"):
-            cmd = ["sudo","apt-get","update"]
-        elif distro == "fedora":
-            cmd = ["sudo","dnf","check-update"]
+        if log is None:
+            proc = subprocess.run(cmd, capture_output=True, text=True)
         else:
-            return False
-
-        proc = subprocess.run(cmd, capture_output=True, text=True)
+            proc = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT)
         return proc.returncode in (0,100)
     except Exception:
         return False
 
 
-def upgrade() -> bool:
+def upgrade(ctx: PlatformContext | None = None, log=None) -> bool:
     """
-    Upgrade all packages.
+    Upgrade all packages; output goes to `log` (a file) if given.
     """
-    os_name = get_os()
-    distro = get_distro() if os_name == "linux" else None
+    ctx = ctx or get_context()
 
+    cmd = ctx.cmd("default", "upgrade")
+    if not cmd:
+        return False
     try:
-        if os_name == "android":
-            cmd = ["pkg","upgrade","-y"]
-        elif distro == "arch":
-            cmd = ["sudo","pacman","-Syu","--noconfirm"]
-        elif distro in ("debian","ubuntu"):
-            cmd = ["sudo","apt-get","upgrade","-y"]
-        elif distro == "fedora":
-            cmd = ["sudo","dnf","upgrade","-y"]
-        else:
-            return False
-
-        subprocess.check_call(cmd)
+        subprocess.check_call(cmd, stdout=log, stderr=subprocess.STDOUT if log else None)
         return True
     except Exception:
         return False
 
 
-def _select_cmd(action: str, arg: str) -> list[str]:
+def _select_cmd(action: str, arg: str, ctx: PlatformContext | None = None) -> list[str]:
     """
     Returns the subprocess argv list for `search`/`install`/`remove`.
     """
-    os_name = get_os()
-    distro = get_distro() if os_name == "linux" else None
-
-    # Termux / Android
-    if os_name == "android":
-        return {
-            "search": ["pkg","search",arg],
-            "install": ["pkg","install",arg],
-            "remove": ["pkg","uninstall",arg]
-        }.get(action, [])
-
-    # Linux distributions
-    if os_name == "linux":
-        if action == "search":
-            if distro == "arch":
-                return ["pacman","-Ss",arg]
-            if distro in ("debian","ubuntu"):
-                return ["apt-cache","search",arg]
-            if distro == "fedora":
-                return ["dnf","search",arg]
-        if action == "install":
-            if distro == "arch":
-                return ["sudo","pacman","-S","--noconfirm",arg]
-            if distro in ("debian","ubuntu"):
-                return ["sudo","apt-get","install","-y",arg]
-            if distro == "fedora":
-                return ["sudo","dnf","install","-y",arg]
-        if action == "remove":
-            if distro == "arch":
-                return ["sudo","pacman","-Rsn","--noconfirm",arg]
-            if distro in ("debian","ubuntu"):
-                return ["sudo","apt-get","remove","-y",arg]
-            if distro == "fedora":
-                return ["sudo","dnf","remove","-y",arg]
-
-    # macOS Homebrew
-    if os_name == "macos":
-        return {
-            "search":  ["brew","search",arg],
-            "install": ["brew","install",arg],
-            "remove":  ["brew","uninstall",arg]
-        }.get(action, [])
-
-    # Windows Winget
-    if os_name == "windows":
-        return {
-            "search":  ["winget","search",arg],
-            "install": ["winget","install",
-                        "--accept-source-agreements",
-                        "--accept-package-agreements",arg],
-            "remove":  ["winget","uninstall",arg]
-        }.get(action, [])
-
-    # pip fallback
-    return {
-        "search":  ["pip","search",arg],
-        "install": ["pip","install",arg],
-        "remove":  ["pip","uninstall","-y",arg]
-    }.get(action, [])
+    ctx = ctx or get_context()
+    return ctx.cmd("default", action, arg)
@@ -2,47 +2,74 @@
 
 import subprocess
 import logging
+from pathlib import Path
+
+from manafest.utils.cache import fingerprint_paths
+from manafest.utils.context import PlatformContext, get_context
+from manafest.utils.osdetect import SYSROOT
+from manafest.utils.proc import stream_lines
+
+supported_os = ("linux",)
+requires = ("flatpak",)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-def search(query: str) -> list[dict]:
+INSTALLATIONS = (
+    SYSROOT / "var/lib/flatpak",
+    Path.home() / ".local/share/flatpak",
+)
+
+def fingerprint(ctx: PlatformContext | None = None) -> str:
+    """
+    Changes when apps are installed/updated or appstream data refreshes.
+    """
+    return fingerprint_paths(
+        inst / sub for inst in INSTALLATIONS for sub in ("app", "runtime", "repo", "appstream")
+    )
+
+def search(query: str, ctx: PlatformContext | None = None):
     """
-    Call `flatpak search` and return a list of dicts:
-    {name, version, arch, summary}.
+    Stream `flatpak search`, yielding dicts {name, version, arch, summary}.
     """
+    cmd = (ctx or get_context()).cmd("flatpak", "search", query)
     try:
-        out = subprocess.check_output(
-            ["flatpak", "search", query],
-            stderr=subprocess.DEVNULL,
-            timeout=20
-        ).decode().splitlines()
-    except Exception:
-        return []
+        for line in stream_lines(cmd):
+            # skip header or empty lines
+            if not line.strip() or line.startswith("Name"):
+                continue
+            # split on two-or-more spaces
+            parts = [p for p in line.split("  ") if p.strip()]
+            name = parts[0].strip()
+            # often Application ID is parts[1], summary at end
+            summary = parts[-1].strip() if len(parts) > 1 else ""
+            yield {
+                "name": name,
+                "version": "",
+                "arch": "",
+                "summary": summary
+            }
+    except Exception as e:
+        logger.debug("Flatpak search failed %s → %s", cmd, e)
 
-    results = []
-    for line in out:
-        # skip header or empty lines
-        if not line.strip() or line.startswith("Name"):
-            continue
-        # split on two-or-more spaces
-        parts = [p for p in line.split("  ") if p.strip()]
-        name = parts[0].strip()
-        # often Application ID is parts[1], summary at end
-        summary = parts[-1].strip() if len(parts) > 1 else ""
-        results.append({
-            "name": name,
-            "version": "",
-            "arch": "",
-            "summary": summary
-        })
-    return results
+def catalog(ctx: PlatformContext | None = None):
+    """
+    Yield (app-id, description) for every app on the configured remotes.
+    """
+    cmd = (ctx or get_context()).cmd("flatpak", "catalog")
+    try:
+        for line in stream_lines(cmd, timeout=60):
+            app, _, summary = line.partition("\t")
+            if app.strip():
+                yield app.strip(), summary.strip()
+    except Exception as e:
+        logger.debug("Flatpak remote-ls failed %s → %s", cmd, e)
 
-def install(name: str) -> bool:
+def install(name: str, ctx: PlatformContext | None = None) -> bool:
     """
     flatpak install flathub <app-id> -y
     """
-    cmd = ["flatpak", "install", "flathub", "-y", name]
+    cmd = (ctx or get_context()).cmd("flatpak", "install", name)
     try:
         subprocess.check_call(cmd)
         return True
@@ -50,11 +77,11 @@ def install(name: str) -> bool:
         logger.debug("Flatpak install failed %s → %s", cmd, e)
         return False
 
-def remove(name: str) -> bool:
+def remove(name: str, ctx: PlatformContext | None = None) -> bool:
     """
     flatpak uninstall <app-id> -y
     """
-    cmd = ["flatpak", "uninstall", "-y", name]
+    cmd = (ctx or get_context()).cmd("flatpak", "remove", name)
     try:
         subprocess.check_call(cmd)
         return True
@@ -62,13 +89,13 @@ def remove(name: str) -> bool:
         logger.debug("Flatpak uninstall failed %s → %s", cmd, e)
         return False
 
-def info(name: str) -> dict:
+def info(name: str, ctx: PlatformContext | None = None) -> dict:
     """
     flatpak info <app-id>, parsed for name, version, arch.
     """
     try:
         out = subprocess.check_output(
-            ["flatpak", "info", name],
+            (ctx or get_context()).cmd("flatpak", "info", name),
             stderr=subprocess.DEVNULL,
             timeout=20
         ).decode().splitlines()
@@ -86,19 +113,20 @@ def info(name: str) -> dict:
     data.setdefault("summary", "")
     return data
 
-def update() -> bool:
+def update(ctx: PlatformContext | None = None, log=None) -> bool:
     """
     Runs `flatpak update -y` to update all installed apps.
     """
     try:
-        subprocess.check_call(["flatpak", "update", "-y"])
+        subprocess.check_call((ctx or get_context()).cmd("flatpak", "update"),
+                              stdout=log, stderr=subprocess.STDOUT if log else None)
         return True
     except Exception:
         return False
 
-def upgrade() -> bool:
+def upgrade(ctx: PlatformContext | None = None, log=None) -> bool:
     """
     Alias for `update` in Flatpak context.
     """
-    return update()
+    return update(ctx, log)
 
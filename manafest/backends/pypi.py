@@ -1,52 +1,153 @@
 import xmlrpc.client
 import logging
+import os
+import site
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from manafest.utils import http, pydist
+from manafest.utils.cache import fingerprint_paths
+from manafest.utils.context import get_context
 
 PYPI_RPC = "https://pypi.org/pypi"
+# MANAFEST_PYPI_URL points the JSON API at a mirror or a local stand-in index
+PYPI_URL = os.environ.get("MANAFEST_PYPI_URL", "https://pypi.org/pypi").rstrip("/")
+PYPI_JSON = PYPI_URL + "/{name}/json"
+INFO_MAX_AGE = 3600
+
+
+def fingerprint(ctx=None):
+    """
+    Changes whenever a distribution is added to or removed from site-packages.
+    """
+    return fingerprint_paths(site.getsitepackages() + [site.getusersitepackages()])
 
 
-def search(query):
+def search(query, ctx=None):
     """
     Use the PyPI XML-RPC interface to search on package name.
     Returns a list of package names (max 10).
     """
     try:
-        client = xmlrpc.client.ServerProxy(PYPI_RPC)
-        hits = client.search({"name": query}, "or")
+        body = xmlrpc.client.dumps(({"name": query}, "or"), "search")
+        out = http.post(PYPI_RPC, body.encode(), headers={"Content-Type": "text/xml"})
+        (hits,), _ = xmlrpc.client.loads(out)
         return [hit["name"] for hit in hits[:10]]
     except Exception as e:
         logging.debug(f"PyPI search failed for {query!r}: {e}")
         return []
 
 
-def info(name):
+def info(name, ctx=None, target=None):
     """
-    Fetch metadata for a single package.
+    Metadata for a single package: read from site-packages when installed
+    (no subprocess, no network), else the latest release from the JSON API.
     """
+    local = pydist.get(name, target)
+    if local:
+        return local
     try:
-        client = xmlrpc.client.ServerProxy(PYPI_RPC)
-        data = client.release_data(name, client.package_releases(name)[0])
-        return data
+        return http.get_json(PYPI_JSON.format(name=name), max_age=INFO_MAX_AGE)["info"]
     except Exception:
         return {}
 
 
-def install(name):
+def installed(name, ctx=None, target=None):
+    """
+    True if `name` is installed for the running (or `target`) interpreter.
+    """
+    return pydist.get(name, target) is not None
+
+
+def list_installed(ctx=None, target=None):
+    """
+    {normalized name: metadata} for every installed distribution.
+    """
+    return pydist.list_all(target)
+
+
+def catalog(ctx=None):
+    """
+    (name, summary) of the installed distributions; PyPI itself is too
+    large to mirror for suggestions.
+    """
+    return ((meta["name"], meta["summary"]) for meta in pydist.list_all().values())
+
+
+def install(name, ctx=None):
     try:
         import subprocess
 
-        subprocess.run(["pip", "install", name], check=True)
+        subprocess.run((ctx or get_context()).cmd("pypi", "install", name), check=True)
         return {"module": name}
     except Exception as e:
         logging.debug(f"PyPI install failed: {e}")
         return {}
 
 
-def remove(name):
+def remove(name, ctx=None):
     try:
         import subprocess
 
-        subprocess.run(["pip", "uninstall", "-y", name], check=True)
+        subprocess.run((ctx or get_context()).cmd("pypi", "remove", name), check=True)
         return True
     except Exception as e:
         logging.debug(f"PyPI remove failed: {e}")
         return False
+
+
+def _latest(name):
+    return http.get_json(PYPI_JSON.format(name=name), max_age=INFO_MAX_AGE)["info"]["version"]
+
+
+def outdated(ctx=None):
+    """
+    Installed distributions with a newer release on PyPI, as
+    (stale, failed): stale holds dicts {name, version, latest}, failed the
+    names whose lookup failed. Raises RuntimeError when every lookup fails.
+    Versions are read in-process and the index is queried concurrently over
+    the shared HTTP pool.
+    """
+    from packaging.version import InvalidVersion, Version
+
+    dists = pydist.list_all().values()
+    with ThreadPoolExecutor(max_workers=http.HOST_LIMIT) as pool:
+        futures = {d["name"]: pool.submit(_latest, d["name"]) for d in dists}
+
+    latest, failed = {}, []
+    for name, future in futures.items():
+        try:
+            latest[name] = future.result()
+        except Exception as e:
+            logging.debug(f"PyPI lookup failed for {name!r}: {e}")
+            failed.append(name)
+    if futures and not latest:
+        raise RuntimeError(f"could not reach the PyPI index at {PYPI_URL}")
+
+    stale = []
+    for dist in dists:
+        name, version = dist["name"], dist["version"]
+        newest = latest.get(name)
+        if not newest:
+            continue
+        try:
+            if Version(newest) > Version(version):
+                stale.append({"name": name, "version": version, "latest": newest})
+        except InvalidVersion:
+            continue
+    return stale, failed
+
+
+def upgrade_packages(names, ctx=None, log=None):
+    """
+    Upgrade `names` in a single pip resolver run.
+    """
+    if not names:
+        return True
+    cmd = (ctx or get_context()).cmd("pypi", "upgrade") + list(names)
+    try:
+        subprocess.check_call(cmd, stdout=log, stderr=subprocess.STDOUT if log else None)
+        return True
+    except Exception as e:
+        logging.debug(f"PyPI upgrade failed: {e}")
+        return False
@@ -1,14 +1,220 @@
-import pkgutil, importlib
-from manafest.utils.osdetect import get_os
+# manafest/backends/registry.py
+"""
+Backend plugin registry.
 
-BACKENDS = {}
-for _, modname, _ in pkgutil.iter_modules(__path__):
-    mod = importlib.import_module(f"manafest.backends.{modname}")
-    BACKENDS[mod.name] = mod
+Backends are found through the "manafest.backends" entry-point group
+(name = module), plus the built-in ones when manafest runs from a source
+tree. What each backend declares (supported_os, distros, requires,
+requires_env, and which protocol functions it has) is read once by
+importing it, and kept in a manifest in the cache dir. The manifest is
+rebuilt only when a distribution is installed, upgraded or removed or a
+built-in module changes, so listing backends and checking their
+capabilities never imports them. A module is imported only by load().
+"""
+import importlib
+import json
+import logging
+import os
+import sys
+from pathlib import Path
 
-def get_available_backends(force=False):
-    osname = get_os()
-    for name,mod in BACKENDS.items():
-        if osname in mod.supported_os or force:
-            yield name, mod
+from manafest.utils.cache import cache_dir, fingerprint_paths
 
+logger = logging.getLogger(__name__)
+
+GROUP = "manafest.backends"
+MANIFEST = "plugins.json"
+MANIFEST_VERSION = 3
+
+BUILTIN = {
+    "default": "manafest.backends.default",
+    "aur": "manafest.backends.aur",
+    "flatpak": "manafest.backends.flatpak",
+    "snap": "manafest.backends.snap",
+    "pypi": "manafest.backends.pypi",
+    "webrepo": "manafest.backends.webrepo",
+}
+ACTIONS = ("fingerprint", "search", "info", "install", "remove",
+           "update", "upgrade", "catalog", "installed")
+
+_manifest = None
+_manifest_key = None
+
+
+def _site_dirs() -> list[str]:
+    # sys.path[0] is the script's dir (the cwd under -m): where manafest was
+    # started from, not where distributions are installed
+    paths = sys.path if getattr(sys.flags, "safe_path", False) else sys.path[1:]
+    return [p for p in paths if p and os.path.isdir(p)]
+
+
+def _key() -> str:
+    """
+    Changes when a distribution is installed, upgraded or removed (its
+    name-version.dist-info dir comes or goes), a distribution's entry
+    points are rewritten, or a built-in backend is edited.
+    """
+    here = Path(__file__).parent
+    paths = []
+    for site in _site_dirs():
+        try:
+            entries = sorted(os.listdir(site))
+        except OSError:
+            continue
+        paths += [os.path.join(site, entry, "entry_points.txt") for entry in entries
+                  if entry.endswith((".dist-info", ".egg-info"))]
+    paths += [here / f"{mod.rsplit('.', 1)[1]}.py" for mod in BUILTIN.values()]
+    return f"{MANIFEST_VERSION}:{fingerprint_paths(paths)}"
+
+
+def _discover() -> dict:
+    """
+    {name: (module, attr, distribution)} for built-ins and entry points;
+    an installed plugin may replace a built-in of the same name.
+    """
+    found = {name: (mod, None, None) for name, mod in BUILTIN.items()}
+    from importlib.metadata import distributions
+    eps, seen = [], set()
+    for dist in distributions(path=_site_dirs()):
+        dist_name = dist.metadata["Name"]
+        if dist_name in seen:
+            continue        # shadowed by an earlier sys.path entry
+        seen.add(dist_name)
+        eps += [(ep, f"{dist_name} {dist.version}") for ep in dist.entry_points
+                if ep.group == GROUP]
+    for ep, dist in sorted(eps, key=lambda item: item[0].name):
+        if found.get(ep.name, (None,))[0] not in (None, ep.module):
+            logger.debug(f"backend {ep.name}: {ep.value} replaces {found[ep.name][0]}")
+        found[ep.name] = (ep.module, ep.attr, dist)
+    return found
+
+
+def _describe(module: str, attr: str | None) -> dict:
+    import inspect
+    mod = importlib.import_module(module)
+    if attr:
+        mod = getattr(mod, attr)
+    actions = [a for a in ACTIONS if callable(getattr(mod, a, None))]
+    return {
+        "supported_os": list(getattr(mod, "supported_os", None) or []),
+        "distros": list(getattr(mod, "distros", None) or []),
+        "requires": list(getattr(mod, "requires", None) or []),
+        "requires_env": list(getattr(mod, "requires_env", None) or []),
+        "actions": actions,
+        "async": [a for a in actions
+                  if inspect.iscoroutinefunction(getattr(mod, a))
+                  or inspect.isasyncgenfunction(getattr(mod, a))],
+    }
+
+
+def _build(key: str) -> dict:
+    backends = {}
+    for name, (module, attr, dist) in _discover().items():
+        entry = {"module": module, "attr": attr, "dist": dist}
+        try:
+            entry.update(_describe(module, attr))
+        except Exception as e:
+            # listed, but never offered: a broken plugin must not break the rest
+            logger.debug(f"backend {name} ({module}) failed to load: {e}")
+            entry["error"] = f"{type(e).__name__}: {e}"
+        backends[name] = entry
+    data = {"key": key, "backends": backends}
+    path = cache_dir() / MANIFEST
+    tmp = path.with_suffix(".tmp")
+    try:
+        tmp.write_text(json.dumps(data, indent=1))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug(f"could not save backend manifest: {e}")
+    return data
+
+
+def manifest() -> dict:
+    """
+    {name: capabilities} for every discovered backend, from the cached
+    manifest while it is current.
+    """
+    global _manifest, _manifest_key
+    if _manifest is None:
+        key = _key()
+        try:
+            data = json.loads((cache_dir() / MANIFEST).read_text())
+        except (OSError, ValueError):
+            data = None
+        if not data or data.get("key") != key:
+            data = _build(key)
+        _manifest, _manifest_key = data["backends"], key
+    return _manifest
+
+
+def refresh() -> bool:
+    """
+    Forget the loaded manifest if a distribution or built-in backend has
+    changed since it was read, for processes that outlive an install
+    (the daemon). True if it was dropped.
+    """
+    global _manifest
+    if _manifest is None or _key() == _manifest_key:
+        return False
+    _manifest = None
+    return True
+
+
+def names() -> list[str]:
+    """
+    Usable backends: built-ins first, then plugins by name.
+    """
+    return [name for name, entry in manifest().items() if "error" not in entry]
+
+
+def get(name: str) -> dict:
+    entry = manifest().get(name)
+    if entry is None:
+        raise ValueError(f"unknown backend '{name}' (have: {', '.join(names())})")
+    if "error" in entry:
+        raise ValueError(f"backend '{name}' failed to load: {entry['error']}")
+    return entry
+
+
+def has(name: str, action: str) -> bool:
+    """
+    Whether backend `name` implements `action`, without importing it.
+    """
+    entry = manifest().get(name)
+    return bool(entry) and action in entry.get("actions", ())
+
+
+def load(name: str):
+    """
+    The backend module (imported on first use).
+    """
+    entry = get(name)
+    mod = importlib.import_module(entry["module"])
+    return getattr(mod, entry["attr"]) if entry.get("attr") else mod
+
+
+def runnable(name: str, ctx) -> bool:
+    """
+    Whether backend `name` can run here: a supported OS, the binaries it
+    requires (flatpak, snap, …) on PATH and its settings in the environment.
+    """
+    import shutil
+    entry = get(name)
+    if entry["supported_os"] and ctx.os not in entry["supported_os"]:
+        return False
+    if not all(os.environ.get(var) for var in entry["requires_env"]):
+        return False
+    return all(ctx.has(b) or shutil.which(b) for b in entry["requires"])
+
+
+def supports_distro(name: str, distro: str | None) -> bool:
+    distros = get(name)["distros"]
+    return not distros or distro in distros
+
+
+def available(ctx, force: bool = False) -> list[str]:
+    """
+    Backends usable on this platform; force ignores distro restrictions.
+    """
+    return [name for name in names()
+            if runnable(name, ctx) and (force or supports_distro(name, ctx.distro))]
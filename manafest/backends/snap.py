@@ -1,72 +1,85 @@
 # manafest/backends/snap.py
+#
+# Written against the async backend protocol (see manafest.backends):
+# every `snap` call runs on the shared event loop.
 
-import subprocess
 import logging
+import hashlib
+import os
+
+from manafest.utils.context import PlatformContext, get_context
+from manafest.utils.osdetect import SYSROOT
+from manafest.utils.proc import run_async, stream_lines_async
+
+supported_os = ("linux",)
+requires = ("snap",)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-def search(query: str) -> list[dict]:
+SNAPS_DIR = SYSROOT / "var/lib/snapd/snaps"
+
+def fingerprint(ctx: PlatformContext | None = None) -> str:
     """
-    Snap search: parse lines of `snap find <query>`.
+    Digest of the installed snap revisions (<name>_<rev>.snap files).
     """
     try:
-        out = subprocess.check_output(
-            ["snap", "find", query],
-            stderr=subprocess.DEVNULL,
-            timeout=20
-        ).decode().splitlines()
-    except Exception:
-        return []
+        revisions = sorted(os.listdir(SNAPS_DIR))
+    except OSError:
+        revisions = []
+    return hashlib.sha1("\n".join(revisions).encode()).hexdigest()
 
-    results = []
-    for line in out:
-        # skip header and empty lines
-        if not line.strip() or line.startswith("Name"):
-            continue
-        parts = [p for p in line.split() if p]
-        # Format: Name     Version  Publisher   Notes  Summary
-        name    = parts[0]
-        version = parts[1] if len(parts) > 1 else ""
-        summary = " ".join(parts[4:]) if len(parts) > 4 else ""
-        results.append({
-            "name": name,
-            "version": version,
-            "arch": "",       # snap is arch-agnostic
-            "summary": summary
-        })
-    return results
+async def search(query: str, ctx: PlatformContext | None = None):
+    """
+    Snap search: parse lines of `snap find <query>` as they arrive.
+    """
+    cmd = (ctx or get_context()).cmd("snap", "search", query)
+    try:
+        async for line in stream_lines_async(cmd):
+            # skip header and empty lines
+            if not line.strip() or line.startswith("Name"):
+                continue
+            parts = [p for p in line.split() if p]
+            # Format: Name     Version  Publisher   Notes  Summary
+            yield {
+                "name": parts[0],
+                "version": parts[1] if len(parts) > 1 else "",
+                "arch": "",       # snap is arch-agnostic
+                "summary": " ".join(parts[4:]) if len(parts) > 4 else ""
+            }
+    except Exception as e:
+        logger.debug("Snap search failed %s → %s", cmd, e)
 
-def install(name: str) -> bool:
-    cmd = ["sudo", "snap", "install", name]
+async def install(name: str, ctx: PlatformContext | None = None) -> bool:
+    cmd = (ctx or get_context()).cmd("snap", "install", name)
     try:
-        subprocess.check_call(cmd)
-        return True
+        code, _ = await run_async(cmd)
+        return code == 0
     except Exception as e:
         logger.debug("Snap install failed %s → %s", cmd, e)
         return False
 
-def remove(name: str) -> bool:
-    cmd = ["sudo", "snap", "remove", name]
+async def remove(name: str, ctx: PlatformContext | None = None) -> bool:
+    cmd = (ctx or get_context()).cmd("snap", "remove", name)
     try:
-        subprocess.check_call(cmd)
-        return True
+        code, _ = await run_async(cmd)
+        return code == 0
     except Exception as e:
         logger.debug("Snap remove failed %s → %s", cmd, e)
         return False
 
-def info(name: str) -> dict:
+async def info(name: str, ctx: PlatformContext | None = None) -> dict:
     """
     snap info <name>
     """
     try:
-        out = subprocess.check_output(
-            ["snap", "info", name],
-            stderr=subprocess.DEVNULL,
-            timeout=20
-        ).decode().splitlines()
+        code, raw = await run_async((ctx or get_context()).cmd("snap", "info", name),
+                                    timeout=20, capture=True)
     except Exception:
         return {}
+    if code != 0:
+        return {}
+    out = raw.decode("utf-8", "replace").splitlines()
     data = {}
     for l in out:
         if l.startswith("name:"):
@@ -78,18 +91,18 @@ def info(name: str) -> dict:
     data.setdefault("arch", "")  # snaps run containerized
     return data
 
-def update() -> bool:
+async def update(ctx: PlatformContext | None = None, log=None) -> bool:
     """
     `snap refresh` updates all snaps.
     """
     try:
-        subprocess.check_call(["sudo", "snap", "refresh"])
-        return True
+        code, _ = await run_async((ctx or get_context()).cmd("snap", "update"), log=log)
+        return code == 0
     except Exception:
         return False
 
-def upgrade() -> bool:
+async def upgrade(ctx: PlatformContext | None = None, log=None) -> bool:
     """
     alias of update for snaps
     """
-    return update()
+    return await update(ctx, log)
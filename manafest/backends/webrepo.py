@@ -1,15 +1,88 @@
+# manafest/backends/webrepo.py
+#
+# Packages from an HTTP repository (our app store) at $MANAFEST_WEBREPO_URL.
+# search/info are answered from a local copy of its index (utils/webindex);
+# a package's artifact is an install script, downloaded into the shared
+# artifact cache (utils/download) and checked against its sha256 before
+# it is run.
+
+import logging
+import os
+import subprocess
+from urllib.parse import urljoin
+
+from manafest.utils import webindex
+from manafest.utils.context import PlatformContext
+
 name = "webrepo"
-supported_os = ("linux","macos","windows")
-actions = ("search","install","info")
+supported_os = ("linux", "macos", "windows")
+requires_env = ("MANAFEST_WEBREPO_URL",)
+
+logger = logging.getLogger(__name__)
+
+
+def _base() -> str:
+    return os.environ.get("MANAFEST_WEBREPO_URL", "").rstrip("/")
+
+
+def fingerprint(ctx: PlatformContext | None = None) -> str | None:
+    """
+    The index revision (checked against the repository at most every
+    INDEX_TTL seconds).
+    """
+    rev = webindex.sync(_base())
+    return f"{_base()}@{rev}" if rev is not None else None
+
+
+def search(query: str, ctx: PlatformContext | None = None):
+    try:
+        return webindex.search(_base(), query)
+    except Exception as e:
+        logger.debug(f"webrepo search failed: {e}")
+        return []
+
+
+def info(name: str, ctx: PlatformContext | None = None) -> dict:
+    try:
+        return webindex.info(_base(), name) or {}
+    except Exception as e:
+        logger.debug(f"webrepo info failed: {e}")
+        return {}
+
 
-import aiohttp
-async def search(query):
-    # call some HTTP‐API for your “App Store”
-    async with aiohttp.ClientSession() as s:
-        j = await (await s.get(f"https://repo.example.com/api?search={query}")).json()
-    return [f"{pkg['id']}: {pkg['desc']}" for pkg in j["results"]]
+def install(name: str, ctx: PlatformContext | None = None) -> bool:
+    """
+    Fetch the package's install script into the artifact cache (verified
+    against its sha256) and run it with bash. Index entries without a
+    sha256 are refused unless MANAFEST_WEBREPO_UNVERIFIED is set.
+    """
+    from manafest.utils import download
+    pkg = info(name, ctx)
+    if not pkg.get("url"):
+        return False
+    url = urljoin(_base() + "/", pkg["url"])
+    if not pkg.get("sha256") and not os.environ.get("MANAFEST_WEBREPO_UNVERIFIED"):
+        logger.warning(f"{name} has no sha256 in the index, not installing"
+                       f" (set MANAFEST_WEBREPO_UNVERIFIED=1 to allow)")
+        return False
+    try:
+        path = download.fetch(url, pkg.get("sha256"), pkg.get("size"))
+    except download.ChecksumError as e:
+        logger.warning(f"{e}, not installing")
+        return False
+    except Exception as e:
+        logger.debug(f"webrepo download failed {url} → {e}")
+        return False
+    try:
+        return subprocess.run(["bash", str(path)]).returncode == 0
+    except Exception as e:
+        logger.debug(f"webrepo install failed {name} → {e}")
+        return False
 
-def install(pkgid):
-    # download & unpack, or shell out to `curl | sh`
-    return run_cmd(["bash","-c",f"curl -fsSL https://repo.example.com/install/{pkgid} | bash"])
 
+def catalog(ctx: PlatformContext | None = None):
+    try:
+        return webindex.catalog(_base())
+    except Exception as e:
+        logger.debug(f"webrepo catalog failed: {e}")
+        return []
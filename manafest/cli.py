@@ -1,16 +1,27 @@
 #!/usr/bin/env python3
 import sys
 import argparse
-from rich.console import Console
-from rich.text import Text
 
-from manafest.pkgmanager import (
-    install, search, remove,
-    list_installed, info,
-    update, upgrade
-)
+from manafest.utils.console import console
 
-console = Console()
+
+def _int_at_least(low: int, what: str):
+    """
+    argparse type for integers >= low.
+    """
+    def parse(text: str) -> int:
+        try:
+            value = int(text)
+        except ValueError:
+            value = None
+        if value is None or value < low:
+            raise argparse.ArgumentTypeError(f"expected {what}, got {text!r}")
+        return value
+    return parse
+
+
+_positive_int = _int_at_least(1, "a positive integer")
+_non_negative_int = _int_at_least(0, "0 or a positive integer")
 
 
 def parse_args():
@@ -32,6 +43,12 @@ def parse_args():
     parser.add_argument("--flatpak", action="store_true", help="Use Flatpak backend")
     parser.add_argument("--snap",    action="store_true", help="Use Snap backend")
     parser.add_argument("--pypi",    action="store_true", help="Use PyPI backend")
+    parser.add_argument(
+        "--backend",
+        action="append",
+        metavar="NAME",
+        help="Use backend NAME, e.g. one installed as a plugin (repeatable)"
+    )
 
     parser.add_argument(
         "--all",
@@ -43,14 +60,134 @@ def parse_args():
         action="store_true",
         help="Override backend‐OS checks (e.g. AUR on non-Arch)"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="For search: skip the local search result cache"
+    )
+    parser.add_argument(
+        "--limit",
+        type=_positive_int,
+        metavar="N",
+        help="For search: stop after N results per backend"
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="For search: one ranked table, duplicates across backends collapsed"
+    )
+    parser.add_argument(
+        "--top",
+        type=_positive_int,
+        default=20,
+        metavar="K",
+        help="For search --merge/--fuzzy: number of rows to show (default 20)"
+    )
+    parser.add_argument(
+        "--fuzzy",
+        action="store_true",
+        help="For search: typo-tolerant lookup in the local package name index"
+             " (built on first use; install/info suggest names from it once it exists)"
+    )
+
+    parser.add_argument(
+        "--format",
+        choices=["table", "json", "ndjson"],
+        default="table",
+        help="Output format: rich tables, one JSON array, or one JSON object per line"
+    )
+    parser.add_argument(
+        "--page-size",
+        type=_positive_int,
+        metavar="N",
+        help="For tables: rows formatted and printed per batch (default 50)"
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=_non_negative_int,
+        metavar="N",
+        help="For tables: rows shown before a '… N more' footer (default 200, 0 = all)"
+    )
+    parser.add_argument(
+        "--pager",
+        action="store_true",
+        help="For tables: page output through $PAGER (less) as it is produced"
+    )
+    parser.add_argument(
+        "-y", "--yes",
+        action="store_true",
+        help="For install/remove: do not ask for confirmation"
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="For search/info/list: run in-process even if manafestd is running"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-phase timings (backend calls, commands, rendering) at the end"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="With --profile: also write the spans as a Chrome trace (JSON)"
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="FILE",
+        help="Run the action under cProfile and write the stats to FILE"
+    )
 
     return parser.parse_args()
 
 
+def _start_profiling(args):
+    from manafest.utils import profile
+    if args.profile or args.trace:
+        profile.enable()
+    if args.cprofile:
+        import cProfile
+        prof = cProfile.Profile()
+        prof.enable()
+        return prof
+    return None
+
+
+def _finish_profiling(args, prof):
+    from manafest.utils import profile
+    if prof is not None:
+        prof.disable()
+        prof.dump_stats(args.cprofile)
+        console.print(f"[dim]cProfile stats written to {args.cprofile}"
+                      f" (python -m pstats {args.cprofile})[/dim]")
+    if profile.enabled():
+        profile.report(console)
+        if args.trace:
+            profile.write_trace(args.trace)
+            console.print(f"[dim]Trace written to {args.trace}[/dim]")
+
+
 def main():
     args = parse_args()
     force = args.force
+    if args.format != "table":
+        from manafest.utils.output import claim_stdout
+        claim_stdout()
+    elif args.page_size or args.max_rows is not None or args.pager:
+        from manafest.utils import render
+        render.configure(args.page_size, args.max_rows, args.pager)
+    profiling = args.profile or args.trace or args.cprofile
+    if not (profiling or args.no_daemon) and _via_daemon(args):
+        return
+    prof = _start_profiling(args)
+    try:
+        _run(args, force)
+    finally:
+        _finish_profiling(args, prof)
 
+
+def _sources(args) -> list[str]:
     # build list of chosen backends
     chosen = []
     if args.default: chosen.append("default")
@@ -58,12 +195,42 @@ def main():
     if args.flatpak: chosen.append("flatpak")
     if args.snap:    chosen.append("snap")
     if args.pypi:    chosen.append("pypi")
+    chosen += args.backend or []
 
-    all_backends = ["default", "aur", "flatpak", "snap", "pypi"]
     if args.all and args.action in ("search", "update", "upgrade"):
-        sources = all_backends
+        # built-ins plus any installed plugins
+        from manafest.backends import registry as plugins
+        sources = plugins.names()
     else:
         sources = chosen or ["default"]
+    return sources
+
+
+def _via_daemon(args) -> bool:
+    """
+    Answer through a running manafestd; False if there is none.
+    """
+    from manafest import client
+    try:
+        return client.run(args, _sources(args))
+    except KeyboardInterrupt:
+        console.print("\n[bold red]✖️ Operation cancelled by user[/bold red]")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"[bold red]Fatal error:[/] {e}")
+        sys.exit(1)
+
+
+def _run(args, force):
+    # imported after argparse so `--help` and bad usage stay cheap
+    from manafest.utils import profile
+    with profile.span("import"):
+        from manafest.pkgmanager import (
+            install, search, remove,
+            list_installed, info,
+            update, upgrade
+        )
+    sources = _sources(args)
 
     try:
         act = args.action
@@ -71,27 +238,28 @@ def main():
 
         if act == "install":
             # install(name, source, force)
-            install(tgt, sources[0], force)
+            install(tgt, sources[0], force, fmt=args.format, yes=args.yes)
 
         elif act == "search":
-            search(tgt, sources)
+            search(tgt, sources, use_cache=not args.no_cache, limit=args.limit,
+                   merge=args.merge, top=args.top, fuzzy=args.fuzzy, fmt=args.format)
 
         elif act == "remove":
-            remove(tgt)
+            remove(tgt, fmt=args.format, yes=args.yes)
 
         elif act == "list":
-            list_installed()
+            list_installed(fmt=args.format)
 
         elif act == "info":
-            info(tgt)
+            info(tgt, fmt=args.format)
 
         elif act == "update":
             # update(sources, force)
-            update(sources, force)
+            update(sources, force, fmt=args.format)
 
         elif act == "upgrade":
             # upgrade(sources, force)
-            upgrade(sources, force)
+            upgrade(sources, force, fmt=args.format)
 
     except KeyboardInterrupt:
         console.print("\n[bold red]✖️ Operation cancelled by user[/bold red]")
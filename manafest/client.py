@@ -0,0 +1,224 @@
+# manafest/client.py
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# bump when requests or replies change shape; a daemon speaking another
+# version is ignored and the CLI answers in-process
+PROTOCOL = 1
+CONNECT_TIMEOUT = 0.2
+
+# actions a running daemon can answer
+ACTIONS = ("search", "info", "list")
+
+
+def socket_path() -> Path:
+    """
+    $MANAFEST_SOCKET, else manafest/daemon.sock in $XDG_RUNTIME_DIR (or the
+    cache dir when there is no runtime dir).
+    """
+    if os.environ.get("MANAFEST_SOCKET"):
+        return Path(os.environ["MANAFEST_SOCKET"])
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if base:
+        return Path(base) / "manafest" / "daemon.sock"
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "manafest" / "daemon.sock"
+
+
+def connect(path: Path | None = None):
+    """
+    A connection to the daemon, or None if none is listening.
+    """
+    path = path or socket_path()
+    if not path.exists():
+        # the common case: no daemon, so don't even import socket
+        return None
+    import socket
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def request(action: str, **params):
+    """
+    Send one request; returns an iterator over the reply lines (records and
+    {"event": …} messages), or None if no compatible daemon answered.
+    """
+    sock = connect()
+    if sock is None:
+        return None
+    reader = sock.makefile("r", encoding="utf-8")
+    try:
+        sock.sendall(json.dumps({"protocol": PROTOCOL, "action": action,
+                                 "params": params}).encode() + b"\n")
+        first = reader.readline()
+        msg = json.loads(first) if first else None
+    except (OSError, ValueError):
+        msg = None
+    if msg is None or msg.get("event") == "unsupported":
+        reader.close()
+        sock.close()
+        return None
+    return _replies(msg, reader, sock)
+
+
+def _replies(first: dict, reader, sock):
+    try:
+        msg = first
+        while True:
+            if msg.get("event") == "error":
+                raise RuntimeError(msg.get("message") or "daemon error")
+            yield msg
+            if msg.get("event") == "end":
+                return
+            line = reader.readline()
+            if not line:
+                raise ConnectionError("daemon closed the connection")
+            msg = json.loads(line)
+    finally:
+        reader.close()
+        sock.close()
+
+
+def run(args, sources: list[str]) -> bool:
+    """
+    Answer search/info/list through the daemon. False (before printing
+    anything) when there is no daemon, so the caller runs it in-process.
+    """
+    if args.action not in ACTIONS or os.environ.get("MANAFEST_NO_DAEMON"):
+        return False
+    if args.action == "search":
+        if not args.target:
+            return False
+        replies = request("search", query=args.target, sources=sources,
+                          use_cache=not args.no_cache, limit=args.limit,
+                          merge=args.merge, top=args.top, fuzzy=args.fuzzy)
+    elif args.action == "info":
+        if not args.target:
+            return False
+        replies = request("info", name=args.target)
+    else:
+        replies = request("list")
+    if replies is None:
+        return False
+
+    if args.format != "table":
+        _write_records(args.format, replies)
+    elif args.action == "search":
+        _search_tables(args, replies)
+    elif args.action == "info":
+        _info_panels(args.target, replies)
+    else:
+        _list_table(replies)
+    return True
+
+
+def _write_records(fmt: str, replies):
+    from manafest.utils import output
+    with output.Writer(fmt) as out:
+        for msg in replies:
+            if msg.get("event") == "timeout":
+                print(f"manafest: {msg['source']} search timed out", file=sys.stderr)
+            elif "event" not in msg:
+                out.write(msg)
+
+
+def _records(replies):
+    """
+    Records up to the "end" event.
+    """
+    for msg in replies:
+        if msg.get("event") == "end":
+            return
+        if "event" not in msg:
+            yield msg
+
+
+def _lone(replies, state: dict):
+    """
+    A lone backend's records, up to its "done" or "timeout" event (which
+    sets state["timeout"]).
+    """
+    for msg in replies:
+        event = msg.get("event")
+        if event in ("done", "timeout", "end"):
+            state["timeout"] = event == "timeout"
+            return
+        if event is None:
+            yield msg
+
+
+def _search_tables(args, replies):
+    from manafest.utils import render
+    from manafest.utils.console import console
+
+    def title(src):
+        return f"[magenta]{src.capitalize()} Results[/magenta]"
+
+    with render.paging():
+        console.print(f"[bold cyan]🔍 Searching for [green]{args.target}[/green]…[/]\n")
+        if args.fuzzy or args.merge:
+            render.table(f"[magenta]Top results for {args.target}[/magenta]",
+                         render.MERGED_COLUMNS, map(render.merged_row, _records(replies)))
+            return
+
+        # rows of several backends interleave; each table is drawn once its
+        # backend reports done, except a lone backend, which streams
+        pending = {}
+        for msg in replies:
+            event = msg.get("event")
+            if event == "start":
+                if len(msg["sources"]) == 1:
+                    state = {}
+                    render.table(title(msg["sources"][0]), render.SEARCH_COLUMNS,
+                                 map(render.search_row, _lone(replies, state)),
+                                 status=lambda: "Timed out" if state.get("timeout") else None)
+            elif event == "done":
+                render.table(title(msg["source"]), render.SEARCH_COLUMNS,
+                             map(render.search_row, pending.pop(msg["source"], [])))
+            elif event == "timeout":
+                pending.pop(msg["source"], None)
+                render.table(title(msg["source"]), render.SEARCH_COLUMNS, [], empty="Timed out")
+            elif event is None:
+                pending.setdefault(msg["source"], []).append(msg)
+
+
+def _info_panels(name: str, replies):
+    from rich.panel import Panel
+    from manafest.utils.console import console
+
+    found = False
+    for msg in replies:
+        if msg.get("event") == "end":
+            names = msg.get("suggestions") or []
+            if not found:
+                console.print(f"[red]No info for [bold]{name}[/bold][/red]")
+            if names:
+                console.print(f"[yellow]Did you mean: {', '.join(names)}?[/yellow]")
+            continue
+        found = True
+        if msg.get("managed"):
+            title = f"[cyan]Local info: {name}[/cyan]"
+        else:
+            title = f"[magenta]{msg['source'].capitalize()}[/magenta]"
+        console.print(Panel.fit(json.dumps(msg, indent=2), title=title))
+
+
+def _list_table(replies):
+    from manafest.utils import render
+    with render.paging():
+        render.table(
+            "[bold]Installed by Manafest[/bold]", render.INSTALLED_COLUMNS,
+            (render.installed_row(p, p["source"], p.get("installed_at"))
+             for p in _records(replies)),
+            empty="No packages installed"
+        )
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# manafest/daemon.py
+"""
+manafestd: keeps platform detection, the package indexes and backend
+modules loaded and answers `search`, `info` and `list` over a Unix socket,
+so repeated queries skip interpreter start-up, detection and index loads.
+
+Requests and replies are one JSON object per line: the client sends
+{"protocol", "action", "params"}; the daemon answers with records (the
+--format ndjson schema) and {"event": …} messages, ending with "end".
+Answers come from the daemon's own environment (PATH, sysroot).
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+
+from manafest.client import PROTOCOL, ACTIONS, socket_path, connect
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_key = None
+_last_active = time.monotonic()
+
+
+def _context():
+    """
+    The warm PlatformContext, re-detected when PATH contents or os-release
+    change under the running daemon; the backend manifest likewise when a
+    plugin is installed, upgraded or removed.
+    """
+    global _key
+    from manafest.backends import registry as plugins
+    from manafest.utils import context
+    key = context._cache_key()
+    with _lock:
+        if key != _key:
+            context.get_context.cache_clear()
+            _key = key
+        if plugins.refresh():
+            logger.info("backend plugins changed, manifest reloaded")
+    return context.get_context()
+
+
+def _warm():
+    """
+    Load what the first request would otherwise pay for.
+    """
+    from manafest import pkgmanager
+    from manafest.backends import registry as plugins
+    from manafest.utils import debdb, pacmandb
+    try:
+        ctx = _context()
+        for src in plugins.names():
+            if not pkgmanager._runtime_missing(src, ctx):
+                pkgmanager._backend(src)
+        if ctx.distro == "arch":
+            pacmandb.load_index()
+        elif ctx.distro in ("debian", "ubuntu"):
+            debdb.load_index()
+        pkgmanager._fuzzy_index(ctx)
+    except Exception as e:
+        logger.debug(f"warm-up failed: {e}")
+    logger.info("manafestd ready")
+
+
+def _search(out, query: str, sources: list, use_cache: bool = True,
+            limit: int | None = None, merge: bool = False, top: int = 20,
+            fuzzy: bool = False):
+    from manafest import pkgmanager
+    ctx = _context()
+    active = [src for src in sources if not pkgmanager._runtime_missing(src, ctx)]
+    if fuzzy or merge:
+        pkgmanager._search_records(query, active, ctx, use_cache, limit, merge, top,
+                                   fuzzy, "ndjson", out.stream)
+        return {}
+
+    from manafest.utils import output
+    out.write({"event": "start", "sources": active})
+    results = pkgmanager._gather(query, active, ctx, use_cache, limit,
+                                 on_row=lambda src, pkg: out.write(output.record(pkg, src)))
+    for src, pkgs in results:
+        out.write({"event": "timeout" if pkgs is None else "done", "source": src})
+    return {}
+
+
+def _info(out, name: str):
+    from manafest import pkgmanager
+    ctx = _context()
+    if pkgmanager._info_records(name, "ndjson", out.stream):
+        return {}
+    return {"suggestions": pkgmanager._suggestions(name, ctx)}
+
+
+def _list(out):
+    from manafest import pkgmanager
+    pkgmanager._list_records("ndjson", out.stream)
+    return {}
+
+
+HANDLERS = {"search": _search, "info": _info, "list": _list}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        global _last_active
+        from manafest.utils import output
+        _last_active = time.monotonic()
+        stream = io.TextIOWrapper(self.wfile, encoding="utf-8")
+        out = output.Writer("ndjson", stream)
+        try:
+            req = json.loads(self.rfile.readline() or "null")
+            if (not isinstance(req, dict) or req.get("protocol") != PROTOCOL
+                    or req.get("action") not in ACTIONS):
+                out.write({"event": "unsupported", "protocol": PROTOCOL})
+                return
+            start = time.perf_counter()
+            try:
+                end = HANDLERS[req["action"]](out, **req.get("params", {}))
+            except (BrokenPipeError, ConnectionResetError):
+                raise
+            except Exception as e:
+                logger.exception(f"{req['action']} failed")
+                out.write({"event": "error", "message": str(e)})
+                return
+            logger.debug(f"{req['action']} in {(time.perf_counter() - start) * 1000:.1f} ms")
+            out.write(dict({"event": "end"}, **end))
+        except (BrokenPipeError, ConnectionResetError):
+            # the client went away (quit pager, Ctrl-C)
+            pass
+        except ValueError:
+            pass
+        finally:
+            _last_active = time.monotonic()
+            try:
+                out.close()
+                stream.detach()
+            except (OSError, ValueError):
+                pass
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    block_on_close = False
+
+
+def _bind(path) -> _Server:
+    """
+    Listen on path (mode 0600, parent 0700), replacing a stale socket but
+    refusing to start next to a live daemon.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    sock = connect(path)
+    if sock is not None:
+        sock.close()
+        raise SystemExit(f"manafestd: already running on {path}")
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    umask = os.umask(0o177)
+    try:
+        return _Server(str(path), _Handler)
+    finally:
+        os.umask(umask)
+
+
+def serve(path=None, idle_timeout: float = 0):
+    """
+    Serve until SIGTERM/SIGINT, or until idle for idle_timeout seconds
+    (0 = never).
+    """
+    path = path or socket_path()
+    server = _bind(path)
+    inode = os.stat(path).st_ino
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    threading.Thread(target=_warm, daemon=True).start()
+    logger.info(f"manafestd listening on {path}")
+    server.timeout = 1
+    try:
+        while not idle_timeout or time.monotonic() - _last_active < idle_timeout:
+            server.handle_request()
+        logger.info("manafestd idle, exiting")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        # only remove the socket if it is still ours
+        try:
+            if os.stat(path).st_ino == inode:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="manafestd",
+        description="Manafest daemon: answers search/info/list from warm caches"
+    )
+    parser.add_argument("--socket", metavar="PATH",
+                        help="Socket to listen on (default $XDG_RUNTIME_DIR/manafest/daemon.sock)")
+    parser.add_argument("--idle-timeout", type=float, default=0, metavar="SECONDS",
+                        help="Exit after this long without requests (default 0 = never)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format="%(levelname)s: %(message)s")
+    from pathlib import Path
+    serve(Path(args.socket) if args.socket else None, args.idle_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,73 +2,196 @@
 
 import subprocess
 import sys
-import asyncio
 import json
-import shutil
 import logging
+import itertools
+import time
 
-from pathlib import Path
-from datetime import datetime
-
-from rich.console import Console
-from rich.panel import Panel
-from rich.prompt import Prompt
-from rich.table import Table
-
+from manafest.utils import aio, output, profile
 from manafest.utils.errors import handle_errors
-from manafest.utils.cache import read_registry, write_registry
-from manafest.backends import default, aur, flatpak, snap, pypi
-from manafest.utils.osdetect import get_os, get_distro
+from manafest.utils.cache import (
+    get_search, put_search, invalidate_search,
+    get_meta, put_meta
+)
+from manafest.utils.registry import get_entry, put_entry, delete_entry, iter_entries
+from manafest.utils.console import console
+from manafest.utils.context import PlatformContext, get_context
 
 logger = logging.getLogger("manafest")
-console = Console()
-
-REGISTRY = Path(__file__).parent.parent / "registry.json"
-BACKENDS = {
-    "default": default,
-    "aur": aur,
-    "flatpak": flatpak,
-    "snap": snap,
-    "pypi": pypi
-}
 
-HAS_FLATPAK = shutil.which("flatpak") is not None
-HAS_SNAP    = shutil.which("snap")    is not None
+
+class _LazyRegistry:
+    """
+    The backend registry, imported on first use so that `list` never
+    loads the manafest.backends package.
+    """
+
+    def __getattr__(self, attr):
+        from manafest.backends import registry
+        return getattr(registry, attr)
+
+
+plugins = _LazyRegistry()
+
+# per-backend search deadlines (seconds), matching each backend's own timeout
+SEARCH_TIMEOUTS = {
+    "default": 20,
+    "aur": 60,
+    "flatpak": 20,
+    "snap": 20,
+    "pypi": 20,
+    "webrepo": 20
+}
 
 
-def _maybe_await(fn, *args, **kwargs):
-    out = fn(*args, **kwargs)
-    if asyncio.iscoroutine(out):
-        return asyncio.get_event_loop().run_until_complete(out)
-    return out
+def _backend(src: str):
+    return plugins.load(src)
+
+
+def _runtime_missing(src: str, ctx: PlatformContext) -> bool:
+    return not plugins.runnable(src, ctx)
+
+
+def _distro_blocked(src: str, ctx: PlatformContext, force: bool) -> bool:
+    # e.g. the AUR off Arch, unless --force
+    return not force and not plugins.supports_distro(src, ctx.distro)
+
+
+def _distros(src: str) -> str:
+    return "/".join(d.capitalize() for d in plugins.get(src)["distros"])
+
+
+def _info(src: str, name: str, ctx: PlatformContext) -> dict:
+    """
+    Backend info for name, reused until the backend's fingerprint changes
+    (or, for remote indexes, META_TTL passes).
+    """
+    if not plugins.has(src, "info"):
+        return {}
+    mod = _backend(src)
+    with profile.span("info", backend=src) as span:
+        fp = mod.fingerprint(ctx) if hasattr(mod, "fingerprint") else None
+        if fp:
+            hit = get_meta(src, name, fp)
+            if hit is not None:
+                span["cached"] = True
+                return hit
+        data = aio.call(mod.info, name, ctx) or {}
+        if fp and isinstance(data, dict) and data:
+            put_meta(src, name, fp, data)
+        return data
+
+
+def _found(meta: dict) -> bool:
+    # backends answer unknown names with {} or a "-" placeholder record
+    return bool(meta) and meta.get("version") not in (None, "", "-")
+
+
+def _fuzzy_index(ctx: PlatformContext):
+    """
+    The trigram index module, rebuilt first if any backend's catalog
+    changed (by fingerprint) or the index is older than a day. Only the
+    changed sources are fetched again; a source whose catalog fails keeps
+    the rows of the previous index and is retried on the next build.
+    """
+    from manafest.utils import trigram
+    srcs = [src for src in plugins.names()
+            if plugins.has(src, "catalog") and not _runtime_missing(src, ctx)]
+    sig = {}
+    for src in srcs:
+        mod = _backend(src)
+        sig[src] = mod.fingerprint(ctx) if hasattr(mod, "fingerprint") else None
+    if trigram.is_fresh(sig):
+        return trigram
+
+    stored = trigram.signature() or {}
+    current = time.time() - stored.get("_built", 0) < trigram.MAX_AGE
+    catalogs, built = {}, {}
+    with console.status("[cyan]Indexing package names…[/cyan]"), \
+            profile.span("index") as span:
+        for src in srcs:
+            if current and src in stored and stored[src] == sig[src]:
+                catalogs[src], built[src] = trigram.entries(src), sig[src]
+                continue
+            try:
+                with profile.span("catalog", backend=src):
+                    catalogs[src] = list(aio.call(_backend(src).catalog, ctx) or [])
+                built[src] = sig[src]
+            except Exception as e:
+                logger.debug(f"{src}.catalog failed: {e}")
+                if src in stored:
+                    # the old fingerprint makes the next build try again
+                    catalogs[src], built[src] = trigram.entries(src), stored[src]
+        try:
+            span["rows"] = trigram.build(catalogs, built)
+        except Exception as e:
+            logger.debug(f"trigram index build failed: {e}")
+    return trigram
+
+
+def _fuzzy(query: str, ctx: PlatformContext, sources=None, k: int = 10,
+           min_score: float = 0.3) -> list[dict]:
+    """
+    Fuzzy matches as merged rows {name, summary, sources}, best first.
+    """
+    try:
+        index = _fuzzy_index(ctx)
+        with profile.span("fuzzy") as span:
+            hits = index.query(query, k=k * 2, sources=sources, min_score=min_score)
+            span["rows"] = len(hits)
+    except Exception as e:
+        logger.debug(f"fuzzy lookup failed: {e}")
+        return []
+    rows = {}
+    for hit in hits:
+        row = rows.setdefault(hit["name"], {"name": hit["name"], "version": "",
+                                            "summary": hit["summary"], "sources": []})
+        row["sources"].append(hit["source"])
+        row["summary"] = row["summary"] or hit["summary"]
+    return list(rows.values())[:k]
+
+
+def _suggestions(name: str, ctx: PlatformContext, sources=None) -> list[str]:
+    # a miss only consults an index that --fuzzy (or the daemon) already
+    # built: building one means fetching every catalog, remote ones included
+    from manafest.utils import trigram
+    if trigram.signature() is None:
+        return []
+    # stricter than --fuzzy: a wrong suggestion is worse than none
+    rows = _fuzzy(name, ctx, sources, k=5, min_score=0.5)
+    return [row["name"] for row in rows if row["name"] != name]
+
+
+def _did_you_mean(name: str, ctx: PlatformContext, sources=None):
+    names = _suggestions(name, ctx, sources)
+    if names:
+        console.print(f"[yellow]Did you mean: {', '.join(names)}?[/yellow]")
 
 
 @handle_errors
-def install(name: str, source: str, force: bool = False):
+def install(name: str, source: str, force: bool = False,
+            fmt: str = "table", yes: bool = False):
     if not name:
         raise ValueError("install requires a package name")
+    from rich.panel import Panel
+    from rich.prompt import Prompt
+    ctx = get_context()
 
     # block missing runtimes
-    if source == "flatpak" and not HAS_FLATPAK:
-        return console.print("[red]Flatpak not installed[/red]")
-    if source == "snap"    and not HAS_SNAP:
-        return console.print("[red]Snap not installed[/red]")
-
-    # block AUR off-Arch
-    if source == "aur":
-        distro = get_distro() if get_os()=="linux" else None
-        if distro != "arch" and not force:
-            return console.print(
-                "[red]❌ AUR only on Arch-based systems. Use --force to override.[/red]"
-            )
+    if _runtime_missing(source, ctx):
+        output.emit(fmt, output.record({"name": name}, source, status="unavailable"))
+        return console.print(f"[red]{source.capitalize()} not installed[/red]")
+
+    # block distro-specific backends (AUR off-Arch)
+    if _distro_blocked(source, ctx, force):
+        output.emit(fmt, output.record({"name": name}, source, status="blocked"))
+        return console.print(
+            f"[red]❌ {source.capitalize()} only on {_distros(source)}-based systems."
+            f" Use --force to override.[/red]"
+        )
 
     # preview metadata
-    if source == "default":
-        meta = default.info(name)
-    elif hasattr(BACKENDS[source], "info"):
-        meta = _maybe_await(BACKENDS[source].info, name) or {}
-    else:
-        meta = {}
+    meta = _info(source, name, ctx)
 
     console.print(Panel.fit(
         "\n".join([
@@ -81,26 +204,26 @@ def install(name: str, source: str, force: bool = False):
         title="[cyan]Ready to Install[/cyan]",
         border_style="cyan"
     ))
-    if Prompt.ask("Proceed?", choices=["y","n"], default="n") != "y":
+    if not _found(meta):
+        console.print(f"[yellow]'{name}' not found in {source.capitalize()}.[/yellow]")
+        _did_you_mean(name, ctx, [source])
+    if not yes and Prompt.ask("Proceed?", choices=["y","n"], default="n") != "y":
+        output.emit(fmt, output.record(meta or {"name": name}, source, status="cancelled"))
         return console.print("[yellow]Cancelled[/yellow]")
 
     console.print(f"[cyan]Installing {name}...[/cyan]")
-    ok = _maybe_await(BACKENDS[source].install, name)
+    with profile.span("install", backend=source):
+        ok = aio.call(_backend(source).install, name, ctx)
     if not ok:
+        output.emit(fmt, output.record(meta or {"name": name}, source, status="failed"))
         return console.print(f"[red]❌ install failed[/red]")
 
-    # record registry
-    fresh = (default.info(name) if source=="default"
-             else _maybe_await(BACKENDS[source].info, name) or {})
+    # record registry (the install changed the fingerprint, so this is fresh)
+    fresh = _info(source, name, ctx)
     entry = fresh if isinstance(fresh, dict) and fresh else {"name":name}
 
-    reg = read_registry(REGISTRY)
-    reg[name] = {
-        "source": source,
-        "info": entry,
-        "installed_at": datetime.utcnow().isoformat()
-    }
-    write_registry(REGISTRY, reg)
+    put_entry(name, source, entry)
+    output.emit(fmt, output.record(entry, source, status="installed"))
 
     console.print(Panel.fit(
         f"[bold green]✔️ Installed {entry.get('name')} {entry.get('version','')}[/bold green]",
@@ -109,18 +232,22 @@ def install(name: str, source: str, force: bool = False):
 
 
 @handle_errors
-def remove(name: str):
+def remove(name: str, fmt: str = "table", yes: bool = False):
     if not name:
         raise ValueError("remove requires a package name")
-
-    reg = read_registry(REGISTRY)
-    if name in reg:
-        src = reg[name]["source"]
-        meta = (default.info(name) if src=="default" else reg[name]["info"])
-    elif default.installed(name):
+    from rich.panel import Panel
+    from rich.prompt import Prompt
+    ctx = get_context()
+
+    rec = get_entry(name)
+    if rec:
+        src = rec["source"]
+        meta = rec["info"]
+    elif _backend("default").installed(name, ctx):
         src = "default"
-        meta = default.info(name)
+        meta = _info("default", name, ctx)
     else:
+        output.emit(fmt, output.record({"name": name}, "", status="not-found"))
         return console.print(f"[red]❌ '{name}' not found[/red]")
 
     console.print(Panel.fit(
@@ -133,25 +260,33 @@ def remove(name: str):
         title="[magenta]Confirm Removal[/magenta]",
         border_style="magenta"
     ))
-    if Prompt.ask("Remove?", choices=["y","n"], default="n") != "y":
+    if not yes and Prompt.ask("Remove?", choices=["y","n"], default="n") != "y":
+        output.emit(fmt, output.record(meta, src, status="cancelled"))
         return console.print("[yellow]Aborted[/yellow]")
 
+    cmd = ctx.cmd(src, "remove", name)
+    if not cmd and not plugins.has(src, "remove"):
+        # e.g. webrepo: its install scripts come without an uninstaller
+        output.emit(fmt, output.record(meta, src, status="unsupported"))
+        return console.print(f"[red]❌ Removal is not supported for {src.capitalize()}"
+                             f" packages[/red]")
+
     console.print(f"[magenta]Removing {name}...[/magenta]")
-    if src == "default":
-        cmd = default._select_cmd("remove", name)
+    if cmd:
+        with profile.span("exec", backend=src, argv=cmd):
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE,
+                                  stderr=subprocess.STDOUT, stdin=sys.stdin, text=True)
+        success = proc.returncode == 0
+        snippet = "\n".join(proc.stdout.splitlines()[-5:])
     else:
-        cmd = BACKENDS[src]._select_cmd("remove", name)
-
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE,
-                          stderr=subprocess.STDOUT, stdin=sys.stdin, text=True)
-    logs = proc.stdout.splitlines()
-    success = proc.returncode == 0
-    snippet = "\n".join(logs[-5:])
+        # no command template: the backend removes it itself
+        with profile.span("remove", backend=src):
+            success = bool(aio.call(_backend(src).remove, name, ctx))
+        snippet = ""
+    output.emit(fmt, output.record(meta, src, status="removed" if success else "failed"))
 
     if success:
-        if name in reg and reg[name]["source"]==src:
-            reg.pop(name)
-            write_registry(REGISTRY, reg)
+        delete_entry(name, src)
         console.print(Panel.fit(
             f"[bold green]✔️ Removed {meta.get('name')} {meta.get('version')}[/bold green]\n\n{snippet}",
             border_style="green"
@@ -163,159 +298,425 @@ def remove(name: str):
         ))
 
 
-@handle_errors
-def search(query: str, sources: list[str]):
-    if not query:
-        raise ValueError("search requires a query")
+def _search_one(src: str, query: str, ctx: PlatformContext,
+                use_cache: bool = True, limit: int | None = None,
+                on_row=None) -> list:
+    """
+    One backend's results (cached when allowed); on_row(src, pkg) is
+    called for each row the moment the backend yields it.
+    """
+    with profile.span("search", backend=src) as span:
+        if use_cache:
+            hit = get_search(src, query, limit)
+            if hit is not None:
+                span.update(cached=True, rows=len(hit))
+                for p in hit if on_row else ():
+                    on_row(src, p)
+                return hit
+        rows = None
+        pkgs = []
+        try:
+            rows = iter(aio.call(_backend(src).search, query, ctx) or [])
+            # stop reading (and stop the child process) once we have enough
+            for p in itertools.islice(rows, limit):
+                pkgs.append(p)
+                if on_row:
+                    on_row(src, p)
+            complete = limit is None or len(pkgs) < limit
+        except Exception as e:
+            logger.debug(f"{src}.search failed: {e}")
+            return []
+        finally:
+            if hasattr(rows, "close"):
+                rows.close()
+        span["rows"] = len(pkgs)
+        # empty results are indistinguishable from failures, so don't keep them
+        if use_cache and pkgs:
+            put_search(src, query, pkgs, complete)
+        return pkgs
+
+
+def _render_results(src: str, pkgs, empty: str = "No results", status=None):
+    from manafest.utils import render
+    with profile.span("render", backend=src) as span:
+        span["rows"] = render.table(
+            f"[magenta]{src.capitalize()} Results[/magenta]", render.SEARCH_COLUMNS,
+            map(render.search_row, pkgs), empty=empty, status=status
+        )
 
-    console.print(f"[bold cyan]🔍 Searching for [green]{query}[/green]…[/]\n")
-    for src in sources:
-        if src=="flatpak" and not HAS_FLATPAK: continue
-        if src=="snap"    and not HAS_SNAP:    continue
 
+def _render_merged(query: str, rows: list[dict]):
+    from manafest.utils import render
+    with profile.span("render", rows=len(rows)):
+        render.table(
+            f"[magenta]Top results for {query}[/magenta]", render.MERGED_COLUMNS,
+            map(render.merged_row, rows)
+        )
+
+
+def _stream(src: str, query: str, ctx: PlatformContext,
+            use_cache: bool, limit: int | None, state: dict | None = None):
+    """
+    Yield one backend's rows while its search is still running, so the
+    first page can be drawn before the last row arrives. The hand-off
+    queue is bounded; at the backend's deadline the rows end and
+    state["timeout"] is set.
+    """
+    import queue
+    import threading
+    rows = queue.Queue(maxsize=1000)
+    done = object()
+
+    def run():
+        try:
+            _search_one(src, query, ctx, use_cache, limit, on_row=lambda _, p: rows.put(p))
+        finally:
+            rows.put(done)
+
+    threading.Thread(target=run, daemon=True).start()
+    deadline = time.monotonic() + SEARCH_TIMEOUTS.get(src, 20)
+    while True:
         try:
-            pkgs = BACKENDS[src].search(query) or []
+            p = rows.get(timeout=max(0, deadline - time.monotonic()))
+        except queue.Empty:
+            logger.debug(f"{src}.search timed out")
+            if state is not None:
+                state["timeout"] = True
+            return
+        if p is done:
+            return
+        yield p
+
+
+def _gather(query: str, active: list[str], ctx: PlatformContext,
+            use_cache: bool, limit: int | None, on_row=None):
+    """
+    Run every backend's search at once and yield (src, pkgs) as each
+    finishes; pkgs is None for a backend that missed its deadline.
+    """
+    import queue
+    import threading
+    finished = queue.Queue()
+
+    def run(src):
+        try:
+            pkgs = _search_one(src, query, ctx, use_cache, limit, on_row)
         except Exception as e:
             logger.debug(f"{src}.search failed: {e}")
             pkgs = []
+        finished.put((src, pkgs))
+
+    start = time.monotonic()
+    deadlines = {src: start + SEARCH_TIMEOUTS.get(src, 20) for src in active}
+    for src in active:
+        # daemon threads, like _stream: a backend hung past its deadline
+        # is abandoned and must not hold up interpreter exit
+        threading.Thread(target=run, args=(src,), name=f"search-{src}", daemon=True).start()
+    pending = set(active)
+    while pending:
+        now = time.monotonic()
+        for src in [src for src in active if src in pending and deadlines[src] <= now]:
+            pending.discard(src)
+            logger.debug(f"{src}.search timed out")
+            yield src, None
+        if not pending:
+            break
+        try:
+            src, pkgs = finished.get(timeout=min(deadlines[src] for src in pending) - now)
+        except queue.Empty:
+            continue
+        if src in pending:
+            pending.discard(src)
+            yield src, pkgs
 
-        table = Table(title=f"[magenta]{src.capitalize()} Results[/magenta]", show_lines=True)
-        table.add_column("Name", style="cyan", no_wrap=True)
-        table.add_column("Version", style="green")
-        table.add_column("Arch", style="yellow")
-        table.add_column("Summary", style="white")
 
-        if not pkgs:
-            table.add_row("-", "-", "-", "No results")
+@handle_errors
+def search(query: str, sources: list[str], use_cache: bool = True,
+           limit: int | None = None, merge: bool = False, top: int = 20,
+           fuzzy: bool = False, fmt: str = "table"):
+    if not query:
+        raise ValueError("search requires a query")
+
+    ctx = get_context()
+    active = [src for src in sources if not _runtime_missing(src, ctx)]
+    if fmt != "table":
+        return _search_records(query, active, ctx, use_cache, limit, merge, top, fuzzy, fmt)
+
+    from manafest.utils import render
+    with render.paging():
+        _search_tables(query, active, ctx, use_cache, limit, merge, top, fuzzy)
+
+
+def _search_tables(query: str, active: list[str], ctx: PlatformContext,
+                   use_cache: bool, limit: int | None, merge: bool, top: int,
+                   fuzzy: bool):
+    console.print(f"[bold cyan]🔍 Searching for [green]{query}[/green]…[/]\n")
+    if not active:
+        return
+
+    if fuzzy:
+        # answered from the local trigram index, typos included
+        return _render_merged(query, _fuzzy(query, ctx, active, k=top))
+
+    if len(active) == 1 and not merge:
+        # a single backend: draw pages as its rows arrive
+        state = {}
+        return _render_results(active[0], _stream(active[0], query, ctx, use_cache, limit, state),
+                               status=lambda: "Timed out" if state.get("timeout") else None)
+
+    results = _gather(query, active, ctx, use_cache, limit)
+    if merge:
+        # one ranked, de-duplicated table across all backends
+        from manafest.utils.rank import merge as merge_results
+        pairs = ((src, p) for src, pkgs in results for p in pkgs or [])
+        return _render_merged(query, merge_results(pairs, query, top))
+
+    # print each backend's table as soon as it lands
+    for src, pkgs in results:
+        if pkgs is None:
+            _render_results(src, [], empty="Timed out")
         else:
-            for p in pkgs:
-                if isinstance(p, dict):
-                    n=p.get("name","-"); v=p.get("version","-")
-                    a=p.get("arch","-");   s=p.get("summary","-")
-                else:
-                    n,v,a,s = p,"-","-","-"
-                table.add_row(n,v,a,s)
+            _render_results(src, pkgs)
+
+
+def _search_records(query: str, active: list[str], ctx: PlatformContext,
+                    use_cache: bool, limit: int | None, merge: bool, top: int,
+                    fuzzy: bool, fmt: str, stream=None) -> int:
+    """
+    search for --format json/ndjson: no rich, and unless results must be
+    ranked first, every row is written as soon as its backend yields it.
+    Returns the number of records written.
+    """
+    with output.Writer(fmt, stream) as out:
+        if fuzzy or merge:
+            if fuzzy:
+                rows = _fuzzy(query, ctx, active, k=top)
+            else:
+                from manafest.utils.rank import merge as merge_results
+                results = _gather(query, active, ctx, use_cache, limit)
+                pairs = ((src, p) for src, pkgs in results for p in pkgs or [])
+                rows = merge_results(pairs, query, top)
+            for row in rows:
+                out.write(output.record(row, row["sources"][0], sources=row["sources"]))
+            return out.count
+
+        def on_row(src, pkg):
+            out.write(output.record(pkg, src))
 
-        console.print(table); console.print()
+        for src, pkgs in _gather(query, active, ctx, use_cache, limit, on_row):
+            if pkgs is None:
+                print(f"manafest: {src} search timed out", file=sys.stderr)
+    return out.count
 
 
 @handle_errors
-def list_installed():
-    reg = read_registry(REGISTRY)
-    if not reg:
-        return console.print("[bold]No packages installed[/]")
-
-    table = Table(title="Installed by Manafest")
-    table.add_column("Name", style="cyan"); table.add_column("Version", style="green")
-    table.add_column("Arch", style="yellow"); table.add_column("Source", style="magenta")
-    table.add_column("When", style="white")
-    for pkg,data in reg.items():
-        info = data["info"]
-        table.add_row(
-            info.get("name",pkg),
-            info.get("version","-"),
-            info.get("arch","-"),
-            data["source"].capitalize(),
-            data.get("installed_at","-")
+def list_installed(fmt: str = "table"):
+    if fmt != "table":
+        return _list_records(fmt)
+    from manafest.utils import render
+    with render.paging(), profile.span("render") as span:
+        span["rows"] = render.table(
+            "[bold]Installed by Manafest[/bold]", render.INSTALLED_COLUMNS,
+            (render.installed_row(dict(data["info"], name=data["info"].get("name", pkg)),
+                                  data["source"], data.get("installed_at"))
+             for pkg, data in iter_entries()),
+            empty="No packages installed"
         )
-    console.print(table)
+
+
+def _list_records(fmt: str, stream=None) -> int:
+    with output.Writer(fmt, stream) as out:
+        for pkg, data in iter_entries():
+            out.write(output.record(dict(data["info"], name=data["info"].get("name", pkg)),
+                                    data["source"], installed_at=data["installed_at"]))
+    return out.count
 
 
 @handle_errors
-def info(name: str):
+def info(name: str, fmt: str = "table"):
     if not name:
         raise ValueError("info requires a package name")
+    if fmt != "table":
+        return _info_records(name, fmt)
+    from rich.panel import Panel
 
-    reg = read_registry(REGISTRY)
-    if name in reg:
+    rec = get_entry(name)
+    if rec:
         console.print(Panel.fit(
-            json.dumps(reg[name]["info"], indent=2),
+            json.dumps(rec["info"], indent=2),
             title=f"[cyan]Local info: {name}[/cyan]"
         ))
         return
 
     console.print(f"[cyan]Fetching info for [green]{name}[/green]…[/]")
-    for src,mod in BACKENDS.items():
-        if src=="flatpak" and not HAS_FLATPAK: continue
-        if src=="snap"    and not HAS_SNAP:    continue
-        if hasattr(mod,"info"):
+    ctx = get_context()
+    found = False
+    for src in plugins.names():
+        if _runtime_missing(src, ctx): continue
+        if plugins.has(src, "info"):
             try:
-                data = _maybe_await(mod.info, name) or {}
+                data = _info(src, name, ctx)
             except:
                 data = {}
             if not data:
                 console.print(f"[magenta]{src.capitalize()}[/magenta] [red]No info[/red]")
             else:
+                found = found or _found(data)
                 console.print(Panel.fit(
                     json.dumps(data, indent=2),
                     title=f"[magenta]{src.capitalize()}[/magenta]"
                 ))
-
-
-@handle_errors
-def update(sources: list[str], force: bool = False):
-    console.print(f"[yellow]🔄 Updating backends: {', '.join(sources)}[/yellow]")
-    for src in sources:
-        if src=="aur":
-            distro = get_distro() if get_os()=="linux" else None
-            if distro!="arch" and not force:
-                console.print("[red]❌ Skipping AUR (Arch only). --force to override[/red]")
+    if not found:
+        _did_you_mean(name, ctx)
+
+
+def _info_records(name: str, fmt: str, stream=None) -> int:
+    """
+    info for --format json/ndjson: the registry entry (managed: true) if
+    manafest installed the package, else one record per backend that knows
+    it (managed: false; the package may still be on the system).
+    """
+    with output.Writer(fmt, stream) as out:
+        rec = get_entry(name)
+        if rec:
+            out.write(output.record(rec["info"], rec["source"], managed=True))
+            return out.count
+        ctx = get_context()
+        for src in plugins.names():
+            if _runtime_missing(src, ctx):
                 continue
-        if src=="flatpak" and not HAS_FLATPAK: continue
-        if src=="snap"    and not HAS_SNAP:    continue
-
-        backend = BACKENDS[src]
-        if src=="pypi":
-            # pip-based update = list & upgrade outdated
             try:
-                out = subprocess.check_output(
-                    ["pip","list","--outdated","--format=json"],
-                    text=True, stderr=subprocess.DEVNULL
-                )
-                data = json.loads(out)
-                if not data:
-                    console.print("[green]All pip packages up-to-date[/green]")
-                else:
-                    console.print(f"[cyan]Upgrading {len(data)} pip packages...[/cyan]")
-                    for p in data:
-                        subprocess.check_call(["pip","install","--upgrade",p["name"]])
-                    console.print("[green]✔️ pip packages upgraded[/green]")
-                continue
+                data = _info(src, name, ctx)
             except Exception:
-                console.print("[red]❌ pip update failed[/red]")
-                continue
+                data = {}
+            if _found(data):
+                out.write(output.record(data, src, managed=False))
+    return out.count
 
-        if hasattr(backend, "update"):
-            ok = _maybe_await(backend.update)
-            label = src.capitalize()
-            console.print(f"[green]✔️ {label} updated[/green]" if ok
-                          else f"[red]❌ {label} update failed[/red]")
-        else:
-            console.print(f"[red]⚠️ {src.capitalize()} cannot update[/red]")
+
+@handle_errors
+def update(sources: list[str], force: bool = False, fmt: str = "table"):
+    console.print(f"[yellow]🔄 Updating backends: {', '.join(sources)}[/yellow]")
+    _run_backends("update", sources, force, fmt)
 
 
 @handle_errors
-def upgrade(sources: list[str], force: bool = False):
+def upgrade(sources: list[str], force: bool = False, fmt: str = "table"):
     console.print(f"[yellow]⬆️ Upgrading backends: {', '.join(sources)}[/yellow]")
+    _run_backends("upgrade", sources, force, fmt)
+
+
+def _update_pypi(ctx: PlatformContext, log) -> bool:
+    # pip-based update = find outdated & upgrade them in one pip run
+    backend = _backend("pypi")
+    with profile.span("outdated", backend="pypi"):
+        data, failed = backend.outdated(ctx)
+    if failed:
+        console.print(f"[yellow]⚠️ Could not check {len(failed)} pip packages"
+                      f" against the index[/yellow]")
+        log.write(f"Could not check {len(failed)} pip packages against the index: "
+                  f"{', '.join(failed)}\n")
+    if not data:
+        log.write("All other pip packages up-to-date\n" if failed
+                  else "All pip packages up-to-date\n")
+        return True
+    log.write(f"Upgrading {len(data)} pip packages: {', '.join(p['name'] for p in data)}\n")
+    log.flush()
+    with profile.span("upgrade", backend="pypi"):
+        return backend.upgrade_packages([p["name"] for p in data], ctx, log=log)
+
+
+def _job(action: str, src: str, ctx: PlatformContext):
+    """
+    The scheduler job for one backend: fn(log) -> bool.
+    """
+    def run(log) -> bool:
+        if src == "pypi":
+            ok = _update_pypi(ctx, log)
+        else:
+            with profile.span(action, backend=src):
+                ok = aio.call(getattr(_backend(src), action), ctx, log=log)
+        if ok:
+            invalidate_search(src)
+        return ok
+    return run
+
+
+def _run_backends(action: str, sources: list[str], force: bool, fmt: str):
+    """
+    update/upgrade every source, running backends that do not share a
+    package-manager lock at the same time; each one's output is captured
+    to a log and a summary is printed at the end.
+    """
+    from manafest.utils import schedule
+    ctx = get_context()
+    label = {"update": "updated", "upgrade": "upgraded"}[action]
+    statuses = {}
+    jobs = {}
     for src in sources:
-        if src=="aur":
-            distro = get_distro() if get_os()=="linux" else None
-            if distro!="arch" and not force:
-                console.print("[red]❌ Skipping AUR (Arch only). --force to override[/red]")
-                continue
-        if src=="flatpak" and not HAS_FLATPAK: continue
-        if src=="snap"    and not HAS_SNAP:    continue
-
-        backend = BACKENDS[src]
-        if src=="pypi":
-            # pip upgrade is same as update above
+        if _distro_blocked(src, ctx, force):
+            console.print(f"[red]❌ Skipping {src.capitalize()} ({_distros(src)} only)."
+                          f" --force to override[/red]")
+            statuses[src] = {"status": "skipped"}
+        elif _runtime_missing(src, ctx):
+            statuses[src] = {"status": "unavailable"}
+        elif src=="pypi" and action=="upgrade":
+            # pip upgrade is same as update
             # already done in update()
             continue
-
-        if hasattr(backend, "upgrade"):
-            ok = _maybe_await(backend.upgrade)
-            label = src.capitalize()
-            console.print(f"[green]✔️ {label} upgraded[/green]" if ok
-                          else f"[red]❌ {label} upgrade failed[/red]")
+        elif src!="pypi" and not plugins.has(src, action):
+            console.print(f"[red]⚠️ {src.capitalize()} cannot {action}[/red]")
+            statuses[src] = {"status": "unsupported"}
         else:
-            console.print(f"[red]⚠️ {src.capitalize()} cannot upgrade[/red]")
+            jobs[src] = _job(action, src, ctx)
+
+    lanes = schedule.groups(list(jobs), ctx)
+    argvs = [ctx.cmd(src, action) for src in jobs]
+    if "aur" in jobs:
+        # AUR helpers call sudo themselves
+        argvs.append(["sudo"])
+    schedule.prime_sudo(argvs)
+
+    def done(src, result):
+        name = src.capitalize()
+        console.print(f"[green]✔️ {name} {label}[/green] [dim]({result['seconds']}s)[/dim]"
+                      if result["status"] == "ok"
+                      else f"[red]❌ {name} {action} failed[/red] [dim](see {result['log']})[/dim]")
+
+    if jobs:
+        running = ", ".join(" → ".join(lane) for lane in lanes)
+        with console.status(f"[cyan]Running {action}: {running}…[/cyan]"):
+            statuses.update(schedule.run(jobs, lanes, action, on_done=done))
+
+    with output.Writer(fmt) as out:
+        for src in sources:
+            if src in statuses:
+                out.write(dict({"source": src, "action": action}, **statuses[src]))
+    if fmt == "table" and jobs:
+        _render_summary(action, sources, statuses)
+
+
+def _render_summary(action: str, sources: list[str], statuses: dict):
+    from rich.markup import escape
+    from rich.table import Table
+    from manafest.utils import schedule
+    styles = {"ok": "green", "failed": "red"}
+    table = Table(title=f"[magenta]{action.capitalize()} summary[/magenta]")
+    table.add_column("Backend", style="cyan")
+    table.add_column("Status")
+    table.add_column("Time", justify="right")
+    table.add_column("Log", style="dim", overflow="fold")
+    for src in sources:
+        if src not in statuses:
+            continue
+        r = statuses[src]
+        style = styles.get(r["status"], "yellow")
+        table.add_row(src.capitalize(), f"[{style}]{r['status']}[/{style}]",
+                      f"{r['seconds']}s" if "seconds" in r else "-", r.get("log", "-"))
+    console.print(table)
+    for src in sources:
+        r = statuses.get(src, {})
+        if r.get("status") == "failed":
+            console.print(f"[red]{src.capitalize()}[/red] (last lines of {r['log']}):")
+            for line in schedule.tail(r["log"]):
+                console.print(f"  [dim]{escape(line)}[/dim]", highlight=False)
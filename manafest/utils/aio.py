@@ -0,0 +1,125 @@
+# manafest/utils/aio.py
+
+import atexit
+import logging
+import threading
+import types
+
+from manafest.utils import profile
+
+logger = logging.getLogger(__name__)
+
+# the shared loop and its thread; asyncio is only imported once a
+# coroutine shows up
+_loop = None
+_thread = None
+_lock = threading.Lock()
+
+
+def loop():
+    """
+    The process-wide event loop, running on a daemon thread from first use.
+    Every coroutine backend call is scheduled here, so async backends
+    overlap their I/O no matter which worker thread asked.
+    """
+    global _loop, _thread
+    with _lock:
+        if _loop is None:
+            import asyncio
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="manafest-aio",
+                                       daemon=True)
+            _thread.start()
+    return _loop
+
+
+def run(coro, timeout: float | None = None):
+    """
+    Run a coroutine on the shared loop and wait for its result. Safe from
+    any thread except the loop's own. If the wait ends early (timeout,
+    Ctrl-C) the coroutine is cancelled, so its cleanup still runs.
+    """
+    import asyncio
+    target = loop()
+    if threading.current_thread().name == "manafest-aio":
+        coro.close()
+        raise RuntimeError("aio.run() called from the event loop thread")
+    if profile.enabled():
+        coro = _bound(coro, profile.current_backend())
+    future = asyncio.run_coroutine_threadsafe(coro, target)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def shutdown(timeout: float = 5):
+    """
+    Cancel whatever still runs on the shared loop, let it clean up (async
+    backends kill their children) and stop the loop. Registered at exit;
+    the next run() starts a new loop.
+    """
+    global _loop, _thread
+    with _lock:
+        target, thread = _loop, _thread
+        _loop = _thread = None
+    if target is None:
+        return
+    import asyncio
+
+    async def cancel_all():
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await target.shutdown_asyncgens()
+
+    try:
+        asyncio.run_coroutine_threadsafe(cancel_all(), target).result(timeout)
+    except Exception as e:
+        logger.debug(f"event loop shutdown: {e!r}")
+    target.call_soon_threadsafe(target.stop)
+    thread.join(timeout)
+    if not thread.is_alive():
+        target.close()
+
+
+atexit.register(shutdown)
+
+
+async def _bound(coro, backend):
+    # runs as its own task, so the binding stays with this coroutine
+    profile.bind_backend(backend)
+    return await coro
+
+
+def iterate(agen):
+    """
+    Sync iterator over an async generator driven on the shared loop.
+    Closing it (or leaving the loop early) closes the generator, so the
+    backend's cleanup (e.g. killing a child process) still runs.
+    """
+    try:
+        while True:
+            try:
+                item = run(agen.__anext__())
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        run(agen.aclose())
+
+
+def call(fn, *args, **kwargs):
+    """
+    Call a backend function that may be sync or async: coroutines are run
+    on the shared loop, async generators come back as sync iterators, and
+    anything else is returned as is.
+    """
+    out = fn(*args, **kwargs)
+    if isinstance(out, types.CoroutineType):
+        return run(out)
+    if isinstance(out, types.AsyncGeneratorType):
+        return iterate(out)
+    return out
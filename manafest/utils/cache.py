@@ -1,12 +1,171 @@
+import hashlib
 import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
 
+logger = logging.getLogger(__name__)
 
-def read_registry(path):
+CACHE_DB = "cache.sqlite"
+CACHE_SCHEMA = 3
+SEARCH_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# seconds a cached search stays fresh, per backend
+SEARCH_TTL = {
+    "default": 6 * 3600,
+    "aur": 3600,
+    "flatpak": 6 * 3600,
+    "snap": 6 * 3600,
+    "pypi": 3600,
+    "webrepo": 300
+}
+
+# seconds cached info stays fresh when it comes from a remote index the
+# backend's fingerprint cannot see change; others follow the fingerprint only
+META_TTL = {
+    "aur": 3600,
+    "snap": 6 * 3600,
+    "pypi": 3600,
+}
+
+
+def cache_dir() -> Path:
+    """
+    Per-user cache directory ($XDG_CACHE_HOME/manafest), created on demand.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    path = Path(base) / "manafest"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _cache_db():
+    conn = sqlite3.connect(cache_dir() / CACHE_DB, timeout=5)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < CACHE_SCHEMA:
+        # it's only a cache: drop tables from older layouts
+        conn.execute("DROP TABLE IF EXISTS search")
+        conn.execute("DROP TABLE IF EXISTS meta")
+        conn.execute(f"PRAGMA user_version = {CACHE_SCHEMA}")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS search ("
+        " backend TEXT, query TEXT, results TEXT, complete INTEGER,"
+        " stored REAL, used REAL, PRIMARY KEY (backend, query))"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS search_used ON search (used)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS meta ("
+        " source TEXT, name TEXT, fingerprint TEXT, info TEXT, stored REAL,"
+        " PRIMARY KEY (source, name))"
+    )
+    return conn
+
+
+def get_search(backend: str, query: str, limit: int | None = None):
+    """
+    Cached results for (backend, query), or None if missing or expired.
+    A result set cut short by --limit only answers queries that need no
+    more rows than it holds.
+    """
+    now = time.time()
+    try:
+        with closing(_cache_db()) as conn, conn:
+            row = conn.execute(
+                "SELECT results, complete, stored FROM search WHERE backend=? AND query=?",
+                (backend, query)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > SEARCH_TTL.get(backend, 3600):
+                conn.execute("DELETE FROM search WHERE backend=? AND query=?",
+                             (backend, query))
+                return None
+            results = json.loads(row[0])
+            if not row[1] and (limit is None or len(results) < limit):
+                return None
+            conn.execute("UPDATE search SET used=? WHERE backend=? AND query=?",
+                         (now, backend, query))
+            return results[:limit] if limit else results
+    except (sqlite3.Error, OSError, ValueError) as e:
+        logger.debug("search cache read failed: %s", e)
+        return None
+
+
+def put_search(backend: str, query: str, results: list, complete: bool = True):
+    """
+    Store results, evicting least-recently-used entries past the size cap.
+    `complete` is False when the search stopped early at a limit.
+    """
+    now = time.time()
+    try:
+        with closing(_cache_db()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search VALUES (?,?,?,?,?,?)",
+                (backend, query, json.dumps(results), int(complete), now, now)
+            )
+            total, stale = 0, []
+            for rowid, size in conn.execute(
+                "SELECT rowid, length(results) FROM search ORDER BY used DESC"
+            ):
+                total += size
+                if total > SEARCH_CACHE_MAX_BYTES:
+                    stale.append((rowid,))
+            conn.executemany("DELETE FROM search WHERE rowid=?", stale)
+    except (sqlite3.Error, OSError, TypeError) as e:
+        logger.debug("search cache write failed: %s", e)
+
+
+def invalidate_search(backend: str):
+    try:
+        with closing(_cache_db()) as conn, conn:
+            conn.execute("DELETE FROM search WHERE backend=?", (backend,))
+    except (sqlite3.Error, OSError) as e:
+        logger.debug("search cache invalidate failed: %s", e)
+
+
+def fingerprint_paths(paths) -> str:
+    """
+    Digest of (path, mtime) pairs; missing paths count as absent.
+    """
+    h = hashlib.sha1()
+    for path in paths:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = -1
+        h.update(f"{path}:{mtime}\n".encode())
+    return h.hexdigest()
+
+
+def get_meta(source: str, name: str, fingerprint: str):
+    """
+    Cached info for (source, name) if recorded under the same fingerprint,
+    and within META_TTL for backends whose info comes from the network.
+    """
+    ttl = META_TTL.get(source)
     try:
-        return json.loads(path.read_text())
-    except Exception:
-        return {}
+        with closing(_cache_db()) as conn:
+            row = conn.execute(
+                "SELECT info, stored FROM meta WHERE source=? AND name=? AND fingerprint=?",
+                (source, name, fingerprint)
+            ).fetchone()
+        if not row or (ttl is not None and time.time() - row[1] > ttl):
+            return None
+        return json.loads(row[0])
+    except (sqlite3.Error, OSError, ValueError) as e:
+        logger.debug("meta cache read failed: %s", e)
+        return None
 
 
-def write_registry(path, data):
-    path.write_text(json.dumps(data, indent=2))
+def put_meta(source: str, name: str, fingerprint: str, info: dict):
+    try:
+        with closing(_cache_db()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?,?,?,?,?)",
+                (source, name, fingerprint, json.dumps(info), time.time())
+            )
+    except (sqlite3.Error, OSError, TypeError) as e:
+        logger.debug("meta cache write failed: %s", e)
@@ -0,0 +1,18 @@
+# manafest/utils/console.py
+
+
+class _LazyConsole:
+    """
+    Stand-in for rich's Console that imports rich on first use, so
+    `--help` and non-rendering paths never pay for it.
+    """
+    _console = None
+
+    def __getattr__(self, attr):
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        return getattr(_LazyConsole._console, attr)
+
+
+console = _LazyConsole()
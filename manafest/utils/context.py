@@ -0,0 +1,215 @@
+# manafest/utils/context.py
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+from dataclasses import dataclass, field, asdict
+
+from manafest.utils.cache import cache_dir
+from manafest.utils.osdetect import OS_RELEASE, get_os, get_distro
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_FILE = "platform.json"
+CONTEXT_VERSION = 2       # bump when the template tables change
+
+# every binary a backend may shell out to
+HELPERS = (
+    "pacman", "apt-cache", "apt-get", "dpkg", "dnf", "rpm", "pkg", "brew",
+    "winget", "pip", "yay", "paru", "pikaur", "flatpak", "snap", "sudo",
+)
+AUR_HELPERS = ("yay", "paru", "pikaur")
+
+
+@dataclass(frozen=True, eq=False)
+class PlatformContext:
+    """
+    OS, distro, helper binaries and per-backend command templates,
+    resolved once per process. Templates use "{arg}" as placeholder.
+    """
+    os: str
+    distro: str | None
+    helpers: dict = field(default_factory=dict)
+    templates: dict = field(default_factory=dict)
+
+    def has(self, binary: str) -> bool:
+        return bool(self.helpers.get(binary))
+
+    def helper(self, *names: str) -> str | None:
+        """
+        Return the first of `names` available on PATH.
+        """
+        for name in names:
+            if self.has(name):
+                return name
+        return None
+
+    def cmd(self, backend: str, action: str, arg: str = "") -> list[str]:
+        """
+        argv for backend/action with `arg` filled in; [] if unsupported.
+        """
+        template = self.templates.get(backend, {}).get(action, [])
+        return [part.replace("{arg}", arg) for part in template]
+
+
+def _default_templates(os_name: str, distro: str | None) -> dict:
+    if os_name == "android":
+        return {
+            "search":    ["pkg","search","{arg}"],
+            "install":   ["pkg","install","{arg}"],
+            "remove":    ["pkg","uninstall","{arg}"],
+            "installed": ["pkg","list-installed"],
+            "update":    ["pkg","update"],
+            "upgrade":   ["pkg","upgrade","-y"]
+        }
+    if distro == "arch":
+        return {
+            "search":    ["pacman","-Ss","{arg}"],
+            "install":   ["sudo","pacman","-S","--noconfirm","{arg}"],
+            "remove":    ["sudo","pacman","-Rsn","--noconfirm","{arg}"],
+            "installed": ["pacman","-Qi","{arg}"],
+            "update":    ["sudo","pacman","-Sy"],
+            "upgrade":   ["sudo","pacman","-Syu","--noconfirm"]
+        }
+    if distro in ("debian","ubuntu"):
+        return {
+            "search":    ["apt-cache","search","{arg}"],
+            "install":   ["sudo","apt-get","install","-y","{arg}"],
+            "remove":    ["sudo","apt-get","remove","-y","{arg}"],
+            "installed": ["dpkg","-s","{arg}"],
+            "update":    ["sudo","apt-get","update"],
+            "upgrade":   ["sudo","apt-get","upgrade","-y"]
+        }
+    if distro == "fedora":
+        return {
+            "search":    ["dnf","search","{arg}"],
+            "install":   ["sudo","dnf","install","-y","{arg}"],
+            "remove":    ["sudo","dnf","remove","-y","{arg}"],
+            "installed": ["rpm","-q","{arg}"],
+            "update":    ["sudo","dnf","check-update"],
+            "upgrade":   ["sudo","dnf","upgrade","-y"]
+        }
+    if os_name == "macos":
+        return {
+            "search":    ["brew","search","{arg}"],
+            "install":   ["brew","install","{arg}"],
+            "remove":    ["brew","uninstall","{arg}"],
+            "installed": ["brew","list","{arg}"]
+        }
+    if os_name == "windows":
+        return {
+            "search":    ["winget","search","{arg}"],
+            "install":   ["winget","install",
+                          "--accept-source-agreements",
+                          "--accept-package-agreements","{arg}"],
+            "remove":    ["winget","uninstall","{arg}"],
+            "installed": ["winget","list","{arg}"]
+        }
+    # pip fallback (installed checks read site-packages directly)
+    return {
+        "search":    ["pip","search","{arg}"],
+        "install":   ["pip","install","{arg}"],
+        "remove":    ["pip","uninstall","-y","{arg}"]
+    }
+
+
+def _templates(os_name: str, distro: str | None, helpers: dict) -> dict:
+    templates = {
+        "default": _default_templates(os_name, distro),
+        "flatpak": {
+            "search":  ["flatpak","search","{arg}"],
+            "catalog": ["flatpak","remote-ls","--app","--columns=application,description"],
+            "info":    ["flatpak","info","{arg}"],
+            "install": ["flatpak","install","flathub","-y","{arg}"],
+            "remove":  ["flatpak","uninstall","-y","{arg}"],
+            "update":  ["flatpak","update","-y"]
+        },
+        "snap": {
+            "search":  ["snap","find","{arg}"],
+            "info":    ["snap","info","{arg}"],
+            "install": ["sudo","snap","install","{arg}"],
+            "remove":  ["sudo","snap","remove","{arg}"],
+            "update":  ["sudo","snap","refresh"]
+        },
+        # pip of the running interpreter, so it agrees with importlib.metadata
+        "pypi": {
+            "install": [sys.executable,"-m","pip","install","{arg}"],
+            "remove":  [sys.executable,"-m","pip","uninstall","-y","{arg}"],
+            "upgrade": [sys.executable,"-m","pip","install","--upgrade"]
+        },
+        "aur": {}
+    }
+    aur = next((h for h in AUR_HELPERS if helpers.get(h)), None)
+    if aur:
+        templates["aur"] = {
+            "search":  [aur,"-Ss","{arg}"],
+            "info":    [aur,"-Si","{arg}"],
+            "install": [aur,"-S","--noconfirm","{arg}"],
+            "remove":  [aur,"-Rns","--noconfirm","{arg}"],
+            "update":  [aur,"-Sy"],
+            "upgrade": [aur,"-Syu","--noconfirm"]
+        }
+    return templates
+
+
+def _cache_key() -> str:
+    """
+    Digest of everything detection depends on: os-release, the interpreter,
+    PATH and the mtimes of the PATH directories (a new binary changes its
+    dir mtime).
+    """
+    h = hashlib.sha1(f"{CONTEXT_VERSION}:{platform.system()}:{sys.executable}".encode())
+    try:
+        h.update(OS_RELEASE.read_bytes())
+    except OSError:
+        pass
+    for d in os.environ.get("PATH", "").split(os.pathsep):
+        try:
+            mtime = os.stat(d).st_mtime_ns
+        except OSError:
+            mtime = -1
+        h.update(f"{d}:{mtime}\n".encode())
+    return h.hexdigest()
+
+
+def detect() -> PlatformContext:
+    """
+    Probe the running system (no caching).
+    """
+    os_name = get_os()
+    distro = get_distro() if os_name == "linux" else None
+    helpers = {name: shutil.which(name) for name in HELPERS}
+    return PlatformContext(os_name, distro, helpers, _templates(os_name, distro, helpers))
+
+
+@functools.lru_cache(maxsize=None)
+def get_context(use_disk: bool = True) -> PlatformContext:
+    """
+    The process-wide PlatformContext, optionally reused from disk while
+    os-release and PATH are unchanged.
+    """
+    if not use_disk:
+        return detect()
+
+    path = cache_dir() / CONTEXT_FILE
+    key = _cache_key()
+    try:
+        data = json.loads(path.read_text())
+        if data.get("key") == key:
+            return PlatformContext(**data["context"])
+    except Exception:
+        pass
+
+    ctx = detect()
+    try:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"key": key, "context": asdict(ctx)}))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug("Cannot write %s → %s", path, e)
+    return ctx
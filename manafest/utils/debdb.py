@@ -0,0 +1,232 @@
+# manafest/utils/debdb.py
+
+import bisect
+import json
+import logging
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+from manafest.utils.cache import cache_dir
+from manafest.utils.osdetect import SYSROOT
+
+logger = logging.getLogger(__name__)
+
+LISTS = SYSROOT / "var/lib/apt/lists"
+STATUS = SYSROOT / "var/lib/dpkg/status"
+INDEX_FILE = "deb-index.json"
+
+RE_PACKAGE = re.compile(rb"^Package: *(\S+)", re.M)
+RE_NAME_DESC = re.compile(rb"^(Package|Description): *([^\n]*)", re.M)
+
+_memo = None
+
+
+@contextmanager
+def _mapped(path: str):
+    """
+    Read-only mmap of `path`, or None for empty/unreadable files.
+    """
+    try:
+        fh = open(path, "rb")
+    except OSError as e:
+        logger.debug("Cannot open %s → %s", path, e)
+        yield None
+        return
+    with fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            yield None
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _sources(lists: Path, status: Path) -> list[str]:
+    # status first so installed stanzas win over repository ones
+    paths = [status] + sorted(lists.glob("*_Packages"))
+    return [str(p) for p in paths if p.is_file()]
+
+
+def _signature(paths: list[str]) -> dict:
+    sig = {}
+    for p in paths:
+        st = os.stat(p)
+        sig[p] = [st.st_mtime_ns, st.st_size]
+    return sig
+
+
+def _scan(path: str) -> list:
+    """
+    [[name, offset], ...] for every stanza in file order.
+    """
+    with _mapped(path) as mm:
+        if mm is None:
+            return []
+        return [[m.group(1).decode(), m.start()] for m in RE_PACKAGE.finditer(mm)]
+
+
+def load_index(lists: Path = LISTS, status: Path = STATUS) -> dict | None:
+    """
+    Return {path: {"names": {name: offset}, "starts": [offsets]}}, reusing
+    the on-disk name→offset index while the files are unchanged.
+    """
+    global _memo
+    paths = _sources(lists, status)
+    if not paths:
+        return None
+    sig = _signature(paths)
+    if _memo and _memo["signature"] == sig:
+        return _memo["files"]
+
+    index_path = cache_dir() / INDEX_FILE
+    offsets = None
+    try:
+        data = json.loads(index_path.read_text())
+        if data.get("signature") == sig:
+            offsets = data["offsets"]
+    except Exception:
+        pass
+
+    if offsets is None:
+        offsets = {p: _scan(p) for p in paths}
+        try:
+            tmp = index_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"signature": sig, "offsets": offsets}))
+            os.replace(tmp, index_path)
+        except OSError as e:
+            logger.debug("Cannot write %s → %s", index_path, e)
+
+    files = {}
+    for p in paths:
+        pairs = offsets.get(p, [])
+        names = {}
+        for name, off in pairs:
+            names.setdefault(name, off)
+        files[p] = {"names": names, "starts": [off for _, off in pairs]}
+    _memo = {"signature": sig, "files": files}
+    return files
+
+
+def _stanza(mm, offset: int) -> dict:
+    """
+    Parse the fields we need from the stanza starting at `offset`.
+    """
+    end = mm.find(b"\n\n", offset)
+    fields = {}
+    for line in mm[offset:end if end != -1 else len(mm)].split(b"\n"):
+        if not line or line[:1] in (b" ", b"\t"):
+            continue
+        key, _, value = line.partition(b":")
+        if key in (b"Package", b"Version", b"Architecture", b"Description", b"Status"):
+            fields[key.decode()] = value.strip().decode("utf-8", "replace")
+    return fields
+
+
+def _entry(fields: dict, name: str) -> dict:
+    return {
+        "name": fields.get("Package", name),
+        "version": fields.get("Version", "-"),
+        "arch": fields.get("Architecture", "-"),
+        "summary": fields.get("Description", "-")
+    }
+
+
+def search(query: str, lists: Path = LISTS, status: Path = STATUS) -> list[dict] | None:
+    """
+    Case-insensitive regex match on package name and short description,
+    like `apt-cache search`.
+    """
+    files = load_index(lists, status)
+    if files is None:
+        return None
+    try:
+        re.compile(query)
+        raw = query.encode()
+    except re.error:
+        raw = re.escape(query).encode()
+    name_re = re.compile(raw, re.I)
+    desc_re = re.compile(rb"^Description: [^\n]*?(?:" + raw + rb")", re.M | re.I)
+
+    results = {}
+    for path, idx in files.items():
+        if path == str(status):
+            continue
+        with _mapped(path) as mm:
+            if mm is None:
+                continue
+            hits = [off for name, off in idx["names"].items()
+                    if name not in results and name_re.search(name.encode())]
+            starts = idx["starts"]
+            for m in desc_re.finditer(mm):
+                i = bisect.bisect_right(starts, m.start()) - 1
+                if i >= 0:
+                    hits.append(starts[i])
+            for off in sorted(set(hits)):
+                fields = _stanza(mm, off)
+                name = fields.get("Package")
+                if name and name not in results:
+                    results[name] = _entry(fields, name)
+    return list(results.values())
+
+
+def info(name: str, lists: Path = LISTS, status: Path = STATUS) -> dict | None:
+    """
+    Installed stanza if present (dpkg status), else the first repository one.
+    """
+    files = load_index(lists, status)
+    if files is None:
+        return None
+    for path, idx in files.items():
+        off = idx["names"].get(name)
+        if off is None:
+            continue
+        with _mapped(path) as mm:
+            if mm is None:
+                continue
+            fields = _stanza(mm, off)
+        if path == str(status) and not fields.get("Status", "").endswith(" installed"):
+            continue
+        return _entry(fields, name)
+    return {}
+
+
+def installed(name: str, lists: Path = LISTS, status: Path = STATUS) -> bool | None:
+    files = load_index(lists, status)
+    if files is None or str(status) not in files:
+        return None
+    off = files[str(status)]["names"].get(name)
+    if off is None:
+        return False
+    with _mapped(str(status)) as mm:
+        if mm is None:
+            return None
+        return _stanza(mm, off).get("Status", "").endswith(" installed")
+
+
+def catalog(lists: Path = LISTS, status: Path = STATUS):
+    """
+    Yield (name, short description) for every repository package, reading
+    only the Package/Description lines of each list.
+    """
+    files = load_index(lists, status)
+    if files is None:
+        return None
+    return _catalog([p for p in files if p != str(status)])
+
+
+def _catalog(paths: list[str]):
+    seen = set()
+    for path in paths:
+        with _mapped(path) as mm:
+            if mm is None:
+                continue
+            name = None
+            for m in RE_NAME_DESC.finditer(mm):
+                if m.group(1) == b"Package":
+                    name = m.group(2).strip().decode()
+                elif name and name not in seen:
+                    seen.add(name)
+                    yield name, m.group(2).decode("utf-8", "replace")
+                    name = None
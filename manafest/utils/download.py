@@ -0,0 +1,313 @@
+# manafest/utils/download.py
+"""
+Artifact downloads into a content-addressed cache.
+
+Artifacts are stored by sha256 under {store}/sha256/ab/abcd…, so a file
+fetched once serves every later install of the same bytes, whoever asks.
+The stores searched are, in order: $MANAFEST_ARTIFACTS (os.pathsep
+separated; point it at a shared mount to serve many machines), the
+system-wide /var/cache/manafest/artifacts, and the per-user cache dir.
+New artifacts go to the first of them that is writable.
+
+Large files are fetched as SEGMENTS concurrent ranged requests into a
+.part file whose progress is kept next to it, so an interrupted download
+resumes where it stopped. The checksum is computed while the segments
+stream in, over the contiguous prefix written so far; nothing lands in
+the cache unverified.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from manafest.utils import http, profile
+from manafest.utils.cache import cache_dir
+from manafest.utils.osdetect import SYSROOT
+
+logger = logging.getLogger(__name__)
+
+SEGMENTS = 4                      # concurrent ranges per artifact
+SEGMENT_MIN = 4 * 1024 * 1024     # smaller artifacts come in one request
+CHUNK = 256 * 1024
+SAVE_EVERY = 0.5                  # seconds between progress checkpoints
+
+
+class ChecksumError(ValueError):
+    pass
+
+
+def stores() -> list[Path]:
+    """
+    Artifact stores, most shared first.
+    """
+    paths = [Path(p) for p in os.environ.get("MANAFEST_ARTIFACTS", "").split(os.pathsep) if p]
+    paths.append(SYSROOT / "var/cache/manafest/artifacts")
+    paths.append(cache_dir() / "artifacts")
+    return paths
+
+
+def _writable_store() -> Path:
+    for store in stores():
+        try:
+            store.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            continue
+        if os.access(store, os.W_OK | os.X_OK):
+            return store
+    raise OSError("no writable artifact store")
+
+
+def _blob(store: Path, sha256: str) -> Path:
+    return store / "sha256" / sha256[:2] / sha256
+
+
+def _digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while block := fh.read(CHUNK):
+            h.update(block)
+    return h.hexdigest()
+
+
+def lookup(sha256: str) -> Path | None:
+    """
+    The cached artifact with this checksum, if any store has it. Stores
+    may be shared, so a hit is re-hashed before it is trusted.
+    """
+    for store in stores():
+        path = _blob(store, sha256)
+        if not path.is_file():
+            continue
+        if _digest(path) == sha256:
+            return path
+        logger.warning(f"corrupt artifact {path}, ignoring")
+    return None
+
+
+@contextmanager
+def _locked(path: Path):
+    """
+    Exclusive lock on path (a no-op where flock is unavailable), so two
+    processes never write the same .part file.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(path, "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _probe(url: str, size: int | None) -> tuple[int | None, bool]:
+    """
+    (size, ranges supported) from a HEAD request.
+    """
+    try:
+        with http.host_slot(url):
+            resp = http.session().head(url, allow_redirects=True, timeout=http.TIMEOUT)
+        resp.raise_for_status()
+    except Exception as e:
+        logger.debug(f"HEAD {url} failed: {e}")
+        return size, False
+    length = resp.headers.get("Content-Length")
+    ranges = resp.headers.get("Accept-Ranges", "").lower() == "bytes"
+    return (int(length) if length and length.isdigit() else size), ranges
+
+
+def _plan(size: int | None, ranges: bool) -> list[list]:
+    """
+    [start, end, done] per segment; end is None when the size is unknown.
+    """
+    if not size or not ranges or size < SEGMENT_MIN:
+        return [[0, size, 0]]
+    step = -(-size // SEGMENTS)
+    return [[start, min(start + step, size), 0] for start in range(0, size, step)]
+
+
+class _Transfer:
+    """
+    One download: segments writing into the .part file, and the caller's
+    thread hashing the contiguous prefix as it grows.
+    """
+
+    def __init__(self, url: str, part: Path, segments: list[list], ranges: bool):
+        self.url = url
+        self.part = part
+        self.state = part.with_name(part.name + ".json")
+        self.segments = segments
+        self.ranges = ranges
+        self.cond = threading.Condition()
+        self.stop = threading.Event()
+        self.saved = 0.0
+
+    def _fetch(self, seg: list):
+        start, end, _ = seg
+        headers = {"Accept-Encoding": "identity"}
+        if self.ranges and (seg[2] or end is not None and len(self.segments) > 1):
+            last = "" if end is None else end - 1
+            headers["Range"] = f"bytes={start + seg[2]}-{last}"
+        with http.host_slot(self.url), profile.span("http", url=self.url) as span:
+            with http.session().get(self.url, headers=headers, stream=True,
+                                    timeout=http.TIMEOUT) as resp:
+                resp.raise_for_status()
+                if "Range" in headers and resp.status_code != 206:
+                    raise RuntimeError(f"server ignored Range for {self.url}")
+                if "Range" not in headers:
+                    with self.cond:
+                        seg[2] = 0
+                received = 0
+                with open(self.part, "r+b") as fh:
+                    fh.seek(start + seg[2])
+                    for chunk in resp.iter_content(CHUNK):
+                        if self.stop.is_set():
+                            return
+                        if end is not None and start + seg[2] + len(chunk) > end:
+                            raise RuntimeError(f"{self.url} is larger than expected")
+                        fh.write(chunk)
+                        fh.flush()
+                        received += len(chunk)
+                        with self.cond:
+                            seg[2] += len(chunk)
+                            self.cond.notify_all()
+                span.update(status=str(resp.status_code), bytes=received)
+        if end is not None and start + seg[2] != end:
+            raise RuntimeError(f"{self.url} ended early")
+
+    def _wake(self, _future):
+        with self.cond:
+            self.cond.notify_all()
+
+    def _frontier(self) -> int:
+        # end of the contiguous prefix written so far
+        pos = 0
+        for start, end, done in self.segments:
+            pos = start + done
+            if end is None or pos < end:
+                break
+        return pos
+
+    def save(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self.saved < SAVE_EVERY:
+            return
+        self.saved = now
+        with self.cond:
+            data = json.dumps({"url": self.url, "segments": self.segments})
+        try:
+            self.state.write_text(data)
+        except OSError as e:
+            logger.debug(f"cannot save download progress {self.state}: {e}")
+
+    def run(self) -> tuple[str, int]:
+        """
+        Download the missing parts; returns (sha256, size) of the result.
+        """
+        h = hashlib.sha256()
+        hashed = 0
+        pool = ThreadPoolExecutor(max_workers=len(self.segments))
+        futures = [pool.submit(self._fetch, seg) for seg in self.segments
+                   if seg[1] is None or seg[0] + seg[2] < seg[1]]
+        for f in futures:
+            f.add_done_callback(self._wake)
+        try:
+            # unbuffered: a buffered reader would read ahead of the frontier
+            # and keep bytes the segments have not written yet
+            with open(self.part, "rb", buffering=0) as reader:
+                while True:
+                    with self.cond:
+                        running = not all(f.done() for f in futures)
+                        if any(f.done() and f.exception() for f in futures):
+                            self.stop.set()     # one range failed: give up on the rest
+                        if running and self._frontier() == hashed:
+                            self.cond.wait(SAVE_EVERY)
+                        frontier = self._frontier()
+                    if frontier < hashed:
+                        # a segment restarted from scratch
+                        h, hashed = hashlib.sha256(), 0
+                        reader.seek(0)
+                    while hashed < frontier:
+                        block = reader.read(min(CHUNK, frontier - hashed))
+                        if not block:
+                            raise RuntimeError(f"{self.part} is shorter than written")
+                        h.update(block)
+                        hashed += len(block)
+                    self.save()
+                    if not running:
+                        break
+            for f in futures:
+                f.result()
+        finally:
+            self.stop.set()
+            pool.shutdown(wait=True)
+            self.save(force=True)
+        return h.hexdigest(), hashed
+
+
+def _resume(part: Path, url: str, size: int | None, ranges: bool) -> list[list]:
+    """
+    Segments from a previous attempt at this artifact, or a fresh plan.
+    """
+    state = part.with_name(part.name + ".json")
+    if ranges and part.exists():
+        try:
+            data = json.loads(state.read_text())
+            if data["url"] == url and data["segments"][-1][1] == size:
+                return data["segments"]
+        except (OSError, ValueError, KeyError, IndexError):
+            pass
+    with open(part, "wb") as fh:
+        if size:
+            fh.truncate(size)
+    return _plan(size, ranges)
+
+
+def fetch(url: str, sha256: str | None = None, size: int | None = None) -> Path:
+    """
+    Path of the artifact at url in the cache, downloading it if no store
+    has it yet. With sha256 a cached copy is used without touching the
+    network, and a download that does not match raises ChecksumError.
+    Network errors propagate (requests.RequestException); the partial file
+    is kept for the next attempt.
+    """
+    if sha256:
+        sha256 = sha256.lower()
+        if (path := lookup(sha256)) is not None:
+            logger.debug(f"artifact {sha256[:12]} cached at {path}")
+            return path
+
+    store = _writable_store()
+    partial = store / "partial"
+    partial.mkdir(exist_ok=True)
+    key = sha256 or hashlib.sha256(url.encode()).hexdigest()
+    part = partial / f"{key}.part"
+    with _locked(partial / f"{key}.lock"):
+        if sha256 and (path := lookup(sha256)) is not None:
+            return path        # another process finished it meanwhile
+        size, ranges = _probe(url, size)
+        transfer = _Transfer(url, part, _resume(part, url, size, ranges), ranges)
+        digest, got = transfer.run()
+
+        state = transfer.state
+        if (sha256 and digest != sha256) or (size is not None and got != size):
+            part.unlink(missing_ok=True)
+            state.unlink(missing_ok=True)
+            raise ChecksumError(f"{url}: expected sha256 {sha256} ({size} bytes), "
+                                f"got {digest} ({got} bytes)")
+        path = _blob(store, digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(part, 0o644)
+        os.replace(part, path)
+        state.unlink(missing_ok=True)
+    # the lock file stays: unlinking it while held would let a waiter on
+    # the old file and a newcomer on a new one both write the .part file
+    return path
@@ -0,0 +1,146 @@
+# manafest/utils/http.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from manafest.utils import profile
+from manafest.utils.cache import cache_dir
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "manafest/0.1.0"
+TIMEOUT = 20
+POOL_SIZE = 16        # keep-alive connections kept per host
+HOST_LIMIT = 6        # concurrent requests allowed per host
+
+_lock = threading.Lock()
+_session = None
+_host_slots = {}
+
+
+def session():
+    """
+    The process-wide requests.Session (keep-alive pool, gzip decoding).
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers.update({
+                "User-Agent": USER_AGENT,
+                "Accept-Encoding": "gzip, deflate"
+            })
+            _session = s
+    return _session
+
+
+@contextmanager
+def host_slot(url: str):
+    """
+    Hold one of the HOST_LIMIT request slots for url's host.
+    """
+    host = urlsplit(url).netloc
+    with _lock:
+        sem = _host_slots.setdefault(host, threading.BoundedSemaphore(HOST_LIMIT))
+    with sem:
+        yield
+
+
+def _cache_paths(url: str):
+    key = hashlib.sha256(url.encode()).hexdigest()
+    folder = cache_dir() / "http"
+    folder.mkdir(exist_ok=True)
+    return folder / f"{key}.json", folder / f"{key}.body"
+
+
+def _load(url: str):
+    meta_path, body_path = _cache_paths(url)
+    try:
+        return json.loads(meta_path.read_text()), body_path.read_bytes()
+    except (OSError, ValueError):
+        return None, None
+
+
+def _store(url: str, meta: dict, body: bytes | None):
+    meta_path, body_path = _cache_paths(url)
+    try:
+        if body is not None:
+            tmp = body_path.with_suffix(".tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, body_path)
+        tmp = meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, meta_path)
+    except OSError as e:
+        logger.debug("Cannot cache %s → %s", url, e)
+
+
+def get(url: str, timeout: float = TIMEOUT, max_age: float = 0,
+        headers: dict | None = None, cache: bool = True) -> bytes:
+    """
+    GET url and return the decoded body.
+
+    Responses are kept on disk with the time they were fetched: within
+    `max_age` seconds of that the cached body is returned without touching
+    the network. After that, a response carrying an ETag or Last-Modified
+    is revalidated with a conditional request, and any other is fetched
+    again. Raises requests.RequestException on network or HTTP errors.
+    """
+    meta, body = _load(url) if cache else (None, None)
+    if meta is not None and time.time() - meta.get("checked", 0) < max_age:
+        return body
+
+    req_headers = dict(headers or {})
+    if meta is not None:
+        if meta.get("etag"):
+            req_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            req_headers["If-Modified-Since"] = meta["last_modified"]
+
+    with host_slot(url), profile.span("http", url=url) as span:
+        resp = session().get(url, headers=req_headers, timeout=timeout)
+        span.update(status=str(resp.status_code), bytes=len(resp.content))
+
+    if resp.status_code == 304 and meta is not None:
+        meta["checked"] = time.time()
+        _store(url, meta, None)
+        return body
+
+    resp.raise_for_status()
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if cache:
+        _store(url, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "checked": time.time()
+        }, resp.content)
+    return resp.content
+
+
+def get_json(url: str, **kwargs):
+    return json.loads(get(url, **kwargs))
+
+
+def post(url: str, data: bytes, headers: dict | None = None,
+         timeout: float = TIMEOUT) -> bytes:
+    """
+    POST over the shared pool (never cached).
+    """
+    with host_slot(url), profile.span("http", url=url) as span:
+        resp = session().post(url, data=data, headers=headers, timeout=timeout)
+        span.update(status=str(resp.status_code), bytes=len(resp.content))
+    resp.raise_for_status()
+    return resp.content
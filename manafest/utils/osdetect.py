@@ -1,6 +1,12 @@
+import os
 import platform
 import pathlib
 
+# MANAFEST_SYSROOT re-roots every system path we read (os-release, package
+# databases), e.g. to inspect a chroot or to run against fixture trees
+SYSROOT = pathlib.Path(os.environ.get("MANAFEST_SYSROOT") or "/")
+OS_RELEASE = SYSROOT / "etc/os-release"
+
 
 def get_os():
     system = platform.system().lower()
@@ -13,7 +19,7 @@ def get_os():
 
 def get_distro():
     data = {}
-    path = pathlib.Path("/etc/os-release")
+    path = OS_RELEASE
     if not path.exists():
         return "generic"
     for line in path.read_text().splitlines():
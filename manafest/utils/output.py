@@ -0,0 +1,94 @@
+# manafest/utils/output.py
+
+import json
+import os
+import sys
+import threading
+
+# every record carries these keys, in this order
+FIELDS = ("name", "version", "arch", "summary", "source")
+FORMATS = ("table", "json", "ndjson")
+
+_records = None
+
+
+def claim_stdout():
+    """
+    Reserve the real stdout for records: fd 1 is pointed at stderr, so
+    rich output, prompts and child processes (pacman, pip, …) can no
+    longer interleave with the JSON stream.
+    """
+    global _records
+    if _records is None:
+        sys.stdout.flush()
+        _records = os.fdopen(os.dup(1), "w", encoding="utf-8")
+        os.dup2(2, 1)
+
+
+def record(pkg, source: str, **extra) -> dict:
+    """
+    Normalize a backend row (dict or bare name) to the stable schema.
+    """
+    if not isinstance(pkg, dict):
+        pkg = {"name": str(pkg)}
+    rec = {k: pkg.get(k) or "" for k in FIELDS[:-1]}
+    rec["source"] = source
+    rec.update(extra)
+    return rec
+
+
+class Writer:
+    """
+    Thread-safe record writer on stdout. ndjson flushes one object per
+    line as it arrives; json streams a single array; table writes nothing
+    (the caller renders). Writes after close() (e.g. from a backend thread
+    that outlived its deadline) are dropped.
+    """
+
+    def __init__(self, fmt: str, stream=None):
+        self.fmt = fmt
+        self.stream = stream or _records or sys.stdout
+        self.count = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def write(self, rec: dict):
+        if self.fmt == "table":
+            return
+        line = json.dumps(rec, ensure_ascii=False)
+        with self._lock:
+            if self.closed:
+                return
+            if self.fmt == "json":
+                line = ("[\n  " if not self.count else ",\n  ") + line
+            else:
+                line += "\n"
+            self.stream.write(line)
+            self.count += 1
+            if self.fmt == "ndjson":
+                self.stream.flush()
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            if self.fmt == "table":
+                return
+            if self.fmt == "json":
+                self.stream.write("\n]\n" if self.count else "[]\n")
+            self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def emit(fmt: str, rec: dict):
+    """
+    Write the single result record of an action (install, remove, …).
+    """
+    with Writer(fmt) as out:
+        out.write(rec)
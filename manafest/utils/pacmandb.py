@@ -0,0 +1,164 @@
+# manafest/utils/pacmandb.py
+
+import json
+import logging
+import os
+import re
+import tarfile
+from pathlib import Path
+
+from manafest.utils.cache import cache_dir
+from manafest.utils.osdetect import SYSROOT
+
+logger = logging.getLogger(__name__)
+
+DBPATH = SYSROOT / "var/lib/pacman"
+INDEX_FILE = "pacman-index.json"
+
+_memo = None
+
+
+def _parse_desc(text: str) -> dict:
+    """
+    Parse a pacman `desc` file (%KEY% header followed by value lines).
+    """
+    fields = {}
+    key = None
+    for line in text.splitlines():
+        if line.startswith("%") and line.endswith("%"):
+            key = line.strip("%")
+            fields[key] = []
+        elif key and line:
+            fields[key].append(line)
+        else:
+            key = None
+    return fields
+
+
+def _entry(fields: dict, repo: str) -> dict:
+    def first(k):
+        return fields.get(k, ["-"])[0]
+    return {
+        "name": first("NAME"),
+        "version": first("VERSION"),
+        "arch": first("ARCH"),
+        "summary": first("DESC"),
+        "repo": repo
+    }
+
+
+def _signature(dbpath: Path) -> dict:
+    sig = {}
+    for path in sorted((dbpath / "sync").glob("*.db")) + [dbpath / "local"]:
+        try:
+            sig[str(path)] = path.stat().st_mtime_ns
+        except OSError:
+            pass
+    return sig
+
+
+def _build(dbpath: Path, sig: dict) -> dict | None:
+    sync = {}
+    for db in sorted((dbpath / "sync").glob("*.db")):
+        repo = db.stem
+        try:
+            with tarfile.open(db, "r:*") as tar:
+                for member in tar:
+                    if not member.isfile() or not member.name.endswith("/desc"):
+                        continue
+                    text = tar.extractfile(member).read().decode("utf-8", "replace")
+                    pkg = _entry(_parse_desc(text), repo)
+                    sync.setdefault(pkg["name"], pkg)
+        except (tarfile.TarError, OSError) as e:
+            # e.g. zstd-compressed databases; let callers fall back to pacman
+            logger.debug("Cannot read sync db %s → %s", db, e)
+            return None
+
+    local = {}
+    for desc in (dbpath / "local").glob("*/desc"):
+        try:
+            pkg = _entry(_parse_desc(desc.read_text(errors="replace")), "local")
+        except OSError:
+            continue
+        local[pkg["name"]] = pkg
+
+    return {"dbpath": str(dbpath), "signature": sig, "sync": sync, "local": local}
+
+
+def load_index(dbpath: Path = DBPATH) -> dict | None:
+    """
+    Return the {sync, local} package index, rebuilding it only when the
+    database mtimes change. None if the databases are missing or unreadable.
+    """
+    global _memo
+    if not (dbpath / "local").is_dir():
+        return None
+    sig = _signature(dbpath)
+    if _memo and _memo["dbpath"] == str(dbpath) and _memo["signature"] == sig:
+        return _memo
+
+    path = cache_dir() / INDEX_FILE
+    try:
+        data = json.loads(path.read_text())
+        if data.get("dbpath") == str(dbpath) and data.get("signature") == sig:
+            _memo = data
+            return data
+    except Exception:
+        pass
+
+    data = _build(dbpath, sig)
+    if data is None:
+        return None
+    try:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug("Cannot write %s → %s", path, e)
+    _memo = data
+    return data
+
+
+def search(query: str, dbpath: Path = DBPATH):
+    """
+    Case-insensitive regex match on name and description, like `pacman -Ss`.
+    Returns a lazy iterator of matches (None if the index is unavailable).
+    """
+    index = load_index(dbpath)
+    if index is None:
+        return None
+    try:
+        pattern = re.compile(query, re.I)
+    except re.error:
+        pattern = re.compile(re.escape(query), re.I)
+    return (
+        pkg for pkg in index["sync"].values()
+        if pattern.search(pkg["name"]) or pattern.search(pkg["summary"])
+    )
+
+
+def info(name: str, dbpath: Path = DBPATH) -> dict | None:
+    """
+    Installed metadata if present (like `pacman -Qi`), else the sync entry.
+    """
+    index = load_index(dbpath)
+    if index is None:
+        return None
+    return index["local"].get(name) or index["sync"].get(name) or {}
+
+
+def installed(name: str, dbpath: Path = DBPATH) -> bool | None:
+    index = load_index(dbpath)
+    if index is None:
+        return None
+    return name in index["local"]
+
+
+def catalog(dbpath: Path = DBPATH):
+    """
+    (name, summary) for every sync package; None if the index is unavailable.
+    """
+    index = load_index(dbpath)
+    if index is None:
+        return None
+    return ((pkg["name"], pkg["summary"]) for pkg in index["sync"].values())
@@ -0,0 +1,127 @@
+# manafest/utils/proc.py
+
+import logging
+import subprocess
+import threading
+import time
+
+from manafest.utils import profile
+
+logger = logging.getLogger(__name__)
+
+
+def stream_lines(cmd: list[str], timeout: float = 20):
+    """
+    Yield the child's stdout line by line as it is written.
+
+    Closing the generator early (e.g. after enough matches) terminates the
+    child; a watchdog kills it once `timeout` seconds have passed.
+    """
+    rec = profile.begin("exec", argv=list(cmd))
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    spawned = time.perf_counter()
+    watchdog = threading.Timer(timeout, proc.kill)
+    watchdog.daemon = True
+    watchdog.start()
+    nbytes = lines = 0
+    waited = 0.0
+    try:
+        it = iter(proc.stdout)
+        while True:
+            t = time.perf_counter()
+            raw = next(it, None)
+            waited += time.perf_counter() - t
+            if raw is None:
+                break
+            nbytes += len(raw)
+            lines += 1
+            yield raw.decode("utf-8", "replace").rstrip("\r\n")
+        proc.wait()
+        if proc.returncode:
+            logger.debug("%s exited with %s", cmd, proc.returncode)
+    finally:
+        watchdog.cancel()
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        proc.stdout.close()
+        # spawn: fork/exec; wait: blocked on the child's output
+        profile.end(rec, spawn_ms=round((spawned - t0) * 1000, 1),
+                    wait_ms=round(waited * 1000, 1), bytes=nbytes, lines=lines)
+
+
+async def run_async(cmd: list[str], log=None, timeout: float | None = None,
+                    capture: bool = False) -> tuple[int, bytes]:
+    """
+    Run cmd on the event loop; returns (returncode, stdout). Output goes to
+    `log` (a file) if given, is returned with capture=True, and is
+    otherwise inherited. A child still running after `timeout` is killed.
+    """
+    import asyncio
+    rec = profile.begin("exec", argv=list(cmd))
+    t0 = time.perf_counter()
+    if capture:
+        out, err = asyncio.subprocess.PIPE, asyncio.subprocess.DEVNULL
+    else:
+        out, err = log, (asyncio.subprocess.STDOUT if log else None)
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=out, stderr=err)
+    spawned = time.perf_counter()
+    data = b""
+    try:
+        if capture:
+            data, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        else:
+            await asyncio.wait_for(proc.wait(), timeout)
+    except asyncio.TimeoutError:
+        logger.debug("%s timed out after %ss", cmd, timeout)
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        profile.end(rec, spawn_ms=round((spawned - t0) * 1000, 1),
+                    wait_ms=round((time.perf_counter() - spawned) * 1000, 1), bytes=len(data))
+    return proc.returncode, data
+
+
+async def stream_lines_async(cmd: list[str], timeout: float = 20):
+    """
+    Async counterpart of stream_lines: yield the child's stdout lines as
+    they are written; closing the generator early, or the timeout, kills
+    the child.
+    """
+    import asyncio
+    rec = profile.begin("exec", argv=list(cmd))
+    t0 = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+    )
+    spawned = time.perf_counter()
+    deadline = time.monotonic() + timeout
+    nbytes = lines = 0
+    try:
+        while True:
+            try:
+                raw = await asyncio.wait_for(proc.stdout.readline(),
+                                             max(0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                logger.debug("%s timed out after %ss", cmd, timeout)
+                break
+            if not raw:
+                break
+            nbytes += len(raw)
+            lines += 1
+            yield raw.decode("utf-8", "replace").rstrip("\r\n")
+        if proc.returncode is None and time.monotonic() < deadline:
+            await proc.wait()
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        profile.end(rec, spawn_ms=round((spawned - t0) * 1000, 1),
+                    wait_ms=round((time.perf_counter() - spawned) * 1000, 1),
+                    bytes=nbytes, lines=lines)
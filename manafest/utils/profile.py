@@ -0,0 +1,169 @@
+# manafest/utils/profile.py
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# spans are only recorded after enable(); begin() is a no-op until then
+_enabled = False
+_origin = time.perf_counter()
+_spans = []
+_lock = threading.Lock()
+_local = threading.local()
+# backend of a coroutine running on the shared event loop (see aio.run)
+_task_backend = contextvars.ContextVar("backend", default=None)
+
+# span attributes shown in the summary table
+COLUMNS = {"rows": "Rows", "bytes": "Bytes", "spawn_ms": "Spawn ms", "wait_ms": "Wait ms"}
+
+
+def enable():
+    global _enabled, _origin
+    _enabled = True
+    _origin = time.perf_counter()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def current_backend() -> str | None:
+    """
+    Backend of the innermost open span on this thread (or of this task).
+    """
+    stack = getattr(_local, "stack", None)
+    if _task_backend.get() or not stack:
+        return _task_backend.get()
+    return stack[-1]["attrs"].get("backend")
+
+
+def bind_backend(name: str | None):
+    """
+    Attribute spans opened in the current asyncio task to backend `name`.
+    """
+    _task_backend.set(name)
+
+
+def begin(name: str, **attrs) -> dict | None:
+    """
+    Open a span; returns the record to fill in (or None when profiling is
+    off). Spans inherit `backend` from the enclosing span on this thread.
+    """
+    if not _enabled:
+        return None
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    if "backend" not in attrs and (stack or _task_backend.get()):
+        attrs["backend"] = current_backend()
+    rec = {
+        "name": name,
+        "tid": threading.get_ident(),
+        "start": time.perf_counter(),
+        "end": None,
+        "attrs": attrs,
+    }
+    stack.append(rec)
+    return rec
+
+
+def end(rec: dict | None, **attrs):
+    if rec is None:
+        return
+    rec["end"] = time.perf_counter()
+    rec["attrs"].update(attrs)
+    stack = getattr(_local, "stack", [])
+    for i in range(len(stack) - 1, -1, -1):
+        if stack[i] is rec:
+            del stack[i]
+            break
+    with _lock:
+        _spans.append(rec)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time the enclosed block; the yielded dict takes extra attributes
+    (rows, bytes, …) and is simply discarded when profiling is off.
+    """
+    rec = begin(name, **attrs)
+    try:
+        yield rec["attrs"] if rec is not None else {}
+    finally:
+        end(rec)
+
+
+def spans() -> list[dict]:
+    with _lock:
+        return sorted(_spans, key=lambda s: s["start"])
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def summary() -> list[dict]:
+    """
+    Spans aggregated per (phase, backend): calls, total/max wall time and
+    the sums of the numeric attributes they recorded.
+    """
+    groups = {}
+    for s in spans():
+        key = (s["name"], s["attrs"].get("backend") or "-")
+        g = groups.setdefault(key, {"phase": key[0], "backend": key[1], "calls": 0,
+                                    "total_ms": 0.0, "max_ms": 0.0})
+        dur = _ms(s["end"] - s["start"])
+        g["calls"] += 1
+        g["total_ms"] = round(g["total_ms"] + dur, 1)
+        g["max_ms"] = max(g["max_ms"], dur)
+        for k, v in s["attrs"].items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                g[k] = round(g.get(k, 0) + v, 1)
+    return list(groups.values())
+
+
+def report(console):
+    """
+    Print the per-phase summary and the command lines that were run.
+    """
+    from rich.markup import escape
+    from rich.table import Table
+
+    table = Table(title="[magenta]Profile[/magenta]")
+    table.add_column("Phase", no_wrap=True)
+    table.add_column("Backend", no_wrap=True)
+    for col in ("Calls", "Total ms", "Max ms", *COLUMNS.values()):
+        table.add_column(col, justify="right", no_wrap=True)
+    for g in sorted(summary(), key=lambda g: -g["total_ms"]):
+        table.add_row(g["phase"], g["backend"], str(g["calls"]), f"{g['total_ms']:.1f}",
+                      f"{g['max_ms']:.1f}", *(str(g.get(k, "")) for k in COLUMNS))
+    console.print(table)
+
+    for s in spans():
+        if "argv" in s["attrs"]:
+            console.print(f"[dim]{_ms(s['end'] - s['start']):8.1f} ms  "
+                          f"{escape(' '.join(s['attrs']['argv']))}[/dim]", highlight=False)
+
+
+def write_trace(path: str):
+    """
+    Dump the spans in Chrome trace-event format (chrome://tracing, Perfetto).
+    """
+    pid = os.getpid()
+    events = [{
+        "name": s["name"] + (f" {s['attrs']['backend']}" if s["attrs"].get("backend") else ""),
+        "cat": s["name"],
+        "ph": "X",
+        "ts": round((s["start"] - _origin) * 1e6),
+        "dur": round((s["end"] - s["start"]) * 1e6),
+        "pid": pid,
+        "tid": s["tid"],
+        "args": {k: " ".join(v) if isinstance(v, list) else v
+                 for k, v in s["attrs"].items()},
+    } for s in spans()]
+    with open(path, "w") as fh:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
@@ -0,0 +1,90 @@
+# manafest/utils/pydist.py
+
+import functools
+import json
+import logging
+import re
+import subprocess
+from importlib import metadata
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SITE_GLOBS = ("lib/python3*/site-packages", "lib64/python3*/site-packages", "Lib/site-packages")
+
+
+def normalize(name: str) -> str:
+    """
+    PEP 503 normalized project name.
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _venv_paths(root: Path) -> list[str]:
+    return [str(p) for pattern in SITE_GLOBS for p in sorted(root.glob(pattern))]
+
+
+@functools.lru_cache(maxsize=None)
+def site_paths(target: str | None = None) -> tuple[str, ...] | None:
+    """
+    Directories to scan for `target`: None for the running interpreter,
+    a venv/prefix directory, or the path of another python executable.
+    """
+    if target is None:
+        return None
+    path = Path(target).expanduser()
+    if path.is_dir():
+        return tuple(_venv_paths(path))
+    # <venv>/bin/python: read the venv layout instead of starting it
+    root = path.parent.parent
+    if (root / "pyvenv.cfg").exists():
+        return tuple(_venv_paths(root))
+    try:
+        out = subprocess.check_output(
+            [str(path), "-c", "import json, sys; print(json.dumps(sys.path))"],
+            stderr=subprocess.DEVNULL, timeout=20
+        )
+        return tuple(p for p in json.loads(out) if p)
+    except Exception as e:
+        logger.debug("Cannot query %s for sys.path → %s", path, e)
+        return ()
+
+
+def _describe(dist) -> dict:
+    meta = dist.metadata
+    return {
+        "name": meta["Name"],
+        "version": dist.version,
+        "arch": "-",
+        "summary": meta["Summary"] or "-",
+        "requires": dist.requires or []
+    }
+
+
+def _distributions(target: str | None, **kwargs):
+    paths = site_paths(target)
+    if paths is not None:
+        kwargs["path"] = list(paths)
+    return metadata.distributions(**kwargs)
+
+
+def get(name: str, target: str | None = None) -> dict | None:
+    """
+    Metadata of the installed distribution `name`, or None. The finder
+    matches on normalized directory names, so only that dist is parsed.
+    """
+    dist = next(iter(_distributions(target, name=name)), None)
+    return _describe(dist) if dist is not None else None
+
+
+def list_all(target: str | None = None) -> dict:
+    """
+    {normalized name: metadata} for every installed distribution, in one
+    pass; the first occurrence on the path wins, as it does for imports.
+    """
+    found = {}
+    for dist in _distributions(target):
+        dist_name = dist.metadata["Name"]
+        if dist_name and normalize(dist_name) not in found:
+            found[normalize(dist_name)] = _describe(dist)
+    return found
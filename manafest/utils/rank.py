@@ -0,0 +1,64 @@
+# manafest/utils/rank.py
+
+import heapq
+
+# match tiers: exact name > name prefix > name substring > summary hit
+EXACT, PREFIX, SUBSTRING, SUMMARY = 4, 3, 2, 1
+
+
+def dedupe_key(name: str) -> str:
+    """
+    Key under which the same app from different sources collapses:
+    lowercase, and the last part of reverse-DNS ids (org.mozilla.firefox).
+    """
+    name = name.lower()
+    if name.count(".") >= 2:
+        name = name.rsplit(".", 1)[-1]
+    return name
+
+
+def score(query: str, name: str, summary: str = "") -> float:
+    """
+    Tier of the match plus a small bonus for shorter names, so 'vim'
+    ranks above 'vim-plugins' within the same tier.
+    """
+    q = query.lower()
+    key = dedupe_key(name)
+    lname = name.lower()
+    if q in (lname, key):
+        tier = EXACT
+    elif lname.startswith(q) or key.startswith(q):
+        tier = PREFIX
+    elif q in lname:
+        tier = SUBSTRING
+    elif q in (summary or "").lower():
+        tier = SUMMARY
+    else:
+        tier = 0
+    return tier + 1 / (1 + len(key))
+
+
+def merge(results, query: str, k: int) -> list[dict]:
+    """
+    Collapse (source, pkg) pairs by dedupe_key and return the k best rows,
+    each with a "sources" list, using a heap rather than a full sort.
+    """
+    best = {}
+    for src, pkg in results:
+        if not isinstance(pkg, dict):
+            pkg = {"name": str(pkg), "version": "-", "arch": "-", "summary": "-"}
+        name = pkg.get("name") or ""
+        if not name:
+            continue
+        key = dedupe_key(name)
+        s = score(query, name, pkg.get("summary", ""))
+        entry = best.get(key)
+        if entry is None:
+            best[key] = [s, pkg, [src]]
+            continue
+        if src not in entry[2]:
+            entry[2].append(src)
+        if s > entry[0]:
+            entry[0], entry[1] = s, pkg
+    top = heapq.nlargest(k, best.values(), key=lambda e: e[0])
+    return [dict(pkg, sources=sources) for _, pkg, sources in top]
@@ -0,0 +1,153 @@
+# manafest/utils/registry.py
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# where releases up to 0.1.0 kept the registry (next to the package)
+LEGACY_JSON = Path(__file__).resolve().parent.parent.parent / "registry.json"
+SCHEMA_VERSION = 1
+
+# this thread's open connection: ((path, pid), connection)
+_local = threading.local()
+
+
+def registry_path() -> Path:
+    """
+    $XDG_DATA_HOME/manafest/registry.sqlite, created on demand.
+    """
+    base = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local/share"
+    path = Path(base) / "manafest"
+    path.mkdir(parents=True, exist_ok=True)
+    return path / "registry.sqlite"
+
+
+def _migrate_json(conn, legacy: Path):
+    if not legacy.exists():
+        return
+    try:
+        data = json.loads(legacy.read_text())
+        rows = [(name, entry["source"], json.dumps(entry.get("info", {})),
+                 entry.get("installed_at")) for name, entry in data.items()]
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+        # set it aside rather than failing every start; nothing to import
+        bad = legacy.with_name(legacy.name + ".bad")
+        try:
+            os.replace(legacy, bad)
+        except OSError:
+            bad = legacy
+        logger.warning(f"cannot import legacy registry {legacy} ({e}); kept as {bad}")
+        return
+    conn.executemany("INSERT OR IGNORE INTO packages VALUES (?,?,?,?)", rows)
+    logger.debug("Imported %d entries from %s", len(rows), legacy)
+
+
+def _init(conn, legacy: Path):
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            conn.execute("COMMIT")
+            return
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS packages ("
+            " name TEXT PRIMARY KEY, source TEXT NOT NULL,"
+            " info TEXT NOT NULL, installed_at TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS packages_source ON packages (source)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS packages_installed_at ON packages (installed_at)"
+        )
+        _migrate_json(conn, legacy)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _connect(path: Path | None = None, legacy: Path | None = None):
+    """
+    This thread's connection to the registry, opened and schema-checked
+    once per thread (and again only when the path changes or after a fork).
+    """
+    key = (Path(path or registry_path()), os.getpid())
+    cached = getattr(_local, "conn", None)
+    if cached is not None:
+        if cached[0] == key:
+            return cached[1]
+        _local.conn = None
+        if cached[0][1] == key[1]:
+            cached[1].close()
+    conn = sqlite3.connect(key[0], timeout=30, isolation_level=None)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        try:
+            _init(conn, legacy or LEGACY_JSON)
+        except Exception:
+            conn.close()
+            raise
+    # WAL stays consistent without a sync per commit; at worst a power cut
+    # loses the last installs recorded
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _local.conn = (key, conn)
+    return conn
+
+
+def _entry(row) -> dict:
+    source, info, installed_at = row
+    return {"source": source, "info": json.loads(info), "installed_at": installed_at}
+
+
+def get_entry(name: str, path: Path | None = None) -> dict | None:
+    """
+    {source, info, installed_at} for name, or None.
+    """
+    row = _connect(path).execute(
+        "SELECT source, info, installed_at FROM packages WHERE name=?", (name,)
+    ).fetchone()
+    return _entry(row) if row else None
+
+
+def put_entry(name: str, source: str, info: dict, path: Path | None = None):
+    """
+    Insert or replace a single package row.
+    """
+    _connect(path).execute(
+        "INSERT INTO packages VALUES (?,?,?,?) ON CONFLICT(name) DO UPDATE SET"
+        " source=excluded.source, info=excluded.info,"
+        " installed_at=excluded.installed_at",
+        (name, source, json.dumps(info), datetime.utcnow().isoformat())
+    )
+
+
+def delete_entry(name: str, source: str | None = None, path: Path | None = None) -> bool:
+    """
+    Drop name (only if recorded from `source`, when given).
+    """
+    conn = _connect(path)
+    if source is None:
+        cur = conn.execute("DELETE FROM packages WHERE name=?", (name,))
+    else:
+        cur = conn.execute(
+            "DELETE FROM packages WHERE name=? AND source=?", (name, source)
+        )
+    return cur.rowcount > 0
+
+
+def iter_entries(source: str | None = None, path: Path | None = None):
+    """
+    Yield (name, entry) in install order, optionally for one source.
+    """
+    sql = "SELECT name, source, info, installed_at FROM packages"
+    params = ()
+    if source is not None:
+        sql += " WHERE source=?"
+        params = (source,)
+    for row in _connect(path).execute(sql + " ORDER BY installed_at", params).fetchall():
+        yield row[0], _entry(row[1:])
@@ -0,0 +1,164 @@
+# manafest/utils/render.py
+
+import itertools
+import os
+import shlex
+import subprocess
+from contextlib import contextmanager
+
+from manafest.utils.console import console
+
+PAGE_SIZE = 50        # rows formatted and printed per batch
+MAX_ROWS = 200        # rows shown per table before the "N more…" footer
+
+SEARCH_COLUMNS = [("Name", "cyan"), ("Version", "green"), ("Arch", "yellow"), ("Summary", "white")]
+MERGED_COLUMNS = [("Name", "cyan"), ("Version", "green"), ("Summary", "white"), ("Sources", "magenta")]
+INSTALLED_COLUMNS = [("Name", "cyan"), ("Version", "green"), ("Arch", "yellow"),
+                     ("Source", "magenta"), ("When", "white")]
+
+_settings = {"page_size": PAGE_SIZE, "max_rows": MAX_ROWS, "pager": False}
+_out = None           # console writing into the pager, while one is open
+
+
+def configure(page_size: int | None = None, max_rows: int | None = None,
+              pager: bool | None = None):
+    """
+    Process-wide rendering options (set once from the command line).
+    max_rows=0 shows everything; with a pager the cap defaults to off.
+    """
+    if page_size:
+        _settings["page_size"] = max(1, page_size)
+    if pager is not None:
+        _settings["pager"] = pager
+        if pager and max_rows is None:
+            _settings["max_rows"] = 0
+    if max_rows is not None:
+        _settings["max_rows"] = max_rows
+
+
+def out():
+    """
+    Where tables go: the pager's console while paging, else the console.
+    """
+    return _out or console
+
+
+def _pager_argv() -> list[str]:
+    # -R keeps colors, -F exits if it fits on one screen, -X leaves it there
+    return shlex.split(os.environ.get("MANAFEST_PAGER") or os.environ.get("PAGER") or "less -RFX")
+
+
+@contextmanager
+def paging():
+    """
+    Pipe everything rendered inside the block through $PAGER, page by page
+    as it is produced. A no-op unless paging is on and stdout is a terminal.
+    Quitting the pager early ends the block quietly.
+    """
+    global _out
+    if not _settings["pager"] or _out is not None or not console.is_terminal:
+        yield
+        return
+    from rich.console import Console
+
+    try:
+        proc = subprocess.Popen(_pager_argv(), stdin=subprocess.PIPE, text=True)
+    except OSError:
+        yield
+        return
+    _out = Console(file=proc.stdin, force_terminal=True, width=console.width)
+    try:
+        yield
+    except BrokenPipeError:
+        pass
+    finally:
+        _out = None
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        proc.wait()
+
+
+def _cell(value) -> str:
+    # metadata is not always text (versions parsed as numbers, lists, …)
+    return "-" if value is None or value == "" else str(value)
+
+
+def search_row(p) -> tuple:
+    if isinstance(p, dict):
+        return (_cell(p.get("name")), _cell(p.get("version")),
+                _cell(p.get("arch")), _cell(p.get("summary")))
+    return (str(p), "-", "-", "-")
+
+
+def merged_row(p: dict) -> tuple:
+    return (_cell(p.get("name")), _cell(p.get("version")), _cell(p.get("summary")),
+            ", ".join(str(src).capitalize() for src in p["sources"]))
+
+
+def installed_row(p: dict, source: str, when=None) -> tuple:
+    return (_cell(p.get("name")), _cell(p.get("version")), _cell(p.get("arch")),
+            source.capitalize(), _cell(when))
+
+
+def _widths(columns: list, sample: list, total: int) -> list:
+    """
+    Fixed column widths from the first page, so later pages line up; the
+    last column takes whatever is left.
+    """
+    widths = []
+    for i, (header, _) in enumerate(columns[:-1]):
+        longest = max(len(row[i]) for row in sample)
+        # slack for longer values on later pages
+        widths.append(min(max(longest * 3 // 2, len(header)), 40))
+    gaps = 3 * (len(columns) - 1)
+    widths.append(max(20, total - sum(widths) - gaps))
+    return widths
+
+
+def table(title: str, columns: list, rows, empty: str = "No results", status=None) -> int:
+    """
+    Print rows (an iterable of string tuples) under `title` in pages of
+    page_size, formatting each page as soon as it is filled. Past max_rows
+    the remaining rows are only counted. status() is asked once the rows
+    run out; what it returns (e.g. "Timed out") is shown instead of
+    `empty`, or under the rows. Returns the number of rows seen.
+    """
+    from rich import box
+    from rich.table import Table
+
+    page_size, max_rows = _settings["page_size"], _settings["max_rows"]
+    target = out()
+    rows = iter(rows)
+    target.print(title)
+
+    shown = 0
+    widths = None
+    while not max_rows or shown < max_rows:
+        n = page_size if not max_rows else min(page_size, max_rows - shown)
+        page = list(itertools.islice(rows, n))
+        if not page:
+            break
+        if widths is None:
+            widths = _widths(columns, page, target.width)
+        grid = Table(box=box.SIMPLE_HEAD, show_edge=False, show_header=not shown,
+                     pad_edge=False)
+        for (header, style), width in zip(columns, widths):
+            grid.add_column(header, style=style, width=width, no_wrap=True,
+                            overflow="ellipsis")
+        for row in page:
+            grid.add_row(*row)
+        target.print(grid)
+        shown += len(page)
+
+    more = sum(1 for _ in rows)
+    note = status() if status else None
+    if not shown:
+        target.print(f"  [dim]{note or empty}[/dim]")
+    if more:
+        target.print(f"  [dim]… {more} more (raise --max-rows, or use --pager)[/dim]")
+    if shown and note:
+        target.print(f"  [dim]{note}[/dim]")
+    target.print()
+    return shown + more
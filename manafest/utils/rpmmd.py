@@ -0,0 +1,210 @@
+# manafest/utils/rpmmd.py
+
+import bz2
+import gzip
+import logging
+import lzma
+import os
+import re
+import shutil
+import sqlite3
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from manafest.utils.cache import cache_dir
+from manafest.utils.osdetect import SYSROOT
+
+try:
+    import zstandard    # optional: Fedora 39+ ships primary.*.zst
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIRS = (SYSROOT / "var/cache/dnf", SYSROOT / "var/cache/libdnf5")
+NS = "{http://linux.duke.edu/metadata/common}"
+
+OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+if zstandard is not None:
+    OPENERS[".zst"] = zstandard.open
+
+
+def _open(path: Path):
+    return OPENERS.get(path.suffix, open)(path, "rb")
+
+
+def _newest(paths) -> Path | None:
+    paths = [p for p in paths if p.suffix in OPENERS or p.suffix in (".sqlite", ".xml")]
+    return max(paths, key=lambda p: p.stat().st_mtime_ns, default=None)
+
+
+def _repos(cache_dirs) -> dict:
+    """
+    {repo_dir_name: primary metadata file}, sqlite preferred over XML.
+    """
+    repos = {}
+    for base in cache_dirs:
+        for repodata in base.glob("*/repodata"):
+            primary = (_newest(repodata.glob("*primary.sqlite*"))
+                       or _newest(repodata.glob("*primary.xml*")))
+            if primary:
+                repos[repodata.parent.name] = primary
+    return repos
+
+
+def _import_sqlite(src: Path, dest: Path):
+    if src.suffix == ".sqlite":
+        return src
+    with _open(src) as fin, open(dest, "wb") as fout:
+        shutil.copyfileobj(fin, fout)
+    return dest
+
+
+def _import_xml(src: Path, dest: Path):
+    """
+    Stream primary.xml into a primary.sqlite-shaped table.
+    """
+    conn = sqlite3.connect(dest)
+    conn.execute(
+        "CREATE TABLE packages (name TEXT, epoch TEXT, version TEXT,"
+        " release TEXT, arch TEXT, summary TEXT)"
+    )
+    with _open(src) as fh:
+        context = ET.iterparse(fh, events=("start", "end"))
+        _, root = next(context)
+        rows = []
+        for event, elem in context:
+            if event != "end" or elem.tag != NS + "package":
+                continue
+            ver = elem.find(NS + "version")
+            rows.append((
+                elem.findtext(NS + "name"),
+                ver.get("epoch", "0") if ver is not None else "0",
+                ver.get("ver", "") if ver is not None else "",
+                ver.get("rel", "") if ver is not None else "",
+                elem.findtext(NS + "arch"),
+                elem.findtext(NS + "summary") or ""
+            ))
+            root.clear()
+            if len(rows) >= 1000:
+                conn.executemany("INSERT INTO packages VALUES (?,?,?,?,?,?)", rows)
+                rows = []
+        conn.executemany("INSERT INTO packages VALUES (?,?,?,?,?,?)", rows)
+    conn.execute("CREATE INDEX packagename ON packages (name)")
+    conn.commit()
+    conn.close()
+    return dest
+
+
+def _database(repo: str, src: Path) -> Path | None:
+    """
+    Path of an indexed sqlite db for `src`, importing it when it changed.
+    """
+    if src.suffix == ".sqlite":
+        return src
+    out = cache_dir() / "rpmmd"
+    out.mkdir(exist_ok=True)
+    dest = out / f"{repo}.sqlite"
+    stamp = out / f"{repo}.stamp"
+    key = f"{src}:{src.stat().st_mtime_ns}"
+    try:
+        if dest.exists() and stamp.read_text() == key:
+            return dest
+    except OSError:
+        pass
+
+    tmp = dest.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        if ".sqlite" in src.name:
+            _import_sqlite(src, tmp)
+        else:
+            _import_xml(src, tmp)
+    except Exception as e:
+        logger.debug("Cannot import %s → %s", src, e)
+        tmp.unlink(missing_ok=True)
+        return None
+    os.replace(tmp, dest)
+    stamp.write_text(key)
+    return dest
+
+
+def _evr_key(epoch, version, release):
+    def parts(s):
+        return [(1, int(p)) if p.isdigit() else (0, p)
+                for p in re.findall(r"\d+|[a-zA-Z]+", s or "")]
+    return (int(epoch or 0), parts(version), parts(release))
+
+
+def _query(sql: str, params: tuple, cache_dirs) -> list | None:
+    repos = _repos(cache_dirs)
+    if not repos:
+        return None
+    rows = []
+    for repo, src in repos.items():
+        db = _database(repo, src)
+        if db is None:
+            continue
+        try:
+            conn = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+            try:
+                rows.extend(conn.execute(sql, params).fetchall())
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.debug("Query on %s failed → %s", db, e)
+    return rows
+
+
+def _latest(rows) -> dict:
+    """
+    Collapse rows to the newest EVR per name.
+    """
+    best = {}
+    for name, epoch, ver, rel, arch, summ in rows:
+        key = _evr_key(epoch, ver, rel)
+        if name not in best or key > best[name][0]:
+            best[name] = (key, {
+                "name": name,
+                "version": f"{ver}-{rel}",
+                "arch": arch,
+                "summary": summ
+            })
+    return {name: entry for name, (_, entry) in best.items()}
+
+
+COLUMNS = "SELECT name, epoch, version, release, arch, summary FROM packages"
+
+
+def search(query: str, cache_dirs=CACHE_DIRS) -> list[dict] | None:
+    """
+    Substring match on name and summary (case-insensitive); % and _ in
+    the query match themselves.
+    """
+    like = "%" + re.sub(r"([\\%_])", r"\\\1", query) + "%"
+    rows = _query(f"{COLUMNS} WHERE name LIKE ? ESCAPE '\\' OR summary LIKE ? ESCAPE '\\'",
+                  (like, like), cache_dirs)
+    if rows is None:
+        return None
+    return list(_latest(rows).values())
+
+
+def info(name: str, cache_dirs=CACHE_DIRS) -> dict | None:
+    """
+    Newest available build of `name` (indexed lookup on name).
+    """
+    rows = _query(f"{COLUMNS} WHERE name = ?", (name,), cache_dirs)
+    if rows is None:
+        return None
+    return _latest(rows).get(name, {})
+
+
+def catalog(cache_dirs=CACHE_DIRS):
+    """
+    (name, summary) for every package across the cached repositories.
+    """
+    rows = _query("SELECT DISTINCT name, summary FROM packages", (), cache_dirs)
+    if rows is None:
+        return None
+    seen = set()
+    return ((name, summ) for name, summ in rows if not (name in seen or seen.add(name)))
@@ -0,0 +1,90 @@
+# manafest/utils/schedule.py
+
+import logging
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from manafest.utils.cache import cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+def _lock(src: str, ctx) -> str:
+    """
+    The lock a backend's update/upgrade holds: AUR helpers drive pacman,
+    so on Arch they contend with the system backend for its database lock.
+    """
+    if src == "aur" or (src == "default" and ctx.distro == "arch"):
+        return "pacman"
+    return src
+
+
+def groups(sources: list[str], ctx) -> list[list[str]]:
+    """
+    Sources split into lanes that may run side by side; backends sharing
+    a lock stay in one lane, in the order given.
+    """
+    lanes = {}
+    for src in sources:
+        lanes.setdefault(_lock(src, ctx), []).append(src)
+    return list(lanes.values())
+
+
+def log_path(src: str, action: str):
+    path = cache_dir() / "logs"
+    path.mkdir(exist_ok=True)
+    return path / f"{src}-{action}.log"
+
+
+def prime_sudo(argvs: list[list[str]]):
+    """
+    Ask for the sudo password once, up front, so parallel jobs do not race
+    for the terminal.
+    """
+    if not sys.stdin.isatty() or not any(argv and argv[0] == "sudo" for argv in argvs):
+        return
+    try:
+        subprocess.run(["sudo", "-v"], check=False)
+    except OSError as e:
+        logger.debug(f"sudo -v failed: {e}")
+
+
+def tail(path, n: int = 5) -> list[str]:
+    try:
+        with open(path, errors="replace") as fh:
+            return [line.rstrip("\n") for line in fh.readlines()[-n:]]
+    except OSError:
+        return []
+
+
+def run(jobs: dict, lanes: list[list[str]], action: str, on_done=None) -> dict:
+    """
+    Run jobs {src: fn(log) -> bool} one lane per thread, each job writing
+    its output to its own log file. Returns {src: {status, seconds, log}};
+    on_done(src, result) is called as each job finishes.
+    """
+    results = {}
+
+    def lane(srcs):
+        for src in srcs:
+            path = log_path(src, action)
+            start = time.monotonic()
+            with open(path, "w") as log:
+                try:
+                    ok = jobs[src](log)
+                except Exception as e:
+                    log.write(f"\nmanafest: {src} {action} failed: {e}\n")
+                    ok = False
+            results[src] = {"status": "ok" if ok else "failed",
+                            "seconds": round(time.monotonic() - start, 1),
+                            "log": str(path)}
+            if on_done:
+                on_done(src, results[src])
+
+    if lanes:
+        with ThreadPoolExecutor(max_workers=len(lanes)) as pool:
+            for f in [pool.submit(lane, srcs) for srcs in lanes]:
+                f.result()
+    return results
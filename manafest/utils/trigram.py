@@ -0,0 +1,201 @@
+# manafest/utils/trigram.py
+
+import heapq
+import itertools
+import json
+import logging
+import operator
+import os
+import re
+import sqlite3
+import time
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from contextlib import closing
+
+from manafest.utils.cache import cache_dir
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "trigram.sqlite"
+MAX_AGE = 24 * 3600       # rebuild at least daily (remote catalogs drift)
+CANDIDATES = 200          # rows re-scored exactly after the posting-count pass
+SUMMARY_WEIGHT = 0.25
+SEPARATORS = re.compile(r"[-_.]+")
+WORD = re.compile(r"\w+")
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    pg_trgm-style trigrams of the lowercased text, per word, padded so
+    short names and word starts still produce grams.
+    """
+    grams = set()
+    for word in text.lower().split():
+        padded = f"  {word} "
+        grams |= {padded[i:i + 3] for i in range(len(padded) - 2)}
+    return grams
+
+
+def words(text: str) -> set[str]:
+    """
+    Lowercased words of 3+ characters; summaries are indexed by whole word.
+    """
+    return {w for w in WORD.findall(text.lower()) if len(w) >= 3}
+
+
+def _pack(ids) -> bytes:
+    """
+    Ascending ids → delta-encoded uint32 array, zlib-compressed.
+    """
+    deltas = array("I", map(operator.sub, ids, [0] + ids[:-1]))
+    return zlib.compress(deltas.tobytes(), 1)
+
+
+def _unpack(blob: bytes):
+    deltas = array("I")
+    deltas.frombytes(zlib.decompress(blob))
+    return itertools.accumulate(deltas)
+
+
+def _path():
+    return cache_dir() / INDEX_FILE
+
+
+def signature(path=None) -> dict | None:
+    """
+    The {source: fingerprint} the index was built from, with its build
+    time under "_built"; None if there is no index.
+    """
+    path = path or _path()
+    if not os.path.exists(path):
+        return None
+    try:
+        with closing(sqlite3.connect(path)) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key='signature'").fetchone()
+        return json.loads(row[0]) if row else None
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+def is_fresh(sig: dict, path=None) -> bool:
+    stored = signature(path)
+    if not stored:
+        return False
+    built = stored.pop("_built", 0)
+    return stored == sig and time.time() - built < MAX_AGE
+
+
+def entries(source: str, path=None) -> list[tuple[str, str]]:
+    """
+    (name, summary) rows the index holds for `source`, so a rebuild can
+    keep sources whose catalog has not changed; [] if there are none.
+    """
+    path = path or _path()
+    if not os.path.exists(path):
+        return []
+    try:
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+            return conn.execute("SELECT name, summary FROM pkgs WHERE source=? ORDER BY id",
+                                (source,)).fetchall()
+    except sqlite3.Error as e:
+        logger.debug("Cannot read %s from %s: %s", source, path, e)
+        return []
+
+
+def build(catalogs: dict, sig: dict, path=None) -> int:
+    """
+    Index {source: iterable of (name, summary)}; returns the number of
+    packages. Each source gets a contiguous id range so queries can be
+    restricted to some sources without touching the pkgs table. Written
+    to a temp file and swapped in, so readers never see a partial index.
+    """
+    path = path or _path()
+    tmp = f"{path}.tmp"
+    if os.path.exists(tmp):
+        os.unlink(tmp)
+
+    names = defaultdict(list)
+    summaries = defaultdict(list)
+    rows = []
+    ranges = {}
+    for source, entries in catalogs.items():
+        lo = len(rows)
+        for name, summary in entries:
+            i = len(rows)
+            summary = summary or ""
+            rows.append((i, name, source, summary))
+            # "python-requests" should also be found by "requests"
+            for g in trigrams(f"{name} {SEPARATORS.sub(' ', name)}"):
+                names[g].append(i)
+            for word in words(summary):
+                summaries[word].append(i)
+        ranges[source] = [lo, len(rows)]
+
+    with closing(sqlite3.connect(tmp)) as conn, conn:
+        conn.execute("CREATE TABLE pkgs (id INTEGER PRIMARY KEY, name TEXT, source TEXT, summary TEXT)")
+        conn.execute("CREATE TABLE grams (gram TEXT PRIMARY KEY, ids BLOB) WITHOUT ROWID")
+        conn.execute("CREATE TABLE swords (gram TEXT PRIMARY KEY, ids BLOB) WITHOUT ROWID")
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO pkgs VALUES (?,?,?,?)", rows)
+        conn.executemany("INSERT INTO grams VALUES (?,?)",
+                         ((g, _pack(ids)) for g, ids in names.items()))
+        conn.executemany("INSERT INTO swords VALUES (?,?)",
+                         ((g, _pack(ids)) for g, ids in summaries.items()))
+        conn.executemany("INSERT INTO meta VALUES (?,?)", [
+            ("signature", json.dumps(dict(sig, _built=time.time()))),
+            ("ranges", json.dumps(ranges)),
+        ])
+    os.replace(tmp, path)
+    logger.debug("Indexed %d names from %s", len(rows), ", ".join(ranges))
+    return len(rows)
+
+
+def _postings(conn, table: str, grams) -> Counter:
+    hits = Counter()
+    marks = ",".join("?" * len(grams))
+    for (blob,) in conn.execute(f"SELECT ids FROM {table} WHERE gram IN ({marks})", list(grams)):
+        hits.update(_unpack(blob))
+    return hits
+
+
+def query(text: str, k: int = 10, sources=None, path=None,
+          min_score: float = 0.3) -> list[dict]:
+    """
+    Best k fuzzy matches for text as dicts {name, source, summary, score},
+    optionally only from `sources`. Score is the Dice coefficient on name
+    trigrams plus a small bonus per query word found in the summary.
+    """
+    path = path or _path()
+    qgrams = trigrams(text)
+    if not qgrams or not os.path.exists(path):
+        return []
+    with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+        name_hits = _postings(conn, "grams", qgrams)
+        qwords = words(text)
+        summary_hits = _postings(conn, "swords", qwords) if qwords else Counter()
+        candidates = set(name_hits) | set(summary_hits)
+        if sources is not None:
+            (raw,) = conn.execute("SELECT value FROM meta WHERE key='ranges'").fetchone()
+            spans = [r for src, r in json.loads(raw).items() if src in sources]
+            candidates = {i for i in candidates if any(lo <= i < hi for lo, hi in spans)}
+        pool = heapq.nlargest(
+            CANDIDATES, candidates,
+            key=lambda i: name_hits[i] + SUMMARY_WEIGHT * summary_hits[i]
+        )
+        if not pool:
+            return []
+        marks = ",".join("?" * len(pool))
+        rows = conn.execute(
+            f"SELECT id, name, source, summary FROM pkgs WHERE id IN ({marks})", pool
+        ).fetchall()
+
+    scored = []
+    for i, name, source, summary in rows:
+        ngrams = trigrams(name)
+        dice = 2 * len(qgrams & ngrams) / (len(qgrams) + len(ngrams))
+        s = dice + SUMMARY_WEIGHT * summary_hits[i] / max(len(qwords), 1)
+        if s >= min_score:
+            scored.append((s, {"name": name, "source": source, "summary": summary, "score": round(s, 3)}))
+    return [row for _, row in heapq.nlargest(k, scored, key=lambda t: t[0])]
@@ -0,0 +1,187 @@
+# manafest/utils/webindex.py
+"""
+Local copy of a web repository's package index, kept in SQLite and
+brought up to date with per-revision deltas. Repository layout:
+
+    {base}/index.json               {"revision": N}
+    {base}/snapshots/{N}.json.gz    {"revision": N, "packages": [pkg, …]}
+    {base}/deltas/{N}.json.gz       {"revision": N, "upsert": [pkg, …], "delete": [id, …]}
+
+where deltas/N takes revision N-1 to N, and pkg is
+{"id", "name", "version", "arch", "summary", "url", "sha256", "size"}.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+from manafest.utils import http, profile
+from manafest.utils.cache import cache_dir
+
+logger = logging.getLogger(__name__)
+
+INDEX_TTL = 300       # seconds between checks of index.json
+MAX_DELTAS = 50       # further behind than this, fetch a snapshot instead
+SCHEMA = 1
+
+
+def _path(base: str):
+    return cache_dir() / f"webrepo-{hashlib.sha1(base.encode()).hexdigest()[:12]}.sqlite"
+
+
+def _connect(base: str):
+    conn = sqlite3.connect(_path(base), timeout=10, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA:
+        conn.executescript(f"""
+            DROP TABLE IF EXISTS pkgs;
+            DROP TABLE IF EXISTS meta;
+            CREATE TABLE pkgs (id TEXT PRIMARY KEY, name TEXT, lname TEXT,
+                               summary TEXT, data TEXT);
+            CREATE INDEX pkgs_lname ON pkgs (lname);
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value);
+            PRAGMA user_version = {SCHEMA};
+        """)
+    return conn
+
+
+def _revision(conn) -> int | None:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+    return int(row[0]) if row else None
+
+
+def revision(base: str) -> int | None:
+    """
+    Revision of the local copy (None before the first sync).
+    """
+    try:
+        with closing(_connect(base)) as conn:
+            return _revision(conn)
+    except sqlite3.Error:
+        return None
+
+
+def _fetch(url: str):
+    body = http.get(url, cache=False)
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def _row(pkg: dict) -> tuple:
+    pid = str(pkg.get("id") or pkg["name"])
+    name = pkg.get("name") or pid
+    return (pid, name, name.lower(), pkg.get("summary") or "", json.dumps(pkg))
+
+
+def _deltas(base: str, start: int, end: int) -> list[dict] | None:
+    """
+    Deltas start+1..end fetched concurrently, in order; None if any is
+    missing or inconsistent.
+    """
+    revs = range(start + 1, end + 1)
+    with ThreadPoolExecutor(max_workers=min(http.HOST_LIMIT, len(revs))) as pool:
+        futures = [pool.submit(_fetch, f"{base}/deltas/{rev}.json.gz") for rev in revs]
+        try:
+            deltas = [f.result() for f in futures]
+        except Exception as e:
+            logger.debug(f"webrepo delta fetch failed: {e}")
+            return None
+    if [d.get("revision") for d in deltas] != list(revs):
+        return None
+    return deltas
+
+
+def sync(base: str, max_age: float = INDEX_TTL) -> int | None:
+    """
+    Bring the local copy to the repository's current revision: deltas when
+    a few revisions behind, a full snapshot otherwise. Offline, the local
+    copy is used as is. Returns the local revision.
+    """
+    try:
+        remote = int(http.get_json(f"{base}/index.json", max_age=max_age)["revision"])
+    except Exception as e:
+        logger.debug(f"webrepo index check failed: {e}")
+        return revision(base)
+
+    with closing(_connect(base)) as conn:
+        local = _revision(conn)
+        if local == remote:
+            return local
+        with profile.span("index", backend="webrepo") as span:
+            deltas = None
+            if local is not None and 0 < remote - local <= MAX_DELTAS:
+                deltas = _deltas(base, local, remote)
+            snapshot = None
+            if deltas is None:
+                try:
+                    snapshot = _fetch(f"{base}/snapshots/{remote}.json.gz")
+                except Exception as e:
+                    logger.debug(f"webrepo snapshot fetch failed: {e}")
+                    return local
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if _revision(conn) != local:
+                    # another process synced meanwhile
+                    conn.execute("ROLLBACK")
+                    return _revision(conn)
+                if snapshot is not None:
+                    conn.execute("DELETE FROM pkgs")
+                    conn.executemany("INSERT OR REPLACE INTO pkgs VALUES (?, ?, ?, ?, ?)",
+                                     map(_row, snapshot["packages"]))
+                    span.update(mode="snapshot", rows=len(snapshot["packages"]))
+                else:
+                    for delta in deltas:
+                        conn.executemany("DELETE FROM pkgs WHERE id = ?",
+                                         ((str(pid),) for pid in delta.get("delete", [])))
+                        conn.executemany("INSERT OR REPLACE INTO pkgs VALUES (?, ?, ?, ?, ?)",
+                                         map(_row, delta.get("upsert", [])))
+                    span.update(mode="delta", deltas=len(deltas),
+                                rows=sum(len(d.get("upsert", [])) for d in deltas))
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('revision', ?)", (remote,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return remote
+
+
+def search(base: str, query: str) -> list[dict]:
+    """
+    Packages whose name or summary contains query, best matches first.
+    """
+    from manafest.utils.rank import score
+    sync(base)
+    like = "%" + query.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    with closing(_connect(base)) as conn:
+        rows = conn.execute(
+            "SELECT data FROM pkgs WHERE lname LIKE ? ESCAPE '\\' "
+            "OR lower(summary) LIKE ? ESCAPE '\\'", (like, like)
+        ).fetchall()
+    pkgs = [json.loads(data) for (data,) in rows]
+    pkgs.sort(key=lambda p: -score(query, p.get("name", ""), p.get("summary", "")))
+    return pkgs
+
+
+def info(base: str, name: str) -> dict | None:
+    """
+    The package with this id, or else this name.
+    """
+    sync(base)
+    with closing(_connect(base)) as conn:
+        row = (conn.execute("SELECT data FROM pkgs WHERE id = ?", (name,)).fetchone()
+               or conn.execute("SELECT data FROM pkgs WHERE lname = ?", (name.lower(),)).fetchone())
+    return json.loads(row[0]) if row else None
+
+
+def catalog(base: str):
+    """
+    (name, summary) for every package, for the fuzzy index.
+    """
+    sync(base)
+    with closing(_connect(base)) as conn:
+        return conn.execute("SELECT name, summary FROM pkgs").fetchall()
@@ -5,11 +5,23 @@ setup(
     version="0.1.0",
     description="Manafest: multi-backend package manager",
     author="Alkama Sudad",
-    packages=find_packages(),  # will find manafest + subpackages
-    install_requires=["rich", "psutil", "requests", "aiohttp"],
+    packages=find_packages(exclude=("benchmarks", "tests")),  # manafest + subpackages
+    install_requires=["rich", "psutil", "requests", "packaging"],
+    extras_require={
+        "zstd": ["zstandard"],      # dnf metadata on Fedora 39+
+    },
     entry_points={
         "console_scripts": [
             "manafest=manafest.cli:main",
+            "manafestd=manafest.daemon:main",
+        ],
+        "manafest.backends": [
+            "default=manafest.backends.default",
+            "aur=manafest.backends.aur",
+            "flatpak=manafest.backends.flatpak",
+            "snap=manafest.backends.snap",
+            "pypi=manafest.backends.pypi",
+            "webrepo=manafest.backends.webrepo",
         ],
     },
     classifiers=[
@@ -0,0 +1,90 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """
+    A private $XDG_CACHE_HOME, $XDG_DATA_HOME (the install registry) and
+    artifact store per test, so on-disk state never leaks between tests
+    or into the user's.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.setenv("MANAFEST_ARTIFACTS", str(tmp_path / "artifacts"))
+    return tmp_path / "cache"
+
+
+class _Routes(BaseHTTPRequestHandler):
+    """
+    Answers from a {path: (status, headers, body)} table; records each
+    request's path and headers.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def _answer(self, body: bool):
+        self.server.seen.append((self.command, self.path, dict(self.headers)))
+        route = self.server.routes.get(self.path)
+        if callable(route):
+            route = route(self)
+        status, headers, data = route or (404, {}, b"")
+        if isinstance(data, (dict, list)):
+            data = json.dumps(data).encode()
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if body:
+            self.wfile.write(data)
+
+    def do_GET(self):
+        self._answer(True)
+
+    def do_HEAD(self):
+        self._answer(False)
+
+
+@pytest.fixture
+def server():
+    """
+    A local HTTP server on 127.0.0.1: set server.routes, read server.seen,
+    prefix paths with server.url.
+    """
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Routes)
+    srv.routes, srv.seen = {}, []
+    srv.url = f"http://127.0.0.1:{srv.server_address[1]}"
+    threading.Thread(target=srv.serve_forever, args=(0.05,), daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def repo_server(tmp_path):
+    """
+    Serves a directory (with Range support) via benchmarks/fakerepo.py;
+    call it with the directory, get the base URL.
+    """
+    from benchmarks import fakerepo
+    servers = []
+
+    def serve(root: Path) -> str:
+        srv, url = fakerepo.serve(root)
+        servers.append(srv)
+        return url
+
+    yield serve
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
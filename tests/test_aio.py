@@ -0,0 +1,137 @@
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import pytest
+
+from manafest.utils import aio, proc
+
+
+@pytest.fixture(autouse=True)
+def fresh_loop():
+    aio.shutdown()
+    yield
+    aio.shutdown()
+
+
+def test_call_sync_passthrough():
+    assert aio.call(lambda a, b=0: a + b, 1, b=2) == 3
+    rows = iter([1, 2])
+    assert aio.call(lambda: rows) is rows
+    assert aio._loop is None        # no coroutine, no loop
+
+
+def test_call_coroutine_runs_on_the_shared_loop():
+    async def where():
+        await asyncio.sleep(0)
+        return threading.current_thread().name
+    assert aio.call(where) == "manafest-aio"
+    first = aio.loop()
+    aio.call(where)
+    assert aio.loop() is first
+
+
+def test_call_async_generator_iterates_and_closes():
+    closed = []
+
+    async def rows(n):
+        try:
+            for i in range(n):
+                yield i
+        finally:
+            closed.append(True)
+
+    assert list(aio.call(rows, 3)) == [0, 1, 2]
+    it = aio.call(rows, 100)
+    assert next(it) == 0
+    it.close()
+    assert closed == [True, True]
+
+
+def test_call_from_many_threads_overlaps():
+    async def nap():
+        await asyncio.sleep(0.3)
+        return True
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(aio.call(nap)))
+               for _ in range(5)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [True] * 5
+    assert time.monotonic() - start < 1.2
+
+
+def test_errors_propagate():
+    async def boom():
+        raise ValueError("boom")
+    with pytest.raises(ValueError, match="boom"):
+        aio.call(boom)
+
+
+def test_timeout_cancels_the_coroutine():
+    cancelled = threading.Event()
+
+    async def stuck():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    with pytest.raises(FutureTimeout):
+        aio.run(stuck(), timeout=0.1)
+    assert cancelled.wait(2)
+
+
+def test_cancelled_run_kills_the_child(monkeypatch):
+    started = []
+    create = asyncio.create_subprocess_exec
+
+    async def spawn(*args, **kwargs):
+        started.append(await create(*args, **kwargs))
+        return started[-1]
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", spawn)
+
+    with pytest.raises(FutureTimeout):
+        aio.run(proc.run_async([sys.executable, "-c", "import time; time.sleep(60)"]),
+                timeout=0.5)
+    deadline = time.monotonic() + 5
+    while started[0].returncode is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert started[0].returncode == -9
+
+
+def test_shutdown_cancels_pending_work_and_restarts():
+    cancelled = threading.Event()
+
+    async def stuck():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    loop = aio.loop()
+    asyncio.run_coroutine_threadsafe(stuck(), loop)
+    thread = aio._thread
+    aio.shutdown()
+    assert cancelled.is_set()
+    assert not thread.is_alive() and loop.is_closed()
+    assert aio._loop is None
+
+    async def answer():
+        return 42
+    assert aio.call(answer) == 42 and aio.loop() is not loop
+
+
+def test_run_refuses_the_loop_thread():
+    async def nested():
+        coro = asyncio.sleep(0)
+        with pytest.raises(RuntimeError):
+            aio.run(coro)
+        return True
+    assert aio.call(nested)
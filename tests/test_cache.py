@@ -0,0 +1,83 @@
+import json
+import time
+from contextlib import closing
+
+from manafest.utils import cache
+
+
+def test_meta_follows_fingerprint():
+    cache.put_meta("default", "bash", "fp1", {"version": "5.2"})
+    assert cache.get_meta("default", "bash", "fp1") == {"version": "5.2"}
+    assert cache.get_meta("default", "bash", "fp2") is None
+
+
+def test_remote_meta_expires(monkeypatch):
+    cache.put_meta("aur", "yay", "fp", {"version": "12.0"})
+    assert cache.get_meta("aur", "yay", "fp") == {"version": "12.0"}
+    later = time.time() + cache.META_TTL["aur"] + 1
+    monkeypatch.setattr(cache.time, "time", lambda: later)
+    assert cache.get_meta("aur", "yay", "fp") is None
+
+
+def test_local_meta_has_no_ttl(monkeypatch):
+    cache.put_meta("default", "bash", "fp", {"version": "5.2"})
+    later = time.time() + 365 * 86400
+    monkeypatch.setattr(cache.time, "time", lambda: later)
+    assert cache.get_meta("default", "bash", "fp") == {"version": "5.2"}
+
+
+def test_search_cache_ttl(monkeypatch):
+    cache.put_search("aur", "yay", [{"name": "yay"}])
+    assert cache.get_search("aur", "yay")
+    later = time.time() + cache.SEARCH_TTL["aur"] + 1
+    monkeypatch.setattr(cache.time, "time", lambda: later)
+    assert not cache.get_search("aur", "yay")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+def _rows(tag, n=10):
+    return [{"name": f"{tag}{i}", "summary": "x" * 80} for i in range(n)]
+
+
+def _queries():
+    with closing(cache._cache_db()) as conn:
+        return {q for (q,) in conn.execute("SELECT query FROM search")}
+
+
+def test_search_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(cache.time, "time", _Clock())
+    size = len(json.dumps(_rows("a")))
+    monkeypatch.setattr(cache, "SEARCH_CACHE_MAX_BYTES", 3 * size)
+    for q in "abc":
+        cache.put_search("default", q, _rows(q))
+    assert _queries() == {"a", "b", "c"}
+    assert cache.get_search("default", "a")        # a is now the most recent
+    cache.put_search("default", "d", _rows("d"))
+    assert _queries() == {"a", "c", "d"}
+    cache.put_search("default", "e", _rows("e"))
+    assert _queries() == {"a", "d", "e"}
+
+
+def test_expired_search_rows_are_dropped(monkeypatch):
+    cache.put_search("webrepo", "old", _rows("o"))
+    cache.put_search("default", "kept", _rows("k"))
+    later = time.time() + cache.SEARCH_TTL["webrepo"] + 1
+    monkeypatch.setattr(cache.time, "time", lambda: later)
+    assert cache.get_search("webrepo", "old") is None
+    assert cache.get_search("default", "kept")
+    assert _queries() == {"kept"}
+
+
+def test_limited_search_answers_smaller_limits():
+    cache.put_search("default", "q", _rows("q", 5), complete=False)
+    assert len(cache.get_search("default", "q", limit=3)) == 3
+    assert cache.get_search("default", "q", limit=10) is None
+    assert cache.get_search("default", "q") is None
@@ -0,0 +1,27 @@
+import sys
+
+import pytest
+
+from manafest import cli
+
+
+def _parse(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["manafest", *argv])
+    return cli.parse_args()
+
+
+@pytest.mark.parametrize("flag", ["--limit", "--top", "--page-size"])
+@pytest.mark.parametrize("value", ["0", "-3", "x"])
+def test_counts_must_be_positive(monkeypatch, flag, value):
+    with pytest.raises(SystemExit):
+        _parse(monkeypatch, "search", "foo", flag, value)
+
+
+def test_max_rows_allows_zero(monkeypatch):
+    assert _parse(monkeypatch, "search", "foo", "--max-rows", "0").max_rows == 0
+    with pytest.raises(SystemExit):
+        _parse(monkeypatch, "search", "foo", "--max-rows", "-1")
+
+
+def test_limit(monkeypatch):
+    assert _parse(monkeypatch, "search", "foo", "--limit", "5").limit == 5
@@ -0,0 +1,55 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+from rich.console import Console
+
+from manafest import client
+from manafest.utils import render
+
+
+@pytest.fixture
+def screen(monkeypatch):
+    buf = io.StringIO()
+    monkeypatch.setattr(render, "_out", Console(file=buf, width=160, color_system=None))
+    return buf
+
+
+def _search(*msgs):
+    args = SimpleNamespace(target="fire", fuzzy=False, merge=False)
+    client._search_tables(args, iter(msgs))
+
+
+def _row(name, src="snap"):
+    return {"name": name, "version": "1.0", "source": src}
+
+
+def test_lone_backend_timeout_is_shown(screen):
+    _search({"event": "start", "sources": ["snap"]},
+            {"event": "timeout", "source": "snap"}, {"event": "end"})
+    assert "Timed out" in screen.getvalue()
+    assert "No results" not in screen.getvalue()
+
+
+def test_lone_backend_partial_rows_then_timeout(screen):
+    _search({"event": "start", "sources": ["snap"]}, _row("firefox"),
+            {"event": "timeout", "source": "snap"}, {"event": "end"})
+    text = screen.getvalue()
+    assert "firefox" in text and "Timed out" in text
+
+
+def test_lone_backend_done(screen):
+    _search({"event": "start", "sources": ["snap"]}, _row("firefox"),
+            {"event": "done", "source": "snap"}, {"event": "end"})
+    text = screen.getvalue()
+    assert "firefox" in text and "Timed out" not in text
+
+
+def test_several_backends(screen):
+    _search({"event": "start", "sources": ["snap", "flatpak"]},
+            _row("firefox"), _row("fireplace", "flatpak"),
+            {"event": "timeout", "source": "flatpak"},
+            {"event": "done", "source": "snap"}, {"event": "end"})
+    text = screen.getvalue()
+    assert "Flatpak Results" in text and "Timed out" in text
+    assert "fireplace" not in text and "firefox" in text
@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+from manafest.utils import context, osdetect
+
+
+@pytest.fixture
+def system(tmp_path, monkeypatch):
+    """
+    A PATH holding only a fake pacman, and an Arch os-release; the
+    process-wide context is forgotten before and after.
+    """
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    _tool(bindir, "pacman")
+    release = tmp_path / "os-release"
+    release.write_text("ID=arch\n")
+    monkeypatch.setenv("PATH", str(bindir))
+    monkeypatch.setattr(context, "OS_RELEASE", release)
+    monkeypatch.setattr(osdetect, "OS_RELEASE", release)
+    context.get_context.cache_clear()
+    yield bindir, release
+    context.get_context.cache_clear()
+
+
+def _tool(bindir, name):
+    path = bindir / name
+    path.write_text("#!/bin/sh\n")
+    path.chmod(0o755)
+    # a new binary bumps its dir's mtime; make sure it shows at coarse resolution
+    stat = os.stat(bindir)
+    os.utime(bindir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+def _fresh():
+    context.get_context.cache_clear()
+    return context.get_context()
+
+
+def test_context_reused_from_disk(system, monkeypatch):
+    ctx = context.get_context()
+    assert ctx.distro == "arch" and ctx.has("pacman") and not ctx.has("flatpak")
+    assert (context.cache_dir() / context.CONTEXT_FILE).exists()
+    monkeypatch.setattr(context, "detect", lambda: pytest.fail("re-detected"))
+    again = _fresh()
+    assert (again.distro, again.helpers, again.templates) == (
+        ctx.distro, ctx.helpers, ctx.templates)
+
+
+def test_new_helper_invalidates(system):
+    bindir, _ = system
+    assert not context.get_context().has("flatpak")
+    _tool(bindir, "flatpak")
+    ctx = _fresh()
+    assert ctx.has("flatpak") and ctx.cmd("flatpak", "search", "x")[0] == "flatpak"
+
+
+def test_os_change_invalidates(system):
+    _, release = system
+    assert context.get_context().distro == "arch"
+    release.write_text("ID=debian\n")
+    ctx = _fresh()
+    assert ctx.distro == "debian"
+    assert ctx.cmd("default", "search", "x")[0] != "pacman"
+
+
+@pytest.mark.parametrize("content", ["{not json", '{"key": 1}', "[]", ""])
+def test_corrupt_cache_file(system, content):
+    context.get_context()
+    path = context.cache_dir() / context.CONTEXT_FILE
+    path.write_text(content)
+    ctx = _fresh()
+    assert ctx.distro == "arch" and ctx.has("pacman")
+    assert json.loads(path.read_text())["key"] == context._cache_key()     # rewritten
+
+
+def test_stale_shape_is_redetected(system):
+    context.get_context()
+    path = context.cache_dir() / context.CONTEXT_FILE
+    path.write_text('{"key": "%s", "context": {"os": "linux"}}' % context._cache_key())
+    assert _fresh().distro == "arch"
@@ -0,0 +1,79 @@
+import re
+
+import pytest
+
+from benchmarks import fakebin
+from benchmarks.fixtures import write_apt_lists
+from manafest.utils import debdb
+
+N = 300
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(debdb, "_memo", None)
+    write_apt_lists(tmp_path, N)
+    return tmp_path / "var/lib/apt/lists", tmp_path / "var/lib/dpkg/status"
+
+
+def test_search_matches_apt_cache(paths):
+    pattern = re.compile("fire", re.I)
+    expected = {p["name"] for p in fakebin.catalog(N)
+                if pattern.search(p["name"]) or pattern.search(p["summary"])}
+    assert {p["name"] for p in debdb.search("fire", *paths)} == expected
+
+
+def test_search_is_case_insensitive(paths):
+    assert {p["name"] for p in debdb.search("FIRE", *paths)} == \
+        {p["name"] for p in debdb.search("fire", *paths)}
+
+
+def test_info(paths):
+    pkg = fakebin.package(7)
+    assert debdb.info(pkg["name"], *paths) == {
+        "name": pkg["name"], "version": pkg["version"],
+        "arch": "amd64", "summary": pkg["summary"]}
+    assert debdb.info("no-such-package", *paths) == {}
+
+
+def test_installed(paths):
+    assert debdb.installed(fakebin.package(30)["name"], *paths) is True
+    assert debdb.installed(fakebin.package(31)["name"], *paths) is False
+
+
+def test_info_skips_removed_status_stanza(paths):
+    lists, status = paths
+    pkg = fakebin.package(40)
+    text = status.read_text().replace(
+        f"Package: {pkg['name']}\nVersion: {pkg['version']}\n"
+        f"Architecture: amd64\nDescription: {pkg['summary']}\nStatus: install ok installed",
+        f"Package: {pkg['name']}\nVersion: 0.0-old\n"
+        f"Architecture: amd64\nDescription: {pkg['summary']}\nStatus: deinstall ok config-files")
+    status.write_text(text)
+    assert debdb.installed(pkg["name"], *paths) is False
+    assert debdb.info(pkg["name"], *paths)["version"] == pkg["version"]
+
+
+def test_catalog(paths):
+    rows = list(debdb.catalog(*paths))
+    assert len(rows) == N
+    assert rows[0] == (fakebin.package(0)["name"], fakebin.package(0)["summary"])
+
+
+def test_multiline_description(tmp_path, monkeypatch):
+    monkeypatch.setattr(debdb, "_memo", None)
+    lists = tmp_path / "lists"
+    lists.mkdir()
+    (lists / "x_Packages").write_text(
+        "Package: alpha\nVersion: 1\nArchitecture: all\nDescription: first line\n"
+        " continued here mentioning zebra\n\n"
+        "Package: beta\nVersion: 2\nArchitecture: all\nDescription: zebra tools\n\n")
+    status = tmp_path / "status"
+    status.write_text("")
+    assert [p["name"] for p in debdb.search("zebra", lists, status)] == ["beta"]
+    assert debdb.info("alpha", lists, status)["summary"] == "first line"
+
+
+def test_missing_lists(tmp_path, monkeypatch):
+    monkeypatch.setattr(debdb, "_memo", None)
+    assert debdb.search("x", tmp_path / "nope", tmp_path / "status") is None
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import re
+
+import pytest
+
+from manafest.utils import download
+
+DATA = bytes(range(256)) * 40          # 10240 bytes
+SHA = hashlib.sha256(DATA).hexdigest()
+
+
+def _ranged(data, ranges=True, cut=None):
+    """
+    A route serving data, honouring "Range: bytes=a-b" when ranges is set;
+    cut truncates every body to that many bytes (a dropped connection).
+    """
+    def route(handler):
+        headers = {"Accept-Ranges": "bytes"} if ranges else {}
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", handler.headers.get("Range", ""))
+        if ranges and match:
+            start = int(match[1])
+            end = int(match[2]) + 1 if match[2] else len(data)
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{len(data)}"
+            return 206, headers, data[start:end][:cut]
+        if handler.command == "HEAD":
+            return 200, headers, data
+        return 200, headers, data[:cut]
+    return route
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.delenv("MANAFEST_ARTIFACTS", raising=False)
+    monkeypatch.setattr(download, "SYSROOT", tmp_path / "root")
+    monkeypatch.setattr(download, "SEGMENT_MIN", 1024)
+    return tmp_path / "root/var/cache/manafest/artifacts"
+
+
+def _ranges(server):
+    return [h.get("Range") for method, path, h in server.seen if method == "GET"]
+
+
+def test_fetch_stores_by_checksum(server, store):
+    server.routes["/a"] = _ranged(DATA)
+    path = download.fetch(server.url + "/a", SHA, len(DATA))
+    assert path == store / "sha256" / SHA[:2] / SHA
+    assert path.read_bytes() == DATA
+    assert not list((store / "partial").glob("*.part*"))
+
+
+def test_cached_artifact_skips_network(server, store):
+    server.routes["/a"] = _ranged(DATA)
+    first = download.fetch(server.url + "/a", SHA)
+    server.seen.clear()
+    assert download.fetch(server.url + "/other", SHA) == first
+    assert server.seen == []
+
+
+def test_segments_fetched_as_ranges(server, store):
+    server.routes["/a"] = _ranged(DATA)
+    download.fetch(server.url + "/a", SHA, len(DATA))
+    step = len(DATA) // download.SEGMENTS
+    assert sorted(_ranges(server), key=lambda r: int(r[6:].split("-")[0])) == [
+        f"bytes={i * step}-{(i + 1) * step - 1}" for i in range(download.SEGMENTS)]
+
+
+def test_no_range_support_means_one_request(server, store):
+    server.routes["/a"] = _ranged(DATA, ranges=False)
+    path = download.fetch(server.url + "/a", SHA)
+    assert _ranges(server) == [None]
+    assert path.read_bytes() == DATA
+
+
+def test_resume_fetches_only_missing_ranges(server, store):
+    server.routes["/a"] = _ranged(DATA)
+    url = server.url + "/a"
+    partial = store / "partial"
+    partial.mkdir(parents=True)
+    segments = download._plan(len(DATA), True)
+    segments[0][2] = 1000                          # partly done
+    segments[1][2] = segments[1][1] - segments[1][0]  # complete
+    part = partial / f"{SHA}.part"
+    body = bytearray(len(DATA))
+    for start, end, done in segments:
+        body[start:start + done] = DATA[start:start + done]
+    part.write_bytes(bytes(body))
+    (partial / f"{SHA}.part.json").write_text(json.dumps({"url": url, "segments": segments}))
+
+    path = download.fetch(url, SHA, len(DATA))
+    assert path.read_bytes() == DATA
+    assert sorted(_ranges(server)) == sorted([
+        f"bytes=1000-{segments[0][1] - 1}",
+        f"bytes={segments[2][0]}-{segments[2][1] - 1}",
+        f"bytes={segments[3][0]}-{segments[3][1] - 1}",
+    ])
+
+
+def test_interrupted_download_keeps_progress(server, store):
+    server.routes["/a"] = _ranged(DATA, cut=500)
+    url = server.url + "/a"
+    with pytest.raises(RuntimeError):
+        download.fetch(url, SHA, len(DATA))
+    state = json.loads((store / "partial" / f"{SHA}.part.json").read_text())
+    done = [done for start, end, done in state["segments"]]
+    # the first range to fail stops the rest, wherever they were
+    assert set(done) <= {0, 500} and 500 in done
+
+    server.routes["/a"] = _ranged(DATA)
+    server.seen.clear()
+    assert download.fetch(url, SHA, len(DATA)).read_bytes() == DATA
+    step = len(DATA) // download.SEGMENTS
+    assert sorted(int(r[6:].split("-")[0]) % step for r in _ranges(server)) == sorted(done)
+
+
+def test_checksum_mismatch(server, store):
+    server.routes["/a"] = _ranged(DATA)
+    with pytest.raises(download.ChecksumError):
+        download.fetch(server.url + "/a", "0" * 64, len(DATA))
+    assert not list((store / "partial").glob("*.part*"))
+    assert not (store / "sha256").exists() or not any((store / "sha256").rglob("*0000*"))
+
+
+def test_corrupt_cache_entry_is_refetched(server, store):
+    server.routes["/a"] = _ranged(DATA)
+    path = download.fetch(server.url + "/a", SHA)
+    path.write_bytes(b"tampered")
+    assert download.lookup(SHA) is None
+    assert download.fetch(server.url + "/a", SHA).read_bytes() == DATA
+
+
+def test_shared_store_comes_first(server, store, tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    monkeypatch.setenv("MANAFEST_ARTIFACTS", str(shared))
+    server.routes["/a"] = _ranged(DATA)
+    assert download.fetch(server.url + "/a", SHA).is_relative_to(shared)
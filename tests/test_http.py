@@ -0,0 +1,81 @@
+import pytest
+import requests
+
+from manafest.utils import http
+
+
+def _conditional(etag=None, last_modified=None, body=b"v1"):
+    """
+    A route answering 304 when the request's validators match.
+    """
+    def route(handler):
+        headers = {}
+        if etag:
+            headers["ETag"] = etag
+            if handler.headers.get("If-None-Match") == etag:
+                return 304, headers, b""
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+            if handler.headers.get("If-Modified-Since") == last_modified:
+                return 304, headers, b""
+        return 200, headers, body
+    return route
+
+
+def _gets(server):
+    return [headers for method, path, headers in server.seen if method == "GET"]
+
+
+def test_etag_revalidation(server):
+    server.routes["/x"] = _conditional(etag='"abc"')
+    assert http.get(server.url + "/x") == b"v1"
+    assert http.get(server.url + "/x") == b"v1"
+    first, second = _gets(server)
+    assert "If-None-Match" not in first
+    assert second["If-None-Match"] == '"abc"'
+
+
+def test_last_modified_revalidation(server):
+    stamp = "Wed, 01 Jan 2025 00:00:00 GMT"
+    server.routes["/x"] = _conditional(last_modified=stamp)
+    http.get(server.url + "/x")
+    assert http.get(server.url + "/x") == b"v1"
+    assert _gets(server)[1]["If-Modified-Since"] == stamp
+
+
+def test_changed_resource_replaces_cached_body(server):
+    server.routes["/x"] = _conditional(etag='"1"', body=b"old")
+    assert http.get(server.url + "/x") == b"old"
+    server.routes["/x"] = _conditional(etag='"2"', body=b"new")
+    assert http.get(server.url + "/x") == b"new"
+    assert http.get(server.url + "/x") == b"new"
+
+
+def test_max_age_skips_network(server):
+    server.routes["/x"] = _conditional(etag='"abc"')
+    http.get(server.url + "/x", max_age=60)
+    assert http.get(server.url + "/x", max_age=60) == b"v1"
+    assert len(_gets(server)) == 1
+
+
+def test_max_age_without_validators(server):
+    server.routes["/x"] = (200, {}, b"plain")
+    http.get(server.url + "/x", max_age=60)
+    server.routes["/x"] = (200, {}, b"changed")
+    assert http.get(server.url + "/x", max_age=60) == b"plain"
+    assert len(_gets(server)) == 1
+    # past max_age, and nothing to revalidate with: fetched again
+    assert http.get(server.url + "/x") == b"changed"
+
+
+def test_uncached_get(server):
+    server.routes["/x"] = _conditional(etag='"abc"')
+    http.get(server.url + "/x", cache=False)
+    http.get(server.url + "/x", cache=False)
+    assert all("If-None-Match" not in h for h in _gets(server))
+
+
+def test_http_errors_raise(server):
+    server.routes["/x"] = (500, {}, b"")
+    with pytest.raises(requests.HTTPError):
+        http.get(server.url + "/x")
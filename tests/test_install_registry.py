@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from manafest.utils import registry
+
+ROOT = Path(__file__).resolve().parent.parent
+LEGACY = {
+    "vim": {"source": "default", "info": {"name": "vim", "version": "9.0"},
+            "installed_at": "2024-01-01T00:00:00"},
+    "yay": {"source": "aur", "info": {"name": "yay"}, "installed_at": "2024-02-01T00:00:00"},
+}
+
+
+@pytest.fixture
+def legacy(tmp_path, monkeypatch):
+    path = tmp_path / "registry.json"
+    monkeypatch.setattr(registry, "LEGACY_JSON", path)
+    monkeypatch.setattr(registry, "_local", threading.local())
+    return path
+
+
+def test_json_import(legacy):
+    legacy.write_text(json.dumps(LEGACY))
+    assert registry.get_entry("vim") == LEGACY["vim"]
+    assert [name for name, _ in registry.iter_entries()] == ["vim", "yay"]
+    assert [name for name, _ in registry.iter_entries("aur")] == ["yay"]
+
+
+def test_reimport_is_idempotent(legacy):
+    legacy.write_text(json.dumps(LEGACY))
+    registry.put_entry("vim", "default", {"name": "vim", "version": "9.1"})
+    # a rerun of the migration (schema reset) must not clobber newer rows
+    registry._connect().execute("PRAGMA user_version = 0")
+    registry._local.conn = None
+    assert registry.get_entry("vim")["info"]["version"] == "9.1"
+    assert len(list(registry.iter_entries())) == 2
+
+
+@pytest.mark.parametrize("content", ["{broken", '{"vim": {"info": {}}}', "[1]"])
+def test_corrupt_legacy_json_is_set_aside(legacy, caplog, content):
+    legacy.write_text(content)
+    with caplog.at_level(logging.WARNING, logger=registry.__name__):
+        registry.put_entry("vim", "default", {"name": "vim"})
+    assert registry.get_entry("vim")["source"] == "default"
+    assert not legacy.exists()
+    assert legacy.with_name("registry.json.bad").read_text() == content
+    assert "cannot import legacy registry" in caplog.text
+
+
+def test_one_connection_per_thread(legacy):
+    conn = registry._connect()
+    registry.put_entry("a", "default", {})
+    registry.get_entry("a")
+    assert registry._connect() is conn
+    other = []
+    t = threading.Thread(target=lambda: other.append(registry._connect()))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+
+
+def test_concurrent_writers(legacy):
+    def write(tag):
+        for i in range(50):
+            registry.put_entry(f"{tag}-{i}", "default", {"name": f"{tag}-{i}"})
+
+    script = (
+        "import sys\n"
+        "from manafest.utils import registry\n"
+        "for i in range(50):\n"
+        "    registry.put_entry(f'{sys.argv[1]}-{i}', 'pypi', {})\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    procs = [subprocess.Popen([sys.executable, "-c", script, f"p{n}"], env=env)
+             for n in range(2)]
+    threads = [threading.Thread(target=write, args=(f"t{n}",)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [p.wait(timeout=60) for p in procs] == [0, 0]
+
+    names = {name for name, _ in registry.iter_entries()}
+    assert len(names) == 6 * 50
+    conn = sqlite3.connect(registry.registry_path())
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
@@ -0,0 +1,23 @@
+import io
+import json
+
+from manafest import pkgmanager
+
+
+def test_info_records_mark_managed(monkeypatch):
+    monkeypatch.setattr(pkgmanager, "get_entry",
+                        lambda name: {"source": "pypi", "info": {"name": name, "version": "1.0"}})
+    out = io.StringIO()
+    assert pkgmanager._info_records("demo", "ndjson", out) == 1
+    rec = json.loads(out.getvalue())
+    assert rec["managed"] is True
+    assert "installed" not in rec
+    assert rec["name"] == "demo" and rec["source"] == "pypi"
+
+
+def test_json_array_output(monkeypatch):
+    monkeypatch.setattr(pkgmanager, "get_entry",
+                        lambda name: {"source": "pypi", "info": {"name": name}})
+    out = io.StringIO()
+    pkgmanager._info_records("demo", "json", out)
+    assert [r["name"] for r in json.loads(out.getvalue())] == ["demo"]
@@ -0,0 +1,79 @@
+import io
+import os
+import re
+import tarfile
+
+import pytest
+
+from benchmarks import fakebin
+from benchmarks.fixtures import write_pacman_db
+from manafest.utils import pacmandb
+
+N = 300
+
+
+@pytest.fixture
+def dbpath(tmp_path, monkeypatch):
+    monkeypatch.setattr(pacmandb, "_memo", None)
+    write_pacman_db(tmp_path, N)
+    return tmp_path / "var/lib/pacman"
+
+
+def test_search_matches_pacman_ss(dbpath):
+    pattern = re.compile("fire", re.I)
+    expected = {p["name"] for p in fakebin.catalog(N)
+                if pattern.search(p["name"]) or pattern.search(p["summary"])}
+    hits = list(pacmandb.search("fire", dbpath))
+    assert {p["name"] for p in hits} == expected
+    assert all(p["repo"] in fakebin.REPOS for p in hits)
+
+
+def test_search_with_bad_regex_is_literal(dbpath):
+    assert list(pacmandb.search("fire[", dbpath)) == []
+
+
+def test_info_prefers_local(dbpath):
+    pkg = fakebin.package(10)        # every tenth package is installed
+    got = pacmandb.info(pkg["name"], dbpath)
+    assert got == dict({k: pkg[k] for k in ("name", "version", "arch", "summary")},
+                       repo="local")
+    other = fakebin.package(11)
+    assert pacmandb.info(other["name"], dbpath)["repo"] == other["repo"]
+    assert pacmandb.info("no-such-package", dbpath) == {}
+
+
+def test_installed(dbpath):
+    assert pacmandb.installed(fakebin.package(20)["name"], dbpath) is True
+    assert pacmandb.installed(fakebin.package(21)["name"], dbpath) is False
+
+
+def test_catalog(dbpath):
+    assert len(list(pacmandb.catalog(dbpath))) == N
+
+
+def test_index_reused_from_disk(dbpath, monkeypatch):
+    pacmandb.load_index(dbpath)
+    monkeypatch.setattr(pacmandb, "_memo", None)
+    monkeypatch.setattr(pacmandb, "_build", lambda *a: pytest.fail("rebuilt"))
+    assert pacmandb.load_index(dbpath)["sync"]
+
+
+def test_index_rebuilt_after_sync(dbpath):
+    assert pacmandb.info("brand-new", dbpath) == {}
+    # a sync replaces core.db: same path, newer mtime
+    core = dbpath / "sync/core.db"
+    desc = b"%NAME%\nbrand-new\n\n%VERSION%\n1.0-1\n\n%DESC%\nfresh\n\n%ARCH%\nany\n\n"
+    with tarfile.open(core, "w:gz") as tar:
+        info = tarfile.TarInfo("brand-new-1.0-1/desc")
+        info.size = len(desc)
+        tar.addfile(info, io.BytesIO(desc))
+    st = core.stat()
+    os.utime(core, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert pacmandb.info("brand-new", dbpath)["version"] == "1.0-1"
+
+
+def test_unreadable_or_missing_db(dbpath, tmp_path):
+    (dbpath / "sync/extra.db").write_bytes(b"(\xb5/\xfd not a tarball")
+    os.utime(dbpath / "sync/extra.db", ns=(0, 10**18))
+    assert pacmandb.search("fire", dbpath) is None
+    assert pacmandb.load_index(tmp_path / "missing") is None
@@ -0,0 +1,120 @@
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from manafest import pkgmanager
+from manafest.utils import proc
+
+FOREVER = [sys.executable, "-c",
+           "import itertools\nfor i in itertools.count(): print('row', i, flush=True)"]
+STUCK = [sys.executable, "-c",
+         "import time\nprint('first', flush=True)\ntime.sleep(60)"]
+STUBBORN = [sys.executable, "-c",
+            "import itertools, signal\nsignal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+            "for i in itertools.count(): print('row', i, flush=True)"]
+
+
+@pytest.fixture
+def children(monkeypatch):
+    """
+    Every child stream_lines starts, for checking it was reaped.
+    """
+    started = []
+    popen = subprocess.Popen
+
+    def spawn(*args, **kwargs):
+        started.append(popen(*args, **kwargs))
+        return started[-1]
+    monkeypatch.setattr(proc.subprocess, "Popen", spawn)
+    return started
+
+
+def _gone(pid: int) -> bool:
+    # a zombie still answers signal 0; a reaped child does not exist
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    return False
+
+
+def test_closing_early_kills_the_child(children):
+    rows = proc.stream_lines(FOREVER)
+    assert list(itertools.islice(rows, 5)) == [f"row {i}" for i in range(5)]
+    rows.close()
+    (child,) = children
+    assert child.returncode is not None and _gone(child.pid)
+
+
+def test_search_limit_stops_the_child(children, monkeypatch):
+    backend = SimpleNamespace(search=lambda query, ctx: proc.stream_lines(FOREVER))
+    monkeypatch.setattr(pkgmanager, "_backend", lambda src: backend)
+    pkgs = pkgmanager._search_one("fake", "q", None, use_cache=False, limit=20)
+    assert len(pkgs) == 20
+    (child,) = children
+    assert child.returncode is not None and _gone(child.pid)
+
+
+def test_child_ignoring_sigterm_is_killed(children):
+    rows = proc.stream_lines(STUBBORN)
+    next(rows)
+    start = time.monotonic()
+    rows.close()
+    (child,) = children
+    assert child.returncode == -9 and _gone(child.pid)
+    assert time.monotonic() - start < 5
+
+
+def test_watchdog_ends_a_stuck_child(children):
+    start = time.monotonic()
+    assert list(proc.stream_lines(STUCK, timeout=0.5)) == ["first"]
+    assert time.monotonic() - start < 5
+    (child,) = children
+    assert child.returncode == -9 and _gone(child.pid)
+
+
+@pytest.fixture
+def async_children(monkeypatch):
+    started = []
+    create = asyncio.create_subprocess_exec
+
+    async def spawn(*args, **kwargs):
+        started.append(await create(*args, **kwargs))
+        return started[-1]
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", spawn)
+    return started
+
+
+def test_async_stream_closing_early(async_children):
+    async def take(n):
+        agen = proc.stream_lines_async(FOREVER)
+        rows = [row async for row in _islice(agen, n)]
+        await agen.aclose()
+        return rows
+    assert asyncio.run(take(3)) == ["row 0", "row 1", "row 2"]
+    (child,) = async_children
+    assert child.returncode is not None and _gone(child.pid)
+
+
+def test_async_stream_timeout(async_children):
+    async def collect():
+        return [row async for row in proc.stream_lines_async(STUCK, timeout=0.5)]
+    start = time.monotonic()
+    assert asyncio.run(collect()) == ["first"]
+    assert time.monotonic() - start < 5
+    (child,) = async_children
+    assert child.returncode == -9 and _gone(child.pid)
+
+
+async def _islice(agen, n):
+    async for row in agen:
+        yield row
+        n -= 1
+        if not n:
+            return
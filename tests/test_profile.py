@@ -0,0 +1,62 @@
+import json
+import threading
+
+import pytest
+
+from manafest.utils import profile
+
+
+@pytest.fixture
+def clean(monkeypatch):
+    """
+    Profiling off, with no spans recorded.
+    """
+    monkeypatch.setattr(profile, "_enabled", False)
+    monkeypatch.setattr(profile, "_spans", [])
+    monkeypatch.setattr(profile, "_local", threading.local())
+
+
+def test_spans_are_noops_when_off(clean):
+    assert profile.begin("search") is None
+    with profile.span("search", backend="aur") as attrs:
+        attrs["rows"] = 3
+    assert profile.spans() == [] and profile.summary() == []
+
+
+def test_trace_is_chrome_json_with_nested_spans(clean, tmp_path):
+    profile.enable()
+    with profile.span("search", backend="aur"):
+        with profile.span("exec", argv=["yay", "-Ss", "vim"]) as attrs:
+            attrs["rows"] = 3
+    worker = threading.Thread(target=lambda: profile.end(profile.begin("http")))
+    worker.start()
+    worker.join()
+
+    path = tmp_path / "trace.json"
+    profile.write_trace(str(path))
+    trace = json.loads(path.read_text())
+    assert trace["displayTimeUnit"] == "ms"
+    events = {e["cat"]: e for e in trace["traceEvents"]}
+    assert set(events) == {"search", "exec", "http"}
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events.values())
+
+    outer, inner = events["search"], events["exec"]
+    assert outer["name"] == "search aur" and inner["name"] == "exec aur"   # inherited
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert inner["args"] == {"argv": "yay -Ss vim", "rows": 3, "backend": "aur"}
+    assert outer["tid"] == inner["tid"] != events["http"]["tid"]
+    assert events["http"]["name"] == "http"        # nothing to inherit on another thread
+
+
+def test_summary_groups_per_phase_and_backend(clean):
+    profile.enable()
+    for rows in (2, 5):
+        with profile.span("search", backend="snap") as attrs:
+            attrs["rows"] = rows
+    with profile.span("search", backend="aur"):
+        pass
+    groups = {(g["phase"], g["backend"]): g for g in profile.summary()}
+    assert groups[("search", "snap")]["calls"] == 2
+    assert groups[("search", "snap")]["rows"] == 7
+    assert groups[("search", "aur")]["calls"] == 1
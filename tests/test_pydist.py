@@ -0,0 +1,60 @@
+import pytest
+
+from manafest.backends import pypi
+from manafest.utils import pydist
+
+
+def _dist(site, name, version, summary="demo", requires=()):
+    info = site / f"{name.replace('-', '_')}-{version}.dist-info"
+    info.mkdir(parents=True)
+    lines = ["Metadata-Version: 2.1", f"Name: {name}", f"Version: {version}",
+             f"Summary: {summary}"] + [f"Requires-Dist: {r}" for r in requires]
+    info.joinpath("METADATA").write_text("\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def venv(tmp_path):
+    """
+    A venv layout with Demo-Pkg 1.2 in lib/ and a stale 0.9 in lib64/.
+    """
+    root = tmp_path / "venv"
+    root.mkdir()
+    (root / "pyvenv.cfg").write_text("home = /usr/bin\n")
+    _dist(root / "lib/python3.99/site-packages", "Demo-Pkg", "1.2", requires=["requests>=2"])
+    _dist(root / "lib/python3.99/site-packages", "other", "3.0", summary="")
+    _dist(root / "lib64/python3.99/site-packages", "Demo-Pkg", "0.9")
+    return root
+
+
+def test_site_paths_of_venv(venv):
+    expected = (str(venv / "lib/python3.99/site-packages"),
+                str(venv / "lib64/python3.99/site-packages"))
+    assert pydist.site_paths(str(venv)) == expected
+    # the interpreter path is resolved from the layout, never started
+    assert pydist.site_paths(str(venv / "bin/python")) == expected
+
+
+@pytest.mark.parametrize("name", ["Demo-Pkg", "demo_pkg", "demo.pkg"])
+def test_get_normalizes(venv, name):
+    meta = pydist.get(name, str(venv))
+    assert meta == {"name": "Demo-Pkg", "version": "1.2", "arch": "-", "summary": "demo",
+                    "requires": ["requests>=2"]}
+
+
+def test_get_missing(venv):
+    assert pydist.get("absent", str(venv)) is None
+
+
+def test_list_all_first_on_path_wins(venv):
+    found = pydist.list_all(str(venv))
+    assert set(found) == {"demo-pkg", "other"}
+    assert found["demo-pkg"]["version"] == "1.2"
+    assert found["other"]["summary"] == "-"
+
+
+def test_pypi_info_reads_installed_metadata(venv, monkeypatch):
+    monkeypatch.setattr(pypi.http, "get_json", lambda *a, **kw: pytest.fail("went online"))
+    assert pypi.info("demo-pkg", target=str(venv))["version"] == "1.2"
+    assert pypi.installed("demo-pkg", target=str(venv))
+    assert not pypi.installed("absent", target=str(venv))
+    assert set(pypi.list_installed(target=str(venv))) == {"demo-pkg", "other"}
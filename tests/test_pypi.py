@@ -0,0 +1,66 @@
+import pytest
+
+from manafest import pkgmanager
+from manafest.backends import pypi
+
+DISTS = {
+    "requests": {"name": "requests", "version": "2.0.0"},
+    "rich": {"name": "rich", "version": "13.0.0"},
+    "six": {"name": "six", "version": "1.16.0"},
+}
+
+
+def _release(version):
+    return 200, {"Content-Type": "application/json"}, {"info": {"version": version}}
+
+
+@pytest.fixture
+def index(server, monkeypatch):
+    monkeypatch.setattr(pypi.pydist, "list_all", lambda target=None: DISTS)
+    monkeypatch.setattr(pypi, "PYPI_JSON", server.url + "/{name}/json")
+    upgraded = []
+    monkeypatch.setattr(pypi, "upgrade_packages",
+                        lambda names, ctx=None, log=None: upgraded.append(list(names)) or True)
+    server.upgraded = upgraded
+    return server
+
+
+def test_outdated_reports_newer_releases(index):
+    index.routes = {
+        "/requests/json": _release("2.31.0"),
+        "/rich/json": _release("13.0.0"),
+        "/six/json": _release("1.16.0"),
+    }
+    stale, failed = pypi.outdated()
+    assert stale == [{"name": "requests", "version": "2.0.0", "latest": "2.31.0"}]
+    assert failed == []
+
+
+def test_outdated_returns_partial_failures(index):
+    index.routes = {"/requests/json": _release("2.31.0"), "/rich/json": (500, {}, b"")}
+    stale, failed = pypi.outdated()
+    assert [p["name"] for p in stale] == ["requests"]
+    assert sorted(failed) == ["rich", "six"]
+
+
+def test_outdated_raises_when_index_unreachable(monkeypatch):
+    monkeypatch.setattr(pypi.pydist, "list_all", lambda target=None: DISTS)
+    monkeypatch.setattr(pypi, "PYPI_JSON", "http://127.0.0.1:9/{name}/json")
+    with pytest.raises(RuntimeError):
+        pypi.outdated()
+
+
+def test_update_fails_when_every_lookup_fails(index, tmp_path):
+    index.routes = {}
+    with open(tmp_path / "log", "w") as log, pytest.raises(RuntimeError):
+        pkgmanager._update_pypi(None, log)
+    assert index.upgraded == []
+
+
+def test_update_reports_unchecked_packages(index, tmp_path):
+    index.routes = {"/requests/json": _release("2.31.0")}
+    with open(tmp_path / "log", "w") as log:
+        assert pkgmanager._update_pypi(None, log)
+    text = (tmp_path / "log").read_text()
+    assert "Could not check 2 pip packages" in text
+    assert index.upgraded == [["requests"]]
@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+
+from manafest import pkgmanager
+from manafest.utils import rank
+
+
+def _pkg(name, summary=""):
+    return {"name": name, "version": "1", "summary": summary}
+
+
+def test_tiers():
+    scores = [rank.score("vim", name, summary) for name, summary in [
+        ("vim", ""), ("vim-plugins", ""), ("neovim", ""), ("editor", "a vim clone"),
+        ("emacs", "")]]
+    assert scores == sorted(scores, reverse=True)
+    assert [int(s) for s in scores] == [rank.EXACT, rank.PREFIX, rank.SUBSTRING,
+                                        rank.SUMMARY, 0]
+
+
+def test_shorter_names_first_within_a_tier():
+    assert rank.score("vim", "vim-gtk") > rank.score("vim", "vim-plugins")
+
+
+def test_reverse_dns_ids_match_exactly():
+    assert int(rank.score("firefox", "org.mozilla.firefox")) == rank.EXACT
+    assert rank.dedupe_key("org.mozilla.Firefox") == "firefox"
+    assert rank.dedupe_key("python3.11") == "python3.11"
+
+
+def test_merge_orders_exact_prefix_substring():
+    pairs = [("aur", _pkg("neovim")), ("default", _pkg("vim-plugins")),
+             ("snap", _pkg("vim")), ("default", _pkg("editor", "vim-like"))]
+    assert [r["name"] for r in rank.merge(pairs, "vim", 10)] == [
+        "vim", "vim-plugins", "neovim", "editor"]
+
+
+def test_merge_dedupes_across_sources():
+    pairs = [("flatpak", _pkg("org.mozilla.firefox")), ("default", _pkg("firefox")),
+             ("snap", _pkg("Firefox")), ("default", _pkg("firefox"))]
+    rows = rank.merge(pairs, "firefox", 10)
+    assert len(rows) == 1
+    assert rows[0]["sources"] == ["flatpak", "default", "snap"]
+    # the first of equally good rows is kept
+    assert rows[0]["name"] == "org.mozilla.firefox"
+
+
+def test_merge_keeps_best_scoring_row():
+    pairs = [("aur", _pkg("tool", "")), ("default", _pkg("Tool", "an editor"))]
+    rows = rank.merge(pairs, "editor", 5)
+    assert rows == [dict(_pkg("Tool", "an editor"), sources=["aur", "default"])]
+
+
+def test_merge_top_k_and_odd_rows():
+    pairs = [("default", _pkg(f"vim{i}")) for i in range(30)]
+    pairs += [("pypi", "vimbare"), ("pypi", {"name": ""})]
+    rows = rank.merge(pairs, "vim", 5)
+    assert len(rows) == 5
+    assert all(int(rank.score("vim", r["name"])) == rank.PREFIX for r in rows)
+    assert "vimbare" in [r["name"] for r in rank.merge(pairs, "vimbare", 1)]
+
+
+@pytest.mark.parametrize("top", [1, 3])
+def test_search_top(monkeypatch, top):
+    results = [("snap", [_pkg("vim"), _pkg("gvim")]),
+               ("aur", [_pkg("vim-git"), _pkg("vim")]), ("slow", None)]
+    monkeypatch.setattr(pkgmanager, "_gather", lambda *a, **kw: iter(results))
+    out = io.StringIO()
+    n = pkgmanager._search_records("vim", ["snap", "aur", "slow"], None, False, None,
+                                   merge=True, top=top, fuzzy=False, fmt="ndjson", stream=out)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert n == len(rows) == top
+    assert rows[0]["name"] == "vim" and rows[0]["sources"] == ["snap", "aur"]
+    assert [r["name"] for r in rows] == ["vim", "vim-git", "gvim"][:top]
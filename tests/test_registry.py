@@ -0,0 +1,67 @@
+import sys
+
+import pytest
+
+from manafest.backends import registry
+
+
+@pytest.fixture
+def plugin_dir(tmp_path, monkeypatch):
+    """
+    A site dir holding one plugin distribution, appended to sys.path.
+    """
+    site = tmp_path / "site"
+    (site / "demo_backend").mkdir(parents=True)
+    (site / "demo_backend/__init__.py").write_text(
+        'supported_os = ("linux",)\n'
+        "def search(query, ctx=None):\n    return []\n"
+    )
+    info = site / "demo_backend-1.0.dist-info"
+    info.mkdir()
+    info.joinpath("METADATA").write_text("Metadata-Version: 2.1\nName: demo-backend\nVersion: 1.0\n")
+    info.joinpath("entry_points.txt").write_text("[manafest.backends]\ndemo = demo_backend\n")
+    monkeypatch.setattr(sys, "path", sys.path + [str(site)])
+    monkeypatch.setattr(registry, "_manifest", None)
+    return site
+
+
+def test_plugin_discovered(plugin_dir):
+    assert "demo" in registry.names()
+    entry = registry.get("demo")
+    assert entry["dist"] == "demo-backend 1.0"
+    assert entry["actions"] == ["search"]
+    assert registry.has("demo", "search") and not registry.has("demo", "install")
+
+
+def test_key_ignores_script_dir(tmp_path, monkeypatch):
+    key = registry._key()
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.setattr(sys, "path", [str(elsewhere)] + sys.path[1:])
+    assert registry._key() == key
+    (elsewhere / "touched").write_text("")
+    assert registry._key() == key
+
+
+def test_key_changes_on_install(plugin_dir):
+    key = registry._key()
+    (plugin_dir / "demo_backend-1.0.dist-info").rename(plugin_dir / "demo_backend-1.1.dist-info")
+    assert registry._key() != key
+
+
+def test_manifest_reused_until_key_changes(plugin_dir, monkeypatch):
+    registry.manifest()
+    monkeypatch.setattr(registry, "_manifest", None)
+    monkeypatch.setattr(registry, "_describe", lambda *a: pytest.fail("rebuilt"))
+    assert "demo" in registry.manifest()
+
+
+def test_refresh_after_install(plugin_dir):
+    assert "demo" in registry.names()
+    assert registry.refresh() is False
+    info = plugin_dir / "demo_backend-1.1.dist-info"
+    (plugin_dir / "demo_backend-1.0.dist-info").rename(info)
+    info.joinpath("METADATA").write_text("Metadata-Version: 2.1\nName: demo-backend\nVersion: 1.1\n")
+    assert registry.refresh() is True
+    assert registry.get("demo")["dist"] == "demo-backend 1.1"
+    assert registry.refresh() is False
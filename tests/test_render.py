@@ -0,0 +1,64 @@
+import io
+
+import pytest
+from rich.console import Console
+
+from manafest.utils import render
+
+
+@pytest.fixture
+def screen(monkeypatch):
+    """
+    Renders into a wide, colorless in-memory console; returns its buffer.
+    """
+    buf = io.StringIO()
+    monkeypatch.setattr(render, "_out", Console(file=buf, width=160, color_system=None))
+    monkeypatch.setattr(render, "_settings", dict(render._settings))
+    return buf
+
+
+def _rows(n):
+    return [render.search_row({"name": f"pkg{i:03}", "version": "1.0"}) for i in range(n)]
+
+
+def test_rows_are_strings():
+    row = render.search_row({"name": "x", "version": 1.5, "arch": None, "summary": ["a"]})
+    assert row == ("x", "1.5", "-", "['a']")
+    assert render.merged_row({"name": "x", "version": 2, "sources": ["aur"]}) == (
+        "x", "2", "-", "Aur")
+    assert render.installed_row({"name": "x", "version": 0}, "pypi") == (
+        "x", "0", "-", "Pypi", "-")
+
+
+def test_non_string_values_render(screen):
+    pkgs = [{"name": "x", "version": 3, "arch": None, "summary": 1.25}]
+    assert render.table("t", render.SEARCH_COLUMNS, map(render.search_row, pkgs)) == 1
+    assert "1.25" in screen.getvalue()
+
+
+def test_pages_share_one_header(screen):
+    render.configure(page_size=3, max_rows=0)
+    assert render.table("t", render.SEARCH_COLUMNS, iter(_rows(7))) == 7
+    text = screen.getvalue()
+    assert all(f"pkg{i:03}" in text for i in range(7))
+    assert text.count("Name") == 1
+    assert "more" not in text
+
+
+def test_max_rows_counts_the_rest(screen):
+    render.configure(page_size=2, max_rows=5)
+    assert render.table("t", render.SEARCH_COLUMNS, iter(_rows(12))) == 12
+    text = screen.getvalue()
+    assert [f"pkg{i:03}" in text for i in range(12)] == [True] * 5 + [False] * 7
+    assert "… 7 more" in text
+
+
+def test_max_rows_exact_fit(screen):
+    render.configure(max_rows=4)
+    assert render.table("t", render.SEARCH_COLUMNS, iter(_rows(4))) == 4
+    assert "more" not in screen.getvalue()
+
+
+def test_empty(screen):
+    assert render.table("t", render.SEARCH_COLUMNS, [], empty="Timed out") == 0
+    assert "Timed out" in screen.getvalue()
@@ -0,0 +1,139 @@
+import gzip
+import lzma
+import sqlite3
+from xml.sax.saxutils import escape
+
+import pytest
+
+from benchmarks import fakebin
+from manafest.utils import rpmmd
+
+N = 200
+
+
+def _xml(pkgs) -> bytes:
+    body = "".join(
+        f'<package type="rpm"><name>{escape(p["name"])}</name><arch>{p["arch"]}</arch>'
+        f'<version epoch="{p.get("epoch", "0")}" ver="{p["ver"]}" rel="{p["rel"]}"/>'
+        f'<summary>{escape(p["summary"])}</summary><description>long</description></package>'
+        for p in pkgs)
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<metadata xmlns="http://linux.duke.edu/metadata/common" '
+            f'xmlns:rpm="http://linux.duke.edu/metadata/rpm" packages="{len(pkgs)}">'
+            f'{body}</metadata>').encode()
+
+
+def _sqlite(path, pkgs):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE packages (pkgKey INTEGER PRIMARY KEY, name TEXT, arch TEXT,"
+                 " epoch TEXT, version TEXT, release TEXT, summary TEXT)")
+    conn.executemany(
+        "INSERT INTO packages (name, arch, epoch, version, release, summary)"
+        " VALUES (?,?,?,?,?,?)",
+        [(p["name"], p["arch"], p.get("epoch", "0"), p["ver"], p["rel"], p["summary"])
+         for p in pkgs])
+    conn.commit()
+    conn.close()
+
+
+def _catalog(n):
+    for p in fakebin.catalog(n):
+        ver, rel = p["version"].rsplit("-", 1)
+        yield {"name": p["name"], "arch": p["arch"], "ver": ver, "rel": rel + ".fc40",
+               "summary": p["summary"]}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """
+    A dnf cache with a gzipped-XML repo and an xz-compressed sqlite repo.
+    """
+    base = tmp_path / "dnf"
+    fedora = base / "fedora-1234/repodata"
+    fedora.mkdir(parents=True)
+    (fedora / "abc-primary.xml.gz").write_bytes(gzip.compress(_xml(list(_catalog(N)))))
+    updates = base / "updates-5678/repodata"
+    updates.mkdir(parents=True)
+    db = tmp_path / "primary.sqlite"
+    _sqlite(db, [
+        {"name": fakebin.package(3)["name"], "arch": "x86_64", "ver": "3.10.0",
+         "rel": "1.fc40", "summary": "updated"},
+        {"name": "only-in-updates", "arch": "noarch", "ver": "1", "rel": "1",
+         "summary": "fire starter"},
+    ])
+    (updates / "def-primary.sqlite.xz").write_bytes(lzma.compress(db.read_bytes()))
+    return (base,)
+
+
+def test_search_across_repos(cache):
+    expected = {p["name"] for p in _catalog(N)
+                if "fire" in p["name"].lower() or "fire" in p["summary"].lower()}
+    names = {p["name"] for p in rpmmd.search("fire", cache)}
+    assert names == expected | {"only-in-updates"}
+
+
+def test_newest_build_wins(cache):
+    name = fakebin.package(3)["name"]
+    assert rpmmd.info(name, cache) == {
+        "name": name, "version": "3.10.0-1.fc40", "arch": "x86_64", "summary": "updated"}
+
+
+@pytest.mark.parametrize("older, newer", [
+    (("0", "1.9", "1"), ("0", "1.10", "1")),
+    (("0", "2.0", "1"), ("1", "1.0", "1")),
+    (("0", "1.0", "1.fc39"), ("0", "1.0", "2.fc39")),
+    (("0", "1.0a", "1"), ("0", "1.0.1", "1")),
+])
+def test_evr_order(older, newer):
+    assert rpmmd._evr_key(*older) < rpmmd._evr_key(*newer)
+
+
+def test_info_missing(cache):
+    assert rpmmd.info("no-such-package", cache) == {}
+
+
+def test_catalog_unique(cache):
+    names = [name for name, _ in rpmmd.catalog(cache)]
+    assert len(names) == len(set(names)) == N + 1
+
+
+def test_imports_reused_until_metadata_changes(cache, monkeypatch):
+    rpmmd.search("x", cache)
+    monkeypatch.setattr(rpmmd, "_import_xml", lambda *a: pytest.fail("re-imported"))
+    monkeypatch.setattr(rpmmd, "_import_sqlite", lambda *a: pytest.fail("re-imported"))
+    assert rpmmd.info(fakebin.package(5)["name"], cache)
+
+
+def test_sqlite_preferred_over_xml(cache):
+    repodata = cache[0] / "fedora-1234/repodata"
+    _sqlite(repodata / "zzz-primary.sqlite", [
+        {"name": "from-sqlite", "arch": "noarch", "ver": "1", "rel": "1", "summary": "s"}])
+    assert rpmmd.info("from-sqlite", cache)
+    assert rpmmd.info(fakebin.package(5)["name"], cache) == {}
+
+
+@pytest.mark.parametrize("query", ["%", "_", "a_b", "50%"])
+def test_search_wildcards_are_literal(cache, query):
+    repodata = cache[0] / "fedora-1234/repodata"
+    _sqlite(repodata / "zzz-primary.sqlite", [
+        {"name": "a_b", "arch": "noarch", "ver": "1", "rel": "1", "summary": "50% off"},
+        {"name": "axb", "arch": "noarch", "ver": "1", "rel": "1", "summary": "half"}])
+    names = {p["name"] for p in rpmmd.search(query, cache)}
+    assert names == {"a_b"}
+
+
+def test_zstd_metadata(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    repodata = tmp_path / "dnf/fedora-40/repodata"
+    repodata.mkdir(parents=True)
+    db = tmp_path / "primary.sqlite"
+    _sqlite(db, [{"name": "zst-pkg", "arch": "noarch", "ver": "1", "rel": "1", "summary": "s"}])
+    (repodata / "abc-primary.sqlite.zst").write_bytes(
+        zstandard.ZstdCompressor().compress(db.read_bytes()))
+    (repodata / "abc-primary.xml.zst").write_bytes(
+        zstandard.ZstdCompressor().compress(_xml([])))
+    assert rpmmd.info("zst-pkg", (tmp_path / "dnf",))["version"] == "1-1"
+
+
+def test_no_metadata(tmp_path):
+    assert rpmmd.search("x", (tmp_path / "none",)) is None
@@ -0,0 +1,73 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from manafest.utils import schedule
+
+ARCH = SimpleNamespace(distro="arch")
+DEBIAN = SimpleNamespace(distro="debian")
+
+
+@pytest.mark.parametrize("ctx, lanes", [
+    (ARCH, [["default", "aur"], ["flatpak"], ["snap"]]),
+    (DEBIAN, [["default"], ["aur"], ["flatpak"], ["snap"]]),
+])
+def test_groups(ctx, lanes):
+    assert schedule.groups(["default", "aur", "flatpak", "snap"], ctx) == lanes
+
+
+class _Recorder:
+    """
+    Fake jobs that note when each one runs, to see which overlapped.
+    """
+
+    def __init__(self):
+        self.spans = {}
+        self.lock = threading.Lock()
+
+    def job(self, src, ok=True):
+        def run(log):
+            start = time.monotonic()
+            log.write(f"{src} running\n")
+            time.sleep(0.2)
+            with self.lock:
+                self.spans[src] = (start, time.monotonic())
+            return ok
+        return run
+
+    def overlap(self, a, b) -> bool:
+        (s1, e1), (s2, e2) = self.spans[a], self.spans[b]
+        return s1 < e2 and s2 < e1
+
+
+def test_lanes_serialize_shared_locks_and_parallelize_the_rest():
+    rec = _Recorder()
+    sources = ["default", "aur", "flatpak", "snap"]
+    done = []
+    start = time.monotonic()
+    results = schedule.run({src: rec.job(src) for src in sources},
+                           schedule.groups(sources, ARCH), "update",
+                           on_done=lambda src, res: done.append(src))
+    # pacman lane: default, then aur, never together
+    assert not rec.overlap("default", "aur")
+    assert rec.spans["default"][1] <= rec.spans["aur"][0]
+    # independent lanes run side by side
+    assert rec.overlap("default", "flatpak") and rec.overlap("flatpak", "snap")
+    assert time.monotonic() - start < 0.7     # 0.8 if run one by one
+    assert sorted(done) == sorted(sources)
+    assert {res["status"] for res in results.values()} == {"ok"}
+
+
+def test_failures_are_logged():
+    rec = _Recorder()
+
+    def broken(log):
+        raise RuntimeError("boom")
+
+    results = schedule.run({"flatpak": rec.job("flatpak", ok=False), "snap": broken},
+                           [["flatpak"], ["snap"]], "upgrade")
+    assert results["flatpak"]["status"] == results["snap"]["status"] == "failed"
+    assert schedule.tail(results["flatpak"]["log"]) == ["flatpak running"]
+    assert "snap upgrade failed: boom" in schedule.tail(results["snap"]["log"])[-1]
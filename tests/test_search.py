@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from manafest import pkgmanager
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _slow_search(rows, delay):
+    """
+    A _search_one stand-in: hands out rows, then hangs for delay seconds.
+    """
+    def search_one(src, query, ctx, use_cache=True, limit=None, on_row=None):
+        for p in rows:
+            if on_row:
+                on_row(src, p)
+        time.sleep(delay)
+        return rows
+    return search_one
+
+
+def test_stream_flags_timeout(monkeypatch):
+    monkeypatch.setitem(pkgmanager.SEARCH_TIMEOUTS, "slow", 0.2)
+    monkeypatch.setattr(pkgmanager, "_search_one", _slow_search([{"name": "a"}], 5))
+    state = {}
+    start = time.monotonic()
+    assert list(pkgmanager._stream("slow", "q", None, False, None, state)) == [{"name": "a"}]
+    assert state == {"timeout": True}
+    assert time.monotonic() - start < 2
+
+
+def test_stream_completes(monkeypatch):
+    monkeypatch.setattr(pkgmanager, "_search_one", _slow_search([{"name": "a"}], 0))
+    state = {}
+    assert list(pkgmanager._stream("fast", "q", None, False, None, state)) == [{"name": "a"}]
+    assert state == {}
+
+
+def _backends(monkeypatch, **delays):
+    """
+    Backends named after delays; each hands out one row, then hangs.
+    """
+    def search_one(src, query, ctx, use_cache=True, limit=None, on_row=None):
+        rows = [{"name": f"{src}-pkg"}]
+        if on_row:
+            on_row(src, rows[0])
+        time.sleep(delays[src])
+        return rows
+    monkeypatch.setattr(pkgmanager, "_search_one", search_one)
+    for src in delays:
+        monkeypatch.setitem(pkgmanager.SEARCH_TIMEOUTS, src, 0.3)
+
+
+def test_gather_deadline_and_partial_results(monkeypatch):
+    _backends(monkeypatch, fast=0, hung=30)
+    streamed = []
+    start = time.monotonic()
+    results = list(pkgmanager._gather("q", ["hung", "fast"], None, False, None,
+                                      on_row=lambda src, p: streamed.append(p["name"])))
+    assert time.monotonic() - start < 2
+    assert results == [("fast", [{"name": "fast-pkg"}]), ("hung", None)]
+    # rows the hung backend yielded before its deadline were still streamed
+    assert sorted(streamed) == ["fast-pkg", "hung-pkg"]
+
+
+def test_gather_failing_backend(monkeypatch):
+    def search_one(src, *args, **kwargs):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(pkgmanager, "_search_one", search_one)
+    assert list(pkgmanager._gather("q", ["broken"], None, False, None)) == [("broken", [])]
+
+
+def test_hung_backend_does_not_block_exit(tmp_path):
+    script = (
+        "import time\n"
+        "from manafest import pkgmanager\n"
+        "pkgmanager.SEARCH_TIMEOUTS['hung'] = 0.1\n"
+        "pkgmanager._search_one = lambda *a, **kw: time.sleep(60)\n"
+        "print(list(pkgmanager._gather('q', ['hung'], None, False, None)))\n"
+    )
+    start = time.monotonic()
+    proc = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                          timeout=20, env=dict(os.environ, PYTHONPATH=str(ROOT)))
+    assert proc.stdout.strip() == "[('hung', None)]"
+    assert time.monotonic() - start < 10
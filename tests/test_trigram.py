@@ -0,0 +1,127 @@
+import time
+
+import pytest
+
+from manafest import pkgmanager
+from manafest.utils import trigram
+
+CATALOGS = {
+    "default": [("firefox", "web browser"), ("firefly", "media server"),
+                ("python-requests", "HTTP for humans"), ("vim", "text editor")],
+    "flatpak": [("org.mozilla.firefox", "Firefox web browser"), ("gimp", "image editor")],
+}
+SIG = {"default": "fp1", "flatpak": "fp2"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "trigram.sqlite"
+    trigram.build(CATALOGS, SIG, path)
+    return path
+
+
+def _names(hits):
+    return [hit["name"] for hit in hits]
+
+
+def test_exact_name_scores_highest(index):
+    hits = trigram.query("firefox", path=index)
+    assert hits[0]["name"] == "firefox" and hits[0]["score"] >= 1
+    assert hits == sorted(hits, key=lambda h: -h["score"])
+
+
+def test_typos_still_match(index):
+    assert _names(trigram.query("firefx", k=2, path=index))[0] == "firefox"
+    assert "python-requests" in _names(trigram.query("requsts", path=index))
+
+
+def test_summary_words_add_a_bonus(index):
+    hits = {h["name"]: h["score"] for h in trigram.query("fire browser", path=index)}
+    assert hits["firefox"] > hits["firefly"]
+
+
+def test_min_score(index):
+    loose = trigram.query("gimpy", path=index, min_score=0.1)
+    assert "gimp" in _names(loose)
+    assert trigram.query("gimpy", path=index, min_score=0.99) == []
+    assert all(h["score"] >= 0.5 for h in trigram.query("fire", path=index, min_score=0.5))
+
+
+def test_sources_and_k(index):
+    assert set(_names(trigram.query("firefox", sources=["flatpak"], path=index))) == {
+        "org.mozilla.firefox"}
+    assert len(trigram.query("fire", k=1, path=index, min_score=0)) == 1
+
+
+def test_freshness(index, monkeypatch):
+    assert trigram.is_fresh(SIG, index)
+    assert not trigram.is_fresh(dict(SIG, flatpak="fp3"), index)
+    assert not trigram.is_fresh({"default": "fp1"}, index)
+    later = time.time() + trigram.MAX_AGE + 1
+    monkeypatch.setattr(trigram.time, "time", lambda: later)
+    assert not trigram.is_fresh(SIG, index)
+
+
+def test_missing_index(tmp_path):
+    path = tmp_path / "none.sqlite"
+    assert trigram.signature(path) is None and not trigram.is_fresh(SIG, path)
+    assert trigram.query("vim", path=path) == [] and trigram.entries("default", path) == []
+
+
+def test_entries(index):
+    assert trigram.entries("flatpak", index) == CATALOGS["flatpak"]
+
+
+class _Backend:
+    def __init__(self, name, rows, fp):
+        self.name, self.rows, self.fp, self.calls = name, rows, fp, 0
+
+    def fingerprint(self, ctx):
+        return self.fp
+
+    def catalog(self, ctx):
+        self.calls += 1
+        if isinstance(self.rows, Exception):
+            raise self.rows
+        return iter(self.rows)
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    found = {"default": _Backend("default", CATALOGS["default"], "fp1"),
+             "flatpak": _Backend("flatpak", CATALOGS["flatpak"], "fp2")}
+    monkeypatch.setattr(pkgmanager.plugins, "names", lambda: list(found), raising=False)
+    monkeypatch.setattr(pkgmanager.plugins, "has", lambda src, action: True, raising=False)
+    monkeypatch.setattr(pkgmanager, "_runtime_missing", lambda src, ctx: False)
+    monkeypatch.setattr(pkgmanager, "_backend", lambda src: found[src])
+    return found
+
+
+def test_failing_catalog_keeps_other_sources(backends):
+    backends["flatpak"].rows = OSError("offline")
+    pkgmanager._fuzzy_index(None)
+    assert trigram.entries("default") == CATALOGS["default"]
+    assert trigram.entries("flatpak") == []
+    # flatpak is retried next time; default is reused, not fetched again
+    backends["flatpak"].rows = CATALOGS["flatpak"]
+    pkgmanager._fuzzy_index(None)
+    assert backends["default"].calls == 1 and backends["flatpak"].calls == 2
+    assert trigram.entries("flatpak") == CATALOGS["flatpak"]
+    assert trigram.is_fresh(SIG)
+
+
+def test_failing_catalog_keeps_its_previous_rows(backends):
+    pkgmanager._fuzzy_index(None)
+    backends["flatpak"].fp = "fp3"
+    backends["flatpak"].rows = OSError("offline")
+    pkgmanager._fuzzy_index(None)
+    assert trigram.entries("flatpak") == CATALOGS["flatpak"]
+    assert trigram.signature()["flatpak"] == "fp2"
+    assert backends["default"].calls == 1
+
+
+def test_suggestions_never_build_an_index(backends):
+    assert pkgmanager._suggestions("firefx", None) == []
+    assert backends["default"].calls == backends["flatpak"].calls == 0
+    pkgmanager._fuzzy_index(None)
+    assert "firefox" in pkgmanager._suggestions("firefx", None)
@@ -0,0 +1,112 @@
+import gzip
+import json
+import os
+import shutil
+
+import pytest
+
+from benchmarks import fakerepo
+from manafest.utils import webindex
+
+N = 500
+
+
+def _snapshot(root, rev):
+    data = json.loads(gzip.decompress((root / f"snapshots/{rev}.json.gz").read_bytes()))
+    return {p["id"]: p for p in data["packages"]}
+
+
+def _local(base):
+    return {name for name, _ in webindex.catalog(base)}
+
+
+@pytest.fixture
+def repo(tmp_path, repo_server):
+    root = tmp_path / "repo"
+    fakerepo.build(root, N, revisions=3, artifacts=False)
+    return root, repo_server(root)
+
+
+def _advance(root, revisions):
+    """
+    Rebuild the repository at a later revision (same history).
+    """
+    shutil.rmtree(root)
+    fakerepo.build(root, N, revisions=revisions, artifacts=False)
+    # Last-Modified has one-second resolution: make the change visible
+    index = root / "index.json"
+    mtime = index.stat().st_mtime + 10
+    os.utime(index, (mtime, mtime))
+
+
+def test_first_sync_loads_snapshot(repo):
+    root, base = repo
+    assert webindex.sync(base) == 3
+    assert webindex.revision(base) == 3
+    assert _local(base) == {p["name"] for p in _snapshot(root, 3).values()}
+
+
+def test_deltas_applied(repo, monkeypatch):
+    root, base = repo
+    webindex.sync(base)
+    _advance(root, 6)
+    fetched = []
+    real = webindex._fetch
+    monkeypatch.setattr(webindex, "_fetch", lambda url: fetched.append(url) or real(url))
+    assert webindex.sync(base, max_age=0) == 6
+    assert sorted(u.rsplit("/", 2)[1] + "/" + u.rsplit("/", 1)[1] for u in fetched) == [
+        "deltas/4.json.gz", "deltas/5.json.gz", "deltas/6.json.gz"]
+    snapshot = _snapshot(root, 6)
+    assert _local(base) == {p["name"] for p in snapshot.values()}
+    for pid, pkg in list(snapshot.items())[:50]:
+        assert webindex.info(base, pid) == pkg
+
+
+def test_missing_delta_falls_back_to_snapshot(repo):
+    root, base = repo
+    webindex.sync(base)
+    _advance(root, 5)
+    (root / "deltas/4.json.gz").unlink()
+    assert webindex.sync(base, max_age=0) == 5
+    assert _local(base) == {p["name"] for p in _snapshot(root, 5).values()}
+
+
+def test_far_behind_uses_snapshot(repo, monkeypatch):
+    root, base = repo
+    webindex.sync(base)
+    _advance(root, 6)
+    monkeypatch.setattr(webindex, "MAX_DELTAS", 2)
+    monkeypatch.setattr(webindex, "_deltas", lambda *a: pytest.fail("deltas fetched"))
+    assert webindex.sync(base, max_age=0) == 6
+
+
+def test_offline_keeps_local_copy(repo):
+    root, base = repo
+    webindex.sync(base)
+    shutil.rmtree(root)
+    assert webindex.sync(base, max_age=0) == 3
+    assert len(_local(base)) == N
+
+
+def test_index_checked_at_most_every_ttl(repo, monkeypatch):
+    root, base = repo
+    webindex.sync(base)
+    _advance(root, 4)
+    assert webindex.sync(base) == 3        # within INDEX_TTL
+    assert webindex.sync(base, max_age=0) == 4
+
+
+def test_search_and_info(repo):
+    root, base = repo
+    pkgs = _snapshot(root, 3)
+    hits = webindex.search(base, "fire")
+    assert hits and all("fire" in (p["name"] + p["summary"]).lower() for p in hits)
+    assert len(hits) == sum("fire" in (p["name"] + p["summary"]).lower() for p in pkgs.values())
+    assert webindex.search(base, "100%") == []
+    pkg = next(iter(pkgs.values()))
+    assert webindex.info(base, pkg["name"].upper()) == pkg
+    assert webindex.info(base, "no-such-package") is None
+
+
+def test_unreachable_repository():
+    assert webindex.sync("http://127.0.0.1:9") is None
@@ -0,0 +1,76 @@
+import hashlib
+import json
+
+import pytest
+
+from manafest.backends import webrepo
+from manafest.utils import download
+
+SCRIPT = b"#!/bin/sh\nexit 0\n"
+
+
+@pytest.fixture
+def repo(server, tmp_path, monkeypatch):
+    monkeypatch.setenv("MANAFEST_WEBREPO_URL", server.url)
+    monkeypatch.delenv("MANAFEST_WEBREPO_UNVERIFIED", raising=False)
+    monkeypatch.delenv("MANAFEST_ARTIFACTS", raising=False)
+    monkeypatch.setattr(download, "SYSROOT", tmp_path / "root")
+    server.routes["/artifacts/demo.sh"] = (200, {}, SCRIPT)
+    return server
+
+
+def _entry(monkeypatch, **fields):
+    pkg = dict({"name": "demo", "version": "1.0", "url": "artifacts/demo.sh"}, **fields)
+    monkeypatch.setattr(webrepo, "info", lambda name, ctx=None: pkg)
+
+
+def test_install_runs_verified_script(repo, monkeypatch):
+    _entry(monkeypatch, sha256=hashlib.sha256(SCRIPT).hexdigest())
+    assert webrepo.install("demo")
+
+
+def test_install_refuses_checksum_mismatch(repo, monkeypatch):
+    _entry(monkeypatch, sha256="0" * 64)
+    assert not webrepo.install("demo")
+
+
+def test_install_refuses_unverified(repo, monkeypatch):
+    _entry(monkeypatch)
+    assert not webrepo.install("demo")
+    assert repo.seen == []
+
+
+def test_install_unverified_opt_in(repo, monkeypatch):
+    _entry(monkeypatch)
+    monkeypatch.setenv("MANAFEST_WEBREPO_UNVERIFIED", "1")
+    assert webrepo.install("demo")
+
+
+def _record(capsys) -> dict:
+    lines = capsys.readouterr().out.splitlines()
+    return json.loads(next(line for line in lines if line.startswith("{")))
+
+
+def test_remove_reports_unsupported(monkeypatch, capsys):
+    from manafest import pkgmanager
+    monkeypatch.setattr(pkgmanager, "get_entry",
+                        lambda name: {"source": "webrepo", "info": {"name": name}})
+    monkeypatch.setattr(pkgmanager.subprocess, "run",
+                        lambda *a, **kw: pytest.fail("ran a removal command"))
+    pkgmanager.remove("demo", fmt="ndjson", yes=True)
+    rec = _record(capsys)
+    assert rec["status"] == "unsupported" and rec["source"] == "webrepo"
+
+
+def test_remove_without_template_uses_backend(monkeypatch, capsys):
+    from manafest import pkgmanager
+    removed = []
+    monkeypatch.setattr(pkgmanager, "get_entry",
+                        lambda name: {"source": "webrepo", "info": {"name": name}})
+    monkeypatch.setattr(pkgmanager.plugins, "has", lambda src, action: True, raising=False)
+    monkeypatch.setattr(webrepo, "remove", lambda name, ctx: removed.append(name) or True,
+                        raising=False)
+    monkeypatch.setattr(pkgmanager, "delete_entry", lambda name, src: None)
+    pkgmanager.remove("demo", fmt="ndjson", yes=True)
+    assert removed == ["demo"]
+    assert _record(capsys)["status"] == "removed"